@@ -1,50 +1,187 @@
+import asyncio
 import logging
-from fastapi import APIRouter, File, Form, UploadFile
-from typing import Optional
+from contextlib import aclosing
+from fastapi import APIRouter, File, Form, Header, Query, UploadFile, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pydantic_core import to_json
+from typing import Any, Awaitable, Callable, List, Optional
 
-from app.core.dependencies import AgentServiceDep, ImageServiceDep
-from app.models.api import SuggestMealsRequest, BuildRecipeRequest
-from app.models.domain import ExtractIngredientsResult, SuggestionsResult, RecipeResult
+from app.core.dependencies import AgentServiceDep, ImageServiceDep, JobQueueDep, SessionManagerDep, SettingsDep
+from app.core.exceptions import HolodilnikException, ImageValidationError, InvalidMessageError
+from app.core.responses import ModelResponse
+from app.models.api import (
+    SESSION_MESSAGE,
+    SuggestMealsRequest,
+    BuildRecipeRequest,
+    SessionOptions,
+    SessionRecipe,
+    SessionSuggest,
+)
+from app.models.domain import (
+    BatchExtractIngredientsResult,
+    ExtractAndSuggestResult,
+    ExtractIngredientsResult,
+    ImageExtractionError,
+    JobInfo,
+    SuggestionsResult,
+    RecipeResult,
+    RecipeSearchResult,
+)
+from app.services.agent_service import AgentService
+from app.services.image_service import ImageService
+from app.services.jobs import JobQueue
+from app.services.sessions import KitchenSession
+from app.utils.sse import format_sse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["recipes"])
 
+# Documented on endpoints that can run as a job
+JOB_RESPONSES = {202: {"model": JobInfo, "description": "Accepted as a job (with `job=true`)"}}
 
-@router.post("/extract-ingredients", response_model=ExtractIngredientsResult)
+
+async def _submit_job(
+    jobs: JobQueue,
+    kind: str,
+    run: Callable[[], Awaitable[Any]],
+    idempotency_key: Optional[str],
+) -> ModelResponse:
+    """Queue `run` as a job and answer 202 pointing at the job."""
+    info = await jobs.submit(kind, run, idempotency_key)
+    return ModelResponse(
+        info,
+        status_code=202,
+        headers={"Location": f"{router.prefix}/jobs/{info.job_id}"},
+    )
+
+
+@router.post("/extract-ingredients", response_model=ExtractIngredientsResult, responses=JOB_RESPONSES)
 async def extract_ingredients(
     image: UploadFile = File(..., description="Photo of fridge or ingredients"),
+    job: bool = Query(False, description="Run as a job: respond 202 at once and poll /jobs/{job_id}"),
+    idempotency_key: Optional[str] = Header(None, max_length=128, description="Deduplicates job resubmissions"),
     agent_service: AgentServiceDep = None,
     image_service: ImageServiceDep = None,
-) -> ExtractIngredientsResult:
+    jobs: JobQueueDep = None,
+) -> ModelResponse:
     """
     Extract ingredients from a fridge photo using vision AI.
     
     Args:
         image: Uploaded image file
+        job: Whether to run as a job
+        idempotency_key: Key deduplicating job resubmissions
         agent_service: Injected agent service
         image_service: Injected image service
+        jobs: Injected job queue
         
     Returns:
-        Structured result with detected ingredients
+        Structured result with detected ingredients, or the accepted job
     """
     logger.info(f"Extracting ingredients from image: {image.filename}")
     
     # Validate and read image
-    image_bytes = await image_service.validate_and_read(image)
+    mime_type = await image_service.validate_upload(image)
+    prepared = await image_service.prepare(image.file, mime_type)
+    
+    if job:
+        return await _submit_job(
+            jobs,
+            "extract-ingredients",
+            lambda: agent_service.extract_ingredients(prepared.data, prepared.mime_type),
+            idempotency_key,
+        )
     
     # Extract ingredients
-    result = await agent_service.extract_ingredients(image_bytes)
+    result = await agent_service.extract_ingredients(prepared.data, prepared.mime_type)
     
     logger.info(f"Successfully extracted {len(result.ingredients)} ingredients")
-    return result
+    return ModelResponse(result)
+
+
+@router.post("/extract-ingredients/batch", response_model=BatchExtractIngredientsResult)
+async def extract_ingredients_batch(
+    images: List[UploadFile] = File(..., description="Photos of fridge, freezer, pantry..."),
+    agent_service: AgentServiceDep = None,
+    image_service: ImageServiceDep = None,
+    settings: SettingsDep = None,
+) -> ModelResponse:
+    """
+    Extract ingredients from several photos and merge them into one result.
+    
+    Photos are processed concurrently, at most `batch_concurrency` at a time.
+    A photo that fails is reported in `errors` while the others are still
+    merged; the request only fails if no photo could be processed.
+    
+    Args:
+        images: Uploaded image files
+        agent_service: Injected agent service
+        image_service: Injected image service
+        settings: Application settings
+        
+    Returns:
+        Merged result with detected ingredients and per-image errors
+    """
+    if len(images) > settings.batch_max_images:
+        raise ImageValidationError(
+            f"Too many images: {len(images)} (max: {settings.batch_max_images})",
+            details={"count": len(images), "max_images": settings.batch_max_images}
+        )
+    
+    logger.info(f"Extracting ingredients from a batch of {len(images)} images")
+    
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    
+    async def extract_one(image: UploadFile) -> ExtractIngredientsResult:
+        async with semaphore:
+            mime_type = await image_service.validate_upload(image)
+            prepared = await image_service.prepare(image.file, mime_type)
+            return await agent_service.extract_ingredients(prepared.data, prepared.mime_type)
+    
+    outcomes = await asyncio.gather(
+        *(extract_one(image) for image in images),
+        return_exceptions=True,
+    )
+    
+    results: list[ExtractIngredientsResult] = []
+    errors: list[ImageExtractionError] = []
+    for index, (image, outcome) in enumerate(zip(images, outcomes)):
+        if isinstance(outcome, HolodilnikException):
+            logger.warning(f"Batch image {index} ({image.filename}) failed: {outcome.message}")
+            errors.append(ImageExtractionError(
+                index=index,
+                filename=image.filename,
+                error=outcome.__class__.__name__,
+                message=outcome.message,
+            ))
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results.append(outcome)
+    
+    if not results:
+        # Nothing to merge: fail like a single-image request would
+        raise next(o for o in outcomes if isinstance(o, HolodilnikException))
+    
+    merged = ExtractIngredientsResult.merge(results)
+    logger.info(
+        f"Successfully extracted {len(merged.ingredients)} ingredients "
+        f"from {len(results)}/{len(images)} images"
+    )
+    return ModelResponse(BatchExtractIngredientsResult.model_validate({
+        **merged.model_dump(),
+        "images_processed": len(results),
+        "errors": errors,
+    }))
 
 
 @router.post("/suggest-meals", response_model=SuggestionsResult)
 async def suggest_meals(
     request: SuggestMealsRequest,
     agent_service: AgentServiceDep = None,
-) -> SuggestionsResult:
+) -> ModelResponse:
     """
     Generate meal suggestions based on available ingredients.
     
@@ -64,45 +201,149 @@ async def suggest_meals(
     )
     
     logger.info(f"Successfully generated {len(result.dishes)} suggestions")
-    return result
+    return ModelResponse(result)
 
 
-@router.post("/build-recipe", response_model=RecipeResult)
+@router.post("/build-recipe", response_model=RecipeResult, responses=JOB_RESPONSES)
 async def build_recipe(
     request: BuildRecipeRequest,
+    job: bool = Query(False, description="Run as a job: respond 202 at once and poll /jobs/{job_id}"),
+    idempotency_key: Optional[str] = Header(None, max_length=128, description="Deduplicates job resubmissions"),
     agent_service: AgentServiceDep = None,
-) -> RecipeResult:
+    jobs: JobQueueDep = None,
+) -> ModelResponse:
     """
     Build a detailed recipe for a selected dish.
     
+    Args:
+        request: Recipe request with dish details
+        job: Whether to run as a job
+        idempotency_key: Key deduplicating job resubmissions
+        agent_service: Injected agent service
+        jobs: Injected job queue
+        
+    Returns:
+        Detailed recipe with steps and ingredients, or the accepted job
+    """
+    logger.info(f"Building recipe for: {request.title or request.suggestion_id}")
+    
+    def build() -> Awaitable[RecipeResult]:
+        return agent_service.build_recipe(
+            suggestion_id=request.suggestion_id,
+            title=request.title,
+            context_summary=request.context_summary,
+            servings=request.servings,
+        )
+    
+    if job:
+        return await _submit_job(jobs, "build-recipe", build, idempotency_key)
+    
+    result = await build()
+    
+    logger.info(f"Successfully built recipe with {len(result.steps)} steps")
+    return ModelResponse(result)
+
+
+@router.post("/build-recipe/stream")
+async def build_recipe_stream(
+    request: BuildRecipeRequest,
+    agent_service: AgentServiceDep = None,
+) -> StreamingResponse:
+    """
+    Build a detailed recipe, streaming it as Server-Sent Events.
+    
+    Events: `title`, `ingredients`, one `step` per recipe step as soon as it
+    is generated, then the validated `recipe`. Failures after the stream has
+    started are reported as an `error` event.
+    
     Args:
         request: Recipe request with dish details
         agent_service: Injected agent service
         
     Returns:
-        Detailed recipe with steps and ingredients
+        Event stream of recipe parts
     """
-    logger.info(f"Building recipe for: {request.title}")
+    logger.info(f"Streaming recipe for: {request.title or request.suggestion_id}")
     
-    result = await agent_service.build_recipe(
+    events = await agent_service.stream_recipe(
         suggestion_id=request.suggestion_id,
         title=request.title,
         context_summary=request.context_summary,
         servings=request.servings,
     )
     
-    logger.info(f"Successfully built recipe with {len(result.steps)} steps")
-    return result
+    async def event_stream():
+        # Closed here, not left to GC: a client gone mid-stream frees the slot and upstream response at once
+        async with aclosing(events):
+            try:
+                async for event, data in events:
+                    yield format_sse(event, data)
+            except HolodilnikException as e:
+                yield format_sse("error", {
+                    "error": e.__class__.__name__,
+                    "message": e.message,
+                    "details": e.details,
+                })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/recipes/search", response_model=RecipeSearchResult)
+async def search_recipes(
+    ingredients: str = Query(..., min_length=1, description="Comma-separated available ingredients"),
+    limit: int = Query(10, ge=1, le=50),
+    min_coverage: float = Query(0.0, ge=0.0, le=1.0, description="Minimum share of a recipe's ingredients available"),
+    agent_service: AgentServiceDep = None,
+) -> ModelResponse:
+    """
+    Search built recipes by the ingredients at hand, without calling the model.
+    
+    Args:
+        ingredients: Comma-separated available ingredients
+        limit: Maximum number of recipes
+        min_coverage: Minimum share of a recipe's ingredients that must be available
+        agent_service: Injected agent service
+        
+    Returns:
+        Recipes ranked by how much of them the ingredients cover
+    """
+    ingredient_list = [name.strip() for name in ingredients.split(",") if name.strip()]
+    return ModelResponse(agent_service.search_recipes(ingredient_list, limit=limit, min_coverage=min_coverage))
 
 
-@router.post("/extract-and-suggest")
+@router.get("/recipes/{suggestion_id}", response_model=RecipeResult)
+async def get_recipe(
+    suggestion_id: str,
+    agent_service: AgentServiceDep = None,
+) -> ModelResponse:
+    """
+    Get a recipe previously built for a suggestion.
+    
+    Args:
+        suggestion_id: ID of the suggestion the recipe was built for
+        agent_service: Injected agent service
+        
+    Returns:
+        Stored recipe
+    """
+    return ModelResponse(await agent_service.get_recipe(suggestion_id))
+
+
+@router.post("/extract-and-suggest", response_model=ExtractAndSuggestResult, responses=JOB_RESPONSES)
 async def extract_and_suggest(
     image: UploadFile = File(..., description="Photo of fridge or ingredients"),
     servings: Optional[int] = Form(None, ge=1),
     dietary_preferences: Optional[str] = Form(None, description="Comma-separated dietary preferences"),
+    job: bool = Query(False, description="Run as a job: respond 202 at once and poll /jobs/{job_id}"),
+    idempotency_key: Optional[str] = Header(None, max_length=128, description="Deduplicates job resubmissions"),
     agent_service: AgentServiceDep = None,
     image_service: ImageServiceDep = None,
-) -> dict:
+    jobs: JobQueueDep = None,
+) -> ModelResponse:
     """
     Combined endpoint: extract ingredients from photo and immediately suggest meals.
     
@@ -112,34 +353,199 @@ async def extract_and_suggest(
         image: Uploaded image file
         servings: Number of servings (optional)
         dietary_preferences: Comma-separated dietary preferences (optional)
+        job: Whether to run as a job
+        idempotency_key: Key deduplicating job resubmissions
         agent_service: Injected agent service
         image_service: Injected image service
+        jobs: Injected job queue
         
     Returns:
-        Dict with both extraction results and meal suggestions
+        Both extraction results and meal suggestions, or the accepted job
     """
     logger.info("Processing combined extract-and-suggest request")
     
-    # Extract ingredients
-    extraction_result = await extract_ingredients(agent_service, image_service, image)
+    # Read the image while the upload is available; the rest may run as a job
+    mime_type = await image_service.validate_upload(image)
+    prepared = await image_service.prepare(image.file, mime_type)
     
     # Parse dietary preferences
     preferences_list = None
     if dietary_preferences:
         preferences_list = [p.strip() for p in dietary_preferences.split(",") if p.strip()]
     
-    # Get meal suggestions
-    ingredient_names = [ing.name for ing in extraction_result.ingredients]
-    suggestions_result = await agent_service.suggest_meals(
-        ingredients=ingredient_names,
-        servings=servings,
-        dietary_preferences=preferences_list,
-    )
+    async def run() -> ExtractAndSuggestResult:
+        # Extract ingredients
+        extraction_result = await agent_service.extract_ingredients(prepared.data, prepared.mime_type)
+        
+        # Get meal suggestions
+        ingredient_names = [ing.name for ing in extraction_result.ingredients]
+        suggestions_result = await agent_service.suggest_meals(
+            ingredients=ingredient_names,
+            servings=servings,
+            dietary_preferences=preferences_list,
+        )
+        
+        logger.info("Successfully completed combined extract-and-suggest request")
+        
+        return ExtractAndSuggestResult(extraction=extraction_result, suggestions=suggestions_result)
     
-    logger.info("Successfully completed combined extract-and-suggest request")
+    if job:
+        return await _submit_job(jobs, "extract-and-suggest", run, idempotency_key)
+    return ModelResponse(await run())
+
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0.0, ge=0.0, description="Seconds to wait for the job to finish (long-poll)"),
+    jobs: JobQueueDep = None,
+) -> ModelResponse:
+    """
+    Get the state of a job, with its result or error once finished.
+    
+    Args:
+        job_id: ID returned when the job was submitted
+        wait: Seconds to wait for an unfinished job, capped by `jobs_max_wait_seconds`
+        jobs: Injected job queue
+        
+    Returns:
+        Job state
+    """
+    return ModelResponse(await jobs.get(job_id, wait))
+
+
+@router.websocket("/session")
+async def kitchen_session(
+    websocket: WebSocket,
+    sessions: SessionManagerDep,
+    agent_service: AgentServiceDep,
+    image_service: ImageServiceDep,
+) -> None:
+    """
+    Run the photo -> suggestions -> recipe flow over one WebSocket.
+    
+    Client messages: a binary frame is a fridge photo; text frames are JSON
+    `options`, `suggest` and `recipe` messages (see `app.models.api`). The
+    server answers a photo with `extraction` and then `suggestions`, a
+    `suggest` with `suggestions`, and a `recipe` with the `title`,
+    `ingredients`, `step` and `recipe` events of the recipe stream. Dishes
+    are referenced by the `suggestion_id` suggested in the session. Failures
+    are sent as `error` messages and the session goes on.
+    
+    Args:
+        websocket: Client connection
+        sessions: Injected session manager
+        agent_service: Injected agent service
+        image_service: Injected image service
+    """
+    await websocket.accept()
+    session = sessions.open()
+    if session is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many sessions")
+        return
+    
+    try:
+        await _send_event(
+            websocket,
+            "ready",
+            session_id=session.session_id,
+            idle_timeout_seconds=sessions.idle_timeout,
+            max_image_bytes=image_service.max_size,
+        )
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), sessions.idle_timeout)
+            except asyncio.TimeoutError:
+                sessions.closed_idle += 1
+                await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Idle timeout")
+                return
+            if message["type"] == "websocket.disconnect":
+                return
+            
+            sessions.messages += 1
+            try:
+                await _handle_session_message(websocket, session, message, agent_service, image_service)
+            except HolodilnikException as e:
+                sessions.errors += 1
+                await _send_event(
+                    websocket,
+                    "error",
+                    error=e.__class__.__name__,
+                    message=e.message,
+                    details=e.details,
+                )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sessions.close(session)
+
+
+async def _send_event(websocket: WebSocket, event: str, **fields: Any) -> None:
+    """Send a session message; models among the fields are serialized by pydantic-core."""
+    await websocket.send_text(to_json({"type": event, **fields}).decode())
+
+
+async def _handle_session_message(
+    websocket: WebSocket,
+    session: KitchenSession,
+    message: dict,
+    agent_service: AgentService,
+    image_service: ImageService,
+) -> None:
+    """Act on one client message of a session."""
+    data = message.pop("bytes", None)
+    if data is not None:
+        # The photo is only held until it is prepared, the prepared copy until extraction
+        mime_type = image_service.validate_bytes(data)
+        prepared = await image_service.prepare(data, mime_type)
+        del data
+        extraction = await agent_service.extract_ingredients(prepared.data, prepared.mime_type)
+        del prepared
+        session.ingredients = [ingredient.name for ingredient in extraction.ingredients]
+        await _send_event(websocket, "extraction", data=extraction)
+        await _suggest(websocket, session, agent_service)
+        return
     
-    return {
-        "extraction": extraction_result.model_dump(),
-        "suggestions": suggestions_result.model_dump(),
-    }
+    try:
+        request = SESSION_MESSAGE.validate_json(message.get("text") or "")
+    except ValidationError as e:
+        raise InvalidMessageError(
+            "Invalid session message",
+            details={"errors": e.errors(include_url=False, include_context=False)},
+        )
+    
+    if isinstance(request, (SessionOptions, SessionSuggest)):
+        if request.servings is not None:
+            session.servings = request.servings
+        if request.dietary_preferences is not None:
+            session.dietary_preferences = request.dietary_preferences
+    if isinstance(request, SessionSuggest):
+        if request.ingredients is not None:
+            session.ingredients = request.ingredients
+        await _suggest(websocket, session, agent_service)
+    elif isinstance(request, SessionRecipe):
+        # The dish details come from the session, not from the client or the store
+        dish = session.dish(request.suggestion_id)
+        events = await agent_service.stream_recipe(
+            suggestion_id=dish.suggestion_id,
+            title=dish.title,
+            context_summary=dish.short_description,
+            servings=request.servings or session.servings,
+        )
+        # A failed send must not leave the stream holding its slot and upstream response until GC
+        async with aclosing(events):
+            async for event, payload in events:
+                await _send_event(websocket, event, suggestion_id=dish.suggestion_id, data=payload)
+
 
+async def _suggest(websocket: WebSocket, session: KitchenSession, agent_service: AgentService) -> None:
+    """Suggest dishes for the session's ingredients and remember them."""
+    if not session.ingredients:
+        raise InvalidMessageError("No ingredients yet: send a photo or a suggest message with ingredients")
+    suggestions = await agent_service.suggest_meals(
+        ingredients=session.ingredients,
+        servings=session.servings,
+        dietary_preferences=session.dietary_preferences,
+    )
+    session.remember(suggestions)
+    await _send_event(websocket, "suggestions", data=suggestions)
@@ -1,5 +1,6 @@
 from pathlib import Path
 from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -21,9 +22,115 @@ class Settings(BaseSettings):
     openai_timeout: int = 60
     openai_max_retries: int = 3
     
+    # OpenAI Connection Pool
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry: float = 30.0
+    openai_http2: bool = False  # Requires the `http2` extra (h2 package)
+    openai_prewarm_connections: int = 0
+    
+    # Upstream Endpoints (failover and hedging across OPENAI_BASE_URLS)
+    openai_base_urls: list[str] = []  # Overrides openai_base_url when set, e.g. '["https://a/v1","https://b/v1"]'
+    upstream_hedge_enabled: bool = True
+    upstream_hedge_percentile: float = 0.95  # Duplicate a call still running after this latency percentile
+    upstream_hedge_min_delay_seconds: float = 1.0
+    upstream_ewma_alpha: float = 0.2
+    upstream_breaker_failures: int = 5  # Consecutive failures before an endpoint is ejected
+    upstream_breaker_cooldown_seconds: float = 30.0
+    
+    # Models per tool (AGENT_MODEL when unset)
+    vision_model: Optional[str] = None
+    suggestion_model: Optional[str] = None
+    recipe_model: Optional[str] = None
+    
+    # Adaptive Model Router (downgrade a tool to its fast model when over its latency budget)
+    model_router_enabled: bool = False
+    vision_fast_model: Optional[str] = None
+    suggestion_fast_model: Optional[str] = None
+    recipe_fast_model: Optional[str] = None
+    vision_latency_budget_seconds: float = 15.0  # p95 of the primary model
+    suggestion_latency_budget_seconds: float = 8.0
+    recipe_latency_budget_seconds: float = 20.0
+    model_router_probe_ratio: float = 0.1  # Share of calls still sent to the primary model while downgraded
+    
+    # Admission Control (concurrent upstream calls per tool)
+    admission_enabled: bool = True
+    admission_vision_concurrency: int = 8
+    admission_suggestion_concurrency: int = 16
+    admission_recipe_concurrency: int = 16
+    admission_max_queue: int = 64  # Waiting calls per tool before rejecting with 429
+    admission_max_wait_seconds: float = 10.0  # Queue wait before rejecting with 503
+    
     # Image Processing
     max_image_size_mb: int = 20
+    max_request_size_mb: int = 25  # Whole request body, checked while receiving
     allowed_image_types: list[str] = ["image/jpeg", "image/png", "image/webp", "image/gif"]
+    image_preprocess_enabled: bool = True
+    image_max_edge: int = 1568  # Longest edge sent to the vision model, in pixels
+    image_output_format: str = "JPEG"  # JPEG or WEBP
+    image_output_quality: int = 85
+    image_workers: int = 4
+    batch_max_images: int = 5  # Photos per batch extraction request
+    batch_concurrency: int = 3  # Photos of one batch processed at a time
+    
+    # Image Result Cache (perceptual hash)
+    image_cache_enabled: bool = False  # Opt-in: a near-duplicate match reuses another photo's ingredients
+    image_cache_max_entries: int = 512
+    image_cache_ttl_seconds: int = 3600
+    image_cache_max_bytes: int = 8 * 1024 * 1024
+    image_cache_max_distance: int = 1  # Max Hamming distance between 64-bit dHashes, capped at 2
+    
+    # Suggestion Result Cache
+    suggestion_cache_enabled: bool = True
+    suggestion_cache_max_entries: int = 1024
+    suggestion_cache_ttl_seconds: int = 3600
+    suggestion_similarity_enabled: bool = False  # Opt-in: a near match reuses dishes of another ingredient set
+    suggestion_similarity_threshold: float = 0.75  # Jaccard similarity to exceed; one extra in four is 0.8, a swap 0.6
+    suggestion_similarity_max_entries: int = 20_000
+    
+    # Shared Cache (SQLite file shared by the worker processes of a host, opt-in)
+    shared_cache_enabled: bool = False
+    shared_cache_path: Path = BASE_DIR / "data" / "shared_cache.db"
+    shared_cache_max_bytes: int = 256 * 1024 * 1024  # Encoded results; least recently used are evicted
+    shared_cache_ttl_seconds: int = 24 * 3600
+    
+    # Suggestion and Recipe Store (SQLite)
+    store_path: Path = BASE_DIR / "data" / "holodilnik.db"
+    store_retention_days: int = 30  # Served suggestions; generated recipes are kept
+    
+    # Recipe Search (in-memory index of stored recipes)
+    recipe_search_enabled: bool = True
+    recipe_search_max_recipes: int = 20_000  # Most recent recipes indexed per worker, loaded at startup
+    
+    # Jobs (asynchronous mode of long-running endpoints)
+    job_store_path: Path = BASE_DIR / "data" / "jobs.db"  # Shared by the worker processes of a host
+    jobs_workers: int = 8  # Jobs running concurrently per process
+    jobs_max_queued: int = 256  # Waiting jobs per process before rejecting with 429
+    jobs_result_ttl_seconds: int = 600  # How long a finished job can be fetched
+    jobs_max_entries: int = 10_000  # Finished jobs kept in memory per process
+    jobs_max_wait_seconds: float = 30.0  # Longest long-poll on GET /jobs/{id}
+    
+    # Sessions (WebSocket flow at /api/v1/session)
+    session_max_connections: int = 1000  # Open sessions per process; more are closed with 1013
+    session_idle_timeout_seconds: float = 300.0  # A session waiting this long for a message is closed
+    session_max_dishes: int = 50  # Suggested dishes remembered per session, oldest forgotten first
+    
+    # Recipe Prefetch (speculative, opt-in)
+    prefetch_enabled: bool = False
+    prefetch_top_n: int = 2
+    prefetch_max_inflight: int = 4
+    prefetch_budget_per_minute: int = 30
+    prefetch_ttl_seconds: int = 600
+    prefetch_max_entries: int = 256
+    
+    # Response Compression
+    compression_enabled: bool = True
+    compression_min_size: int = 512  # Smaller bodies are sent uncompressed
+    compression_encodings: list[str] = ["br", "zstd", "gzip"]  # In order of preference; br and zstd need the `compression` extra
+    compression_cache_max_bytes: int = 16 * 1024 * 1024  # Compressed bodies kept per worker, keyed by ETag
+    
+    # Metrics
+    metrics_enabled: bool = True  # Prometheus exposition at /metrics
     
     # CORS
     cors_origins: list[str] = ["*"]  # In production, specify exact origins
@@ -0,0 +1,259 @@
+"""Negotiated response compression with ETags and a cache of compressed bodies."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import Settings
+from app.utils.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # Optional: `uv sync --extra compression`
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: `uv sync --extra compression`
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Close to gzip's speed, smaller output on short JSON
+ZSTD_LEVEL = 3
+CACHE_TTL_SECONDS = 3600
+CACHE_MAX_ENTRIES = 100_000
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+STREAMING_TYPES = ("text/event-stream",)  # Must reach the client as it is produced
+
+
+def _compressors() -> dict[str, Callable[[bytes], bytes]]:
+    compressors: dict[str, Callable[[bytes], bytes]] = {
+        # mtime=0: the same body always compresses to the same bytes
+        "gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+    }
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+    if zstandard is not None:
+        zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        compressors["zstd"] = zstd.compress
+    return compressors
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Map each coding of an Accept-Encoding header to its quality value."""
+    qualities: dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+class ResponseCompressor:
+    """
+    Chooses, produces and caches compressed representations of response bodies.
+
+    The entity tag of a body is a digest of its uncompressed bytes; a
+    compressed representation gets the coding appended (`"<digest>-br"`), so
+    every representation has its own strong ETag. Compressed bodies are
+    cached under the digest and coding: the same recipe served again, to any
+    client, is compressed only once. Only tagged (GET) bodies are cached;
+    one-off POST bodies such as fresh suggestions would only evict them.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize with the configured codings, keeping those that are installed."""
+        available = _compressors()
+        unavailable = [c for c in settings.compression_encodings if c not in available]
+        if unavailable:
+            logger.info(f"Compression codings not installed, skipped: {', '.join(unavailable)}")
+        self.encodings = [c for c in settings.compression_encodings if c in available]
+        self.min_size = settings.compression_min_size
+        self._compressors = available
+        self._cache: TTLCache[tuple[str, str], bytes] = TTLCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            ttl_seconds=CACHE_TTL_SECONDS,
+            max_bytes=settings.compression_cache_max_bytes,
+            sizeof=len,
+        )
+        self.compressed = dict.fromkeys(self.encodings, 0)
+        self.uncompressed = 0
+        self.not_modified = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Return the most acceptable configured coding, ties going to the configured order."""
+        if not accept_encoding:
+            return None
+        qualities = parse_accept_encoding(accept_encoding)
+        wildcard = qualities.get("*", 0.0)
+        best, best_quality = None, 0.0
+        for coding in self.encodings:
+            quality = qualities.get(coding, wildcard)
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def compress(self, digest: Optional[str], coding: str, body: bytes) -> bytes:
+        """Return the body compressed with `coding`, through the cache if its digest is given."""
+        if digest is None:
+            data = self._compressors[coding](body)
+        else:
+            key = (digest, coding)
+            data = self._cache.get(key)
+            if data is None:
+                data = self._compressors[coding](body)
+                self._cache.set(key, data)
+        self.compressed[coding] += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(data)
+        return data
+
+    def stats(self) -> dict:
+        """Return counters per coding, the compression ratio and cache usage."""
+        return {
+            "compressed": dict(self.compressed),
+            "uncompressed": self.uncompressed,
+            "not_modified": self.not_modified,
+            "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 0.0,
+            "cache": self._cache.stats(),
+        }
+
+
+def digest_body(body: bytes) -> str:
+    """Entity tag value of an uncompressed body."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match: str, digest: str) -> bool:
+    """
+    Whether an If-None-Match header matches a body, whatever coding it was received with.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        tag = tag.removeprefix("W/").strip('"')
+        if tag.partition("-")[0] == digest:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON and text responses and answer unchanged GETs with 304.
+
+    A response body is buffered until complete, then compressed with the
+    coding negotiated from Accept-Encoding if it is at least
+    `compression_min_size` bytes. Successful GET responses get a strong ETag,
+    and a matching If-None-Match is answered with 304 Not Modified and no
+    body. Event streams and responses that already carry a Content-Encoding
+    are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, compressor: ResponseCompressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        accept_encoding = request_headers.get("accept-encoding", "")
+        if_none_match = request_headers.get("if-none-match")
+        conditional = scope["method"] == "GET"
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+        passthrough = False
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if not self._eligible(Headers(raw=message["headers"])):
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._send(send, start, b"".join(chunks), accept_encoding, if_none_match, conditional)
+
+        await self.app(scope, receive, buffered_send)
+
+    @staticmethod
+    def _eligible(headers: Headers) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and not content_type.startswith(STREAMING_TYPES)
+        )
+
+    async def _send(
+        self,
+        send: Send,
+        start: Message,
+        body: bytes,
+        accept_encoding: str,
+        if_none_match: Optional[str],
+        conditional: bool,
+    ) -> None:
+        compressor = self.compressor
+        status = start["status"]
+        headers = MutableHeaders(raw=list(start["headers"]))
+        headers.add_vary_header("Accept-Encoding")
+        coding = compressor.negotiate(accept_encoding) if len(body) >= compressor.min_size else None
+        tagged = conditional and status == 200
+        # Untagged bodies are not served again as they are: neither hash nor cache them
+        digest = digest_body(body) if tagged else None
+
+        if tagged:
+            headers["ETag"] = f'"{digest}-{coding}"' if coding is not None else f'"{digest}"'
+            if if_none_match is not None and etag_matches(if_none_match, digest):
+                compressor.not_modified += 1
+                for name in ("content-length", "content-type"):
+                    del headers[name]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if coding is not None:
+            body = compressor.compress(digest, coding, body)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+        else:
+            compressor.uncompressed += 1
+        await send({"type": "http.response.start", "status": status, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
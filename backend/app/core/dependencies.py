@@ -1,38 +1,58 @@
 from typing import Annotated
 from fastapi import Depends
+from starlette.requests import HTTPConnection
 
 from app.config import Settings, get_settings
 from app.services.openai_client import OpenAIClient
 from app.services.agent_service import AgentService
 from app.services.image_service import ImageService
+from app.services.jobs import JobQueue
+from app.services.sessions import SessionManager
 
 # Settings dependency
 SettingsDep = Annotated[Settings, Depends(get_settings)]
 
 
 # OpenAI Client
-def get_openai_client(settings: SettingsDep) -> OpenAIClient:
-    """Get OpenAI client instance."""
-    return OpenAIClient(settings)
+def get_openai_client(request: HTTPConnection) -> OpenAIClient:
+    """Get the shared OpenAI client created in the application lifespan."""
+    return request.app.state.openai_client
 
 
 OpenAIClientDep = Annotated[OpenAIClient, Depends(get_openai_client)]
 
 
 # Agent Service
-def get_agent_service(openai_client: OpenAIClientDep) -> AgentService:
-    """Get agent service instance."""
-    return AgentService(openai_client)
+def get_agent_service(request: HTTPConnection) -> AgentService:
+    """Get the shared agent service created in the application lifespan."""
+    return request.app.state.agent_service
 
 
 AgentServiceDep = Annotated[AgentService, Depends(get_agent_service)]
 
 
 # Image Service
-def get_image_service(settings: SettingsDep) -> ImageService:
-    """Get image service instance."""
-    return ImageService(settings)
+def get_image_service(request: HTTPConnection) -> ImageService:
+    """Get the shared image service created in the application lifespan."""
+    return request.app.state.image_service
 
 
 ImageServiceDep = Annotated[ImageService, Depends(get_image_service)]
 
+
+# Job Queue
+def get_job_queue(request: HTTPConnection) -> JobQueue:
+    """Get the job queue created in the application lifespan."""
+    return request.app.state.job_queue
+
+
+JobQueueDep = Annotated[JobQueue, Depends(get_job_queue)]
+
+
+# Session Manager
+def get_session_manager(request: HTTPConnection) -> SessionManager:
+    """Get the WebSocket session manager created in the application lifespan."""
+    return request.app.state.session_manager
+
+
+SessionManagerDep = Annotated[SessionManager, Depends(get_session_manager)]
@@ -19,3 +19,26 @@ class AIServiceError(HolodilnikException):
     """Raised when AI service encounters an error."""
     pass
 
+
+class NotFoundError(HolodilnikException):
+    """Raised when a requested resource does not exist."""
+    pass
+
+
+class InvalidMessageError(HolodilnikException):
+    """Raised when a session message is malformed or out of place."""
+    pass
+
+
+
+class OverloadedError(AIServiceError):
+    """Raised when an upstream call waited too long for capacity."""
+    
+    def __init__(self, message: str, details: dict | None = None, retry_after: int = 1):
+        self.retry_after = retry_after
+        super().__init__(message, details)
+
+
+class QueueFullError(OverloadedError):
+    """Raised when an upstream call is rejected because its queue is full."""
+    pass
@@ -0,0 +1,202 @@
+"""Prometheus metrics and the middleware that records request latency."""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+import httpx
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    disable_created_metrics,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# `_created` series double the exposition size and are not used by our dashboards
+disable_created_metrics()
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+SIZE_BUCKETS = tuple(2 ** power for power in range(12, 26))  # 4 KiB .. 32 MiB
+
+HTTP_REQUEST_DURATION = Histogram(
+    "holodilnik_http_request_duration_seconds",
+    "Time to handle an HTTP request, including streamed bodies",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "holodilnik_http_requests_in_flight",
+    "HTTP requests being handled",
+    registry=REGISTRY,
+)
+UPSTREAM_DURATION = Histogram(
+    "holodilnik_upstream_request_duration_seconds",
+    "Time of an upstream model call per tool and model, retries included",
+    ("tool", "model", "outcome"),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "holodilnik_upstream_requests_in_flight",
+    "Upstream model calls in progress per tool",
+    ("tool",),
+    registry=REGISTRY,
+)
+UPSTREAM_RETRIES = Counter(
+    "holodilnik_upstream_retries_total",
+    "Upstream HTTP attempts that were retries of a failed attempt",
+    ("tool",),
+    registry=REGISTRY,
+)
+TOKENS = Counter(
+    "holodilnik_tokens_total",
+    "Tokens reported by the upstream usage per tool and model",
+    ("tool", "model", "kind"),
+    registry=REGISTRY,
+)
+IMAGE_BYTES = Histogram(
+    "holodilnik_image_bytes",
+    "Image payload size: upload as received, prepared after preprocessing, "
+    "request as the base64-encoded vision request body",
+    ("stage",),
+    buckets=SIZE_BUCKETS,
+    registry=REGISTRY,
+)
+
+T = TypeVar("T")
+
+# Tool of the upstream request running in the current task, for the httpx hook
+_current_tool: contextvars.ContextVar[str] = contextvars.ContextVar("upstream_tool", default="other")
+
+
+class UpstreamCall:
+    """Handle of a tracked upstream call, used to record its token usage."""
+
+    __slots__ = ("tool", "model")
+
+    def __init__(self, tool: str, model: str) -> None:
+        self.tool = tool
+        self.model = model
+
+    async def request(self, upstream_request: Awaitable[T]) -> T:
+        """
+        Await an upstream request, labelling its retried attempts with this call's tool.
+
+        The tool is only set for the request itself: a context variable set
+        around a `yield` cannot be reset when a generator is closed elsewhere.
+        """
+        token = _current_tool.set(self.tool)
+        try:
+            return await upstream_request
+        finally:
+            _current_tool.reset(token)
+
+    def record_usage(self, usage: Any) -> None:
+        """Count prompt and completion tokens from a `usage` object, if present."""
+        if usage is None:
+            return
+        TOKENS.labels(self.tool, self.model, "prompt").inc(usage.prompt_tokens or 0)
+        TOKENS.labels(self.tool, self.model, "completion").inc(usage.completion_tokens or 0)
+
+
+@contextmanager
+def track_upstream(tool: str, model: str) -> Iterator[UpstreamCall]:
+    """Time an upstream call of a tool to a model and keep it in the in-flight gauge."""
+    in_flight = UPSTREAM_IN_FLIGHT.labels(tool)
+    in_flight.inc()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield UpstreamCall(tool, model)
+        outcome = "ok"
+    finally:
+        UPSTREAM_DURATION.labels(tool, model, outcome).observe(time.perf_counter() - start)
+        in_flight.dec()
+
+
+async def count_retry(request: httpx.Request) -> None:
+    """httpx request hook counting retried attempts of the OpenAI client."""
+    retries = request.headers.get("x-stainless-retry-count")
+    if retries is not None and retries != "0":
+        UPSTREAM_RETRIES.labels(_current_tool.get()).inc()
+
+
+class StatsCollector:
+    """
+    Export service counters from a `stats()` dict at scrape time.
+
+    Nested numeric values become gauges named after their path, e.g.
+    `holodilnik_image_cache_hits`. Nothing is recorded on the request path.
+    """
+
+    def __init__(self, stats: Callable[[], dict]):
+        self._stats = stats
+
+    def describe(self) -> list:
+        return []
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        for name, value in self._flatten("holodilnik", self._stats()):
+            yield GaugeMetricFamily(name, f"Service stat {name}", value=value)
+
+    def _flatten(self, prefix: str, stats: dict) -> Iterator[tuple[str, float]]:
+        for key, value in stats.items():
+            name = f"{prefix}_{key}"
+            if isinstance(value, dict):
+                yield from self._flatten(name, value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield name, float(value)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the text exposition of all metrics and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Record latency and in-flight count of HTTP requests.
+
+    Requests are labelled by route template (e.g. `/api/v1/recipes/{suggestion_id}`),
+    not by raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+
+        async def recording_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code or 500),
+            ).observe(time.perf_counter() - start)
+            HTTP_REQUESTS_IN_FLIGHT.dec()
@@ -1,8 +1,17 @@
 import logging
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.exceptions import HolodilnikException, ImageValidationError, AIServiceError
+from app.core.exceptions import (
+    HolodilnikException,
+    ImageValidationError,
+    InvalidMessageError,
+    AIServiceError,
+    NotFoundError,
+    OverloadedError,
+    QueueFullError,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +38,17 @@ async def holodilnik_exception_handler(request: Request, exc: HolodilnikExceptio
     
     # Determine status code based on exception type
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-    if isinstance(exc, ImageValidationError):
+    headers = None
+    if isinstance(exc, (ImageValidationError, InvalidMessageError)):
         status_code = status.HTTP_400_BAD_REQUEST
+    elif isinstance(exc, NotFoundError):
+        status_code = status.HTTP_404_NOT_FOUND
+    elif isinstance(exc, QueueFullError):
+        status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        headers = {"Retry-After": str(exc.retry_after)}
+    elif isinstance(exc, OverloadedError):
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        headers = {"Retry-After": str(exc.retry_after)}
     elif isinstance(exc, AIServiceError):
         status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
     
@@ -40,6 +58,74 @@ async def holodilnik_exception_handler(request: Request, exc: HolodilnikExceptio
             "error": exc.__class__.__name__,
             "message": exc.message,
             "details": exc.details,
-        }
+        },
+        headers=headers,
     )
 
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies larger than a limit while they are being received.
+    
+    Requests declaring a larger Content-Length are refused before any body
+    byte is read. Otherwise the body is counted as it streams in, and once
+    the limit is crossed the application sees a client disconnect and the
+    client gets a 413 instead, so oversized uploads are never fully spooled.
+    """
+    
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._reject(int(content_length))(scope, receive, send)
+            return
+        
+        received = 0
+        rejected = False
+        response_started = False
+        
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    rejected = True
+                    return {"type": "http.disconnect"}
+            return message
+        
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if rejected and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+        
+        if rejected and not response_started:
+            await self._reject(received)(scope, receive, send)
+    
+    def _reject(self, size: int) -> JSONResponse:
+        logger.warning(f"Request body rejected: {size} bytes (max: {self.max_body_size})")
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={
+                "error": "PayloadTooLarge",
+                "message": f"Request body too large (max: {self.max_body_size / 1024 / 1024:.0f}MB)",
+                "details": {"size_bytes": size, "max_bytes": self.max_body_size},
+            },
+            headers={"Connection": "close"},
+        )
@@ -0,0 +1,24 @@
+"""Response classes serializing pydantic models without a second validation pass."""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class ModelResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core in one pass.
+
+    Returning a response instead of a model skips FastAPI's response handling,
+    which validates the model again against `response_model`, dumps it to
+    Python objects and encodes those with the stdlib `json` module. Here the
+    already validated model (or a dict/list of models) is serialized straight
+    to UTF-8 bytes. The body is byte for byte the one `JSONResponse` produced,
+    except that floats in exponent notation are written `1e-7`, not `1e-07`.
+    Keep `response_model` on the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize models, dicts, lists and scalars to compact JSON."""
+        return to_json(content)
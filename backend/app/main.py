@@ -1,11 +1,26 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
+from app.core.compression import CompressionMiddleware, ResponseCompressor
 from app.core.exceptions import HolodilnikException
-from app.core.middleware import holodilnik_exception_handler
+from app.core.metrics import REGISTRY as METRICS_REGISTRY, MetricsMiddleware, StatsCollector, render_metrics
+from app.core.middleware import BodySizeLimitMiddleware, holodilnik_exception_handler
 from app.api.routes import router
+from app.services.openai_client import OpenAIClient
+from app.services.agent_service import AgentService
+from app.services.image_cache import PerceptualImageCache
+from app.services.suggestion_cache import SuggestionCache
+from app.services.recipe_store import RecipeStore
+from app.services.shared_cache import SharedResultCache
+from app.services.recipe_index import RecipeIndex
+from app.services.prefetch import RecipePrefetcher
+from app.services.admission import AdmissionController
+from app.services.image_service import ImageService
+from app.services.job_store import JobStore
+from app.services.jobs import JobQueue
+from app.services.sessions import SessionManager
 from app.utils.logging import setup_logging
 
 
@@ -17,10 +32,63 @@ async def lifespan(app: FastAPI):
     # Setup logging
     setup_logging(settings.log_level)
     
-    # Startup
-    yield
+    # Startup: process-wide services sharing one upstream connection pool
+    openai_client = OpenAIClient(settings)
+    await openai_client.warmup()
+    store = RecipeStore(settings)
+    await store.open()
+    job_store = JobStore(settings)
+    await job_store.open()
+    shared_cache = None
+    if settings.shared_cache_enabled:
+        shared_cache = SharedResultCache(settings)
+        await shared_cache.open()
+    recipe_index = None
+    if settings.recipe_search_enabled:
+        recipe_index = RecipeIndex(settings.recipe_search_max_recipes)
+        recipe_index.add_all(await store.load_recipes(settings.recipe_search_max_recipes))
+    app.state.openai_client = openai_client
+    app.state.agent_service = AgentService(
+        openai_client,
+        image_cache=PerceptualImageCache(settings) if settings.image_cache_enabled else None,
+        suggestion_cache=SuggestionCache(settings) if settings.suggestion_cache_enabled else None,
+        store=store,
+        prefetcher=RecipePrefetcher(settings) if settings.prefetch_enabled else None,
+        admission=AdmissionController(settings) if settings.admission_enabled else None,
+        recipe_index=recipe_index,
+        shared_cache=shared_cache,
+    )
+    app.state.image_service = ImageService(settings)
+    app.state.job_queue = JobQueue(settings, job_store)
+    app.state.job_queue.start()
+    app.state.session_manager = SessionManager(settings)
+    stats_collector = StatsCollector(lambda: collect_stats(app))
+    METRICS_REGISTRY.register(stats_collector)
     
-    # Shutdown (if needed)
+    try:
+        yield
+    finally:
+        # Shutdown
+        METRICS_REGISTRY.unregister(stats_collector)
+        await app.state.job_queue.close()
+        await app.state.agent_service.close()
+        await openai_client.close()
+        await store.close()
+        await job_store.close()
+        if shared_cache is not None:
+            await shared_cache.close()
+        app.state.image_service.close()
+
+
+def collect_stats(app: FastAPI) -> dict:
+    """Counters of the shared services, as served by /stats."""
+    stats = app.state.agent_service.stats()
+    stats["jobs"] = app.state.job_queue.stats()
+    stats["sessions"] = app.state.session_manager.stats()
+    compressor = getattr(app.state, "compressor", None)
+    if compressor is not None:
+        stats["compression"] = compressor.stats()
+    return stats
 
 
 def create_app() -> FastAPI:
@@ -44,6 +112,21 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Reject oversized uploads while they stream in
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        max_body_size=settings.max_request_size_mb * 1024 * 1024,
+    )
+    
+    # Negotiate gzip/br/zstd and answer unchanged GETs with 304
+    if settings.compression_enabled:
+        app.state.compressor = ResponseCompressor(settings)
+        app.add_middleware(CompressionMiddleware, compressor=app.state.compressor)
+    
+    # Record request latency (outermost, so rejected requests are counted too)
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+    
     # Add exception handlers
     app.add_exception_handler(HolodilnikException, holodilnik_exception_handler)
     
@@ -59,6 +142,20 @@ def create_app() -> FastAPI:
             "version": settings.app_version,
         }
     
+    # Cache and service counters
+    @app.get("/stats")
+    async def service_stats(request: Request):
+        """Service cache statistics."""
+        return collect_stats(request.app)
+    
+    # Prometheus exposition
+    if settings.metrics_enabled:
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            """Prometheus metrics."""
+            body, content_type = render_metrics()
+            return Response(content=body, media_type=content_type)
+    
     return app
 
 
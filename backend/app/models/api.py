@@ -1,5 +1,5 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class SuggestMealsRequest(BaseModel):
@@ -14,7 +14,39 @@ class BuildRecipeRequest(BaseModel):
     """Request body for building a detailed recipe."""
 
     suggestion_id: str = Field(..., description="ID of the selected dish suggestion")
-    title: str = Field(..., description="Title of the dish")
-    context_summary: str = Field(..., description="Context about the dish selection")
+    title: Optional[str] = Field(None, description="Title of the dish (looked up by suggestion_id if omitted)")
+    context_summary: Optional[str] = Field(None, description="Context about the dish selection")
     servings: Optional[int] = Field(None, ge=1, description="Number of servings")
 
+
+
+class SessionOptions(BaseModel):
+    """Session message setting defaults for the suggestions and recipes that follow."""
+
+    type: Literal["options"]
+    servings: Optional[int] = Field(None, ge=1, description="Number of servings")
+    dietary_preferences: Optional[List[str]] = Field(None, description="Dietary restrictions or preferences")
+
+
+class SessionSuggest(BaseModel):
+    """Session message asking for new suggestions."""
+
+    type: Literal["suggest"]
+    ingredients: Optional[List[str]] = Field(
+        None, min_length=1, description="Ingredients to use instead of those extracted from the photo"
+    )
+    servings: Optional[int] = Field(None, ge=1, description="Number of servings")
+    dietary_preferences: Optional[List[str]] = Field(None, description="Dietary restrictions or preferences")
+
+
+class SessionRecipe(BaseModel):
+    """Session message asking for the recipe of a dish suggested in the session."""
+
+    type: Literal["recipe"]
+    suggestion_id: str = Field(..., description="ID of a dish suggested in this session")
+    servings: Optional[int] = Field(None, ge=1, description="Number of servings")
+
+
+SESSION_MESSAGE = TypeAdapter(
+    Annotated[Union[SessionOptions, SessionSuggest, SessionRecipe], Field(discriminator="type")]
+)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import uuid
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
+
+from app.utils.text import normalize_ingredient
 
 
 class DetectedIngredient(BaseModel):
@@ -14,43 +17,120 @@ class DetectedIngredient(BaseModel):
     notes: Optional[str] = None
 
 
-class ExtractIngredientsResult(BaseModel):
-    """Structured response produced by the vision tool."""
+class ExtractionDraft(BaseModel):
+    """Ingredients as detected by the vision tool."""
 
     ingredients: List[DetectedIngredient]
     unsure_items: List[str] = Field(default_factory=list)
     spoiled_items: List[str] = Field(default_factory=list)
+    # Set by the service, left out of the schema sent upstream
+    model: SkipJsonSchema[Optional[str]] = None
 
 
-class DishSummary(BaseModel):
-    """Short representation of a suggested dish."""
+class ExtractIngredientsResult(ExtractionDraft):
+    """Structured response produced by the vision tool."""
+
+    model: Optional[str] = None
+
+    @classmethod
+    def from_draft(cls, draft: ExtractionDraft) -> ExtractIngredientsResult:
+        """Convert validated tool output to API result."""
+        return cls.model_validate(draft.model_dump())
+
+    @classmethod
+    def merge(cls, results: list[ExtractIngredientsResult]) -> ExtractIngredientsResult:
+        """
+        Combine results of several photos into one.
+
+        Ingredients are deduplicated by normalized name, keeping the entry with
+        the highest confidence; unsure and spoiled items are unioned. First-seen
+        order is preserved.
+        """
+        ingredients: dict[str, DetectedIngredient] = {}
+        unsure_items: dict[str, str] = {}
+        spoiled_items: dict[str, str] = {}
+        models: dict[str, None] = {}
+        for result in results:
+            if result.model:
+                models[result.model] = None
+            for ingredient in result.ingredients:
+                key = normalize_ingredient(ingredient.name)
+                current = ingredients.get(key)
+                if current is None or ingredient.confidence > current.confidence:
+                    ingredients[key] = ingredient
+            for item in result.unsure_items:
+                unsure_items.setdefault(normalize_ingredient(item), item)
+            for item in result.spoiled_items:
+                spoiled_items.setdefault(normalize_ingredient(item), item)
+        return cls(
+            ingredients=list(ingredients.values()),
+            unsure_items=list(unsure_items.values()),
+            spoiled_items=list(spoiled_items.values()),
+            model=",".join(models) or None,
+        )
+
+
+class ImageExtractionError(BaseModel):
+    """Failure of a single image in a batch extraction."""
+
+    index: int
+    filename: Optional[str] = None
+    error: str
+    message: str
+
+
+class BatchExtractIngredientsResult(ExtractIngredientsResult):
+    """Merged extraction result of several photos with per-image failures."""
+
+    images_processed: int
+    errors: List[ImageExtractionError] = Field(default_factory=list)
+
+
+class DishDraft(BaseModel):
+    """Dish suggestion as generated by the suggestion tool, before it gets an id."""
 
-    suggestion_id: str
     title: str
     short_description: str
     estimated_time_minutes: int = Field(ge=1)
     confidence: float = Field(ge=0.0, le=1.0)
 
 
+class DishSuggestions(BaseModel):
+    """Raw output of the suggestion tool."""
+
+    dishes: List[DishDraft]
+    model: SkipJsonSchema[Optional[str]] = None
+
+
+class DishSummary(DishDraft):
+    """Short representation of a suggested dish."""
+
+    suggestion_id: str
+
+
 class SuggestionsResult(BaseModel):
     """Structured output from the suggestion tool."""
 
     dishes: List[DishSummary]
+    model: Optional[str] = None
 
     @classmethod
-    def from_agent_result(cls, agent_dishes: list[dict]) -> SuggestionsResult:
-        """Convert agent result to API result by adding suggestion_id."""
-        dishes_with_ids = [
-            DishSummary(
-                suggestion_id=str(uuid.uuid4()),
-                title=dish["title"],
-                short_description=dish["short_description"],
-                estimated_time_minutes=dish["estimated_time_minutes"],
-                confidence=dish["confidence"],
-            )
-            for dish in agent_dishes
-        ]
-        return cls(dishes=dishes_with_ids)
+    def from_drafts(cls, drafts: list[DishDraft], model: Optional[str] = None) -> SuggestionsResult:
+        """Convert validated tool output to API result by adding suggestion_id."""
+        return cls(
+            dishes=[
+                DishSummary.model_validate({**draft.model_dump(), "suggestion_id": str(uuid.uuid4())})
+                for draft in drafts
+            ],
+            model=model,
+        )
+
+
+class ExtractAndSuggestResult(BaseModel):
+    """Extraction from a photo together with the suggestions for its ingredients."""
+
+    extraction: ExtractIngredientsResult
+    suggestions: SuggestionsResult
 
 
 class RecipeIngredient(BaseModel):
@@ -69,10 +149,9 @@ class RecipeStep(BaseModel):
     tip: Optional[str] = None
 
 
-class RecipeResult(BaseModel):
-    """Structured output returned by the recipe tool."""
+class RecipeDraft(BaseModel):
+    """Recipe as generated by the recipe tool, before it is tied to a suggestion."""
 
-    suggestion_id: str
     title: str
     servings: Optional[int] = None
     prep_time_minutes: int = Field(ge=0)
@@ -80,18 +159,50 @@ class RecipeResult(BaseModel):
     ingredients: List[RecipeIngredient]
     steps: List[RecipeStep]
     equipment: List[str] = Field(default_factory=list)
+    model: SkipJsonSchema[Optional[str]] = None
+
+
+class RecipeResult(RecipeDraft):
+    """Structured output returned by the recipe tool."""
+
+    suggestion_id: str
+    model: Optional[str] = None
 
     @classmethod
-    def from_agent_result(cls, agent_result: dict, suggestion_id: str) -> RecipeResult:
-        """Convert agent result to API result by adding suggestion_id from request."""
-        return cls(
-            suggestion_id=suggestion_id,
-            title=agent_result["title"],
-            servings=agent_result.get("servings"),
-            prep_time_minutes=agent_result["prep_time_minutes"],
-            cook_time_minutes=agent_result["cook_time_minutes"],
-            ingredients=[RecipeIngredient(**ing) for ing in agent_result["ingredients"]],
-            steps=[RecipeStep(**step) for step in agent_result["steps"]],
-            equipment=agent_result.get("equipment", []),
-        )
+    def from_draft(cls, draft: RecipeDraft, suggestion_id: str) -> RecipeResult:
+        """Convert validated tool output to API result by adding suggestion_id from request."""
+        return cls.model_validate({**draft.model_dump(), "suggestion_id": suggestion_id})
+
+
+class RecipeSearchHit(BaseModel):
+    """Known recipe matching a set of available ingredients."""
+
+    suggestion_id: str
+    title: str
+    coverage: float = Field(ge=0.0, le=1.0, description="Share of the recipe's ingredients available")
+    matched_ingredients: List[str]
+    missing_ingredients: List[str]
+    total_time_minutes: int
+
+
+class RecipeSearchResult(BaseModel):
+    """Recipes from the local corpus ranked by ingredient coverage."""
+
+    hits: List[RecipeSearchHit]
+    recipes_indexed: int
+
+
+class JobInfo(BaseModel):
+    """State of an asynchronous job and, once finished, its result or error."""
+
+    job_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed"] = "queued"
+    created_at: float = Field(description="Unix time of submission")
+    finished_at: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[dict] = None
 
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
@@ -0,0 +1,72 @@
+"""Structured-output formats derived once from the domain models."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Generic, Optional, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.models.domain import DishSuggestions, ExtractionDraft, RecipeDraft
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _forbid_additional_properties(node: Any) -> None:
+    """Set `additionalProperties: false` on every object schema, in place."""
+    if isinstance(node, dict):
+        if node.get("type") == "object":
+            node["additionalProperties"] = False
+        for value in node.values():
+            _forbid_additional_properties(value)
+    elif isinstance(node, list):
+        for item in node:
+            _forbid_additional_properties(item)
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseFormat(Generic[T]):
+    """
+    A `response_format` for chat completions together with its parser.
+
+    The schema is generated once per model, and `parse` validates a raw
+    completion in one pass, without an intermediate `json.loads`.
+    """
+
+    name: str
+    model: type[T]
+    response_format: dict
+    adapter: TypeAdapter[T]
+
+    def parse(self, raw: str | bytes) -> T:
+        """Validate raw completion JSON into the model."""
+        return self.adapter.validate_json(raw)
+
+
+def response_format(model: type[T], name: Optional[str] = None) -> ResponseFormat[T]:
+    """Build the response format and parser of a model."""
+    schema = model.model_json_schema()
+    _forbid_additional_properties(schema)
+    fmt = {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name or model.__name__,
+            "schema": schema,
+            "strict": False,  # ProxyAPI doesn't support strict mode
+        },
+    }
+    return ResponseFormat(
+        name=fmt["json_schema"]["name"],
+        model=model,
+        response_format=fmt,
+        adapter=TypeAdapter(model),
+    )
+
+
+EXTRACTION_FORMAT = response_format(ExtractionDraft, name="ExtractIngredientsResult")
+DISH_SUGGESTIONS_FORMAT = response_format(DishSuggestions)
+RECIPE_FORMAT = response_format(RecipeDraft, name="Recipe")
+
+REGISTRY: dict[str, ResponseFormat] = {
+    fmt.name: fmt for fmt in (EXTRACTION_FORMAT, DISH_SUGGESTIONS_FORMAT, RECIPE_FORMAT)
+}
@@ -0,0 +1,188 @@
+"""Admission control for upstream model calls."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import enum
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterator
+
+from app.config import Settings
+from app.core.exceptions import OverloadedError, QueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(enum.IntEnum):
+    """Order in which queued calls are admitted; lower goes first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "admission_priority", default=Priority.INTERACTIVE
+)
+
+
+@asynccontextmanager
+async def background_priority() -> AsyncIterator[None]:
+    """Run the enclosed upstream calls behind interactive ones."""
+    token = _priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class AdmissionLane:
+    """
+    Concurrency limit with a bounded priority queue for one kind of call.
+
+    Up to `max_concurrency` calls run at once. Further calls wait in the
+    queue, interactive ones ahead of background ones, for at most `max_wait`
+    seconds. A call is rejected right away when `max_queue` calls are already
+    waiting. Rejections carry a `retry_after` estimated from the recent time
+    a call holds its slot.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float):
+        """Initialize an empty lane."""
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._active = 0
+        self._queues: dict[Priority, deque[asyncio.Future[None]]] = {p: deque() for p in Priority}
+        self._hold_seconds = 1.0  # EWMA of slot hold time
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    @property
+    def waiting(self) -> int:
+        """Calls currently queued."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """
+        Hold a slot of this lane for the duration of the block.
+
+        Raises:
+            QueueFullError: If the queue is full
+            OverloadedError: If no slot became free within `max_wait`
+        """
+        await self._acquire(_priority.get())
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_seconds += 0.2 * (time.monotonic() - start - self._hold_seconds)
+            self._release()
+
+    def retry_after(self) -> int:
+        """Seconds until a queued call would likely be admitted."""
+        backlog = (self.waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._hold_seconds))
+
+    def stats(self) -> dict:
+        """Return lane occupancy and counters."""
+        return {
+            "active": self._active,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self._active < self.max_concurrency and not self.waiting:
+            self._active += 1
+            self.admitted += 1
+            return
+
+        if self.waiting >= self.max_queue:
+            self.rejected_full += 1
+            raise QueueFullError(
+                f"Too many pending {self.name} requests, try again later",
+                details={"tool": self.name, "waiting": self.waiting},
+                retry_after=self.retry_after(),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority]
+        queue.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait((waiter,), timeout=self.max_wait)
+        except asyncio.CancelledError:
+            if waiter.done():
+                # Cancelled right after the slot was handed over: pass it on
+                self._release()
+            else:
+                waiter.cancel()
+                queue.remove(waiter)
+            raise
+
+        if not waiter.done():
+            waiter.cancel()
+            queue.remove(waiter)
+            self.rejected_timeout += 1
+            logger.warning(f"Admission timeout for {self.name} after {self.max_wait}s")
+            raise OverloadedError(
+                f"{self.name.capitalize()} service is overloaded, try again later",
+                details={"tool": self.name, "waited_seconds": self.max_wait},
+                retry_after=self.retry_after(),
+            )
+        self.admitted += 1
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter, interactive ones first
+        for waiter in self._next_waiters():
+            waiter.set_result(None)
+            return
+        self._active -= 1
+
+    def _next_waiters(self) -> Iterator[asyncio.Future[None]]:
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue:
+                yield queue.popleft()
+
+
+class AdmissionController:
+    """Admission lanes for the vision, suggestion and recipe tools."""
+
+    def __init__(self, settings: Settings):
+        """Create one lane per tool with limits from settings."""
+        limits = {
+            "vision": settings.admission_vision_concurrency,
+            "suggestion": settings.admission_suggestion_concurrency,
+            "recipe": settings.admission_recipe_concurrency,
+        }
+        self.lanes = {
+            name: AdmissionLane(
+                name,
+                max_concurrency=limit,
+                max_queue=settings.admission_max_queue,
+                max_wait=settings.admission_max_wait_seconds,
+            )
+            for name, limit in limits.items()
+        }
+
+    def admit(self, tool: str):
+        """Return a context manager holding a slot of the tool's lane."""
+        return self.lanes[tool].admit()
+
+    def stats(self) -> dict:
+        """Return the stats of every lane."""
+        return {name: lane.stats() for name, lane in self.lanes.items()}
@@ -1,39 +1,166 @@
 from __future__ import annotations
 
 import base64
+import binascii
+import contextlib
+import functools
+import io
 import json
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, AsyncContextManager, AsyncIterator, Optional
 
-from agents import Agent, function_tool
+from openai.types.chat import ChatCompletion
 
 from app.services.openai_client import OpenAIClient
+from app.services.image_cache import PerceptualImageCache, content_digest
+from app.services.suggestion_cache import SuggestionCache, suggestion_key
+from app.services.recipe_store import RecipeStore
+from app.services.prefetch import RecipePrefetcher
+from app.services.admission import AdmissionController, background_priority
+from app.services.recipe_index import RecipeIndex
+from app.services.shared_cache import SharedResultCache, dish_key
 from app.models.domain import (
     ExtractIngredientsResult,
+    DishSuggestions,
+    DishSummary,
     SuggestionsResult,
+    RecipeIngredient,
+    RecipeStep,
+    RecipeDraft,
     RecipeResult,
+    RecipeSearchResult,
 )
-from app.core.exceptions import AIServiceError
+from app.models.response_formats import DISH_SUGGESTIONS_FORMAT, EXTRACTION_FORMAT, RECIPE_FORMAT
+from app.core.exceptions import AIServiceError, NotFoundError
+from app.core.metrics import IMAGE_BYTES, track_upstream
+from app.utils.json_stream import JSONStreamParser
+from app.utils.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from agents import Agent
 
 logger = logging.getLogger(__name__)
 
+VISION_SYSTEM_PROMPT = (
+    "Извлеки все съедобные ингредиенты, которые ты можешь определить на изображении. "
+    "Верни структурированный JSON, соответствующий схеме ExtractIngredientsResult. "
+    "ВАЖНО: Все названия ингредиентов, заметки и описания должны быть НА РУССКОМ ЯЗЫКЕ."
+)
+
+SUGGESTION_SYSTEM_PROMPT = (
+    "Предложи от трёх до пяти реалистичных блюд. "
+    "Сосредоточься на блюдах, которые в основном используют предоставленные ингредиенты. "
+    "ВАЖНО: Все названия блюд и описания должны быть НА РУССКОМ ЯЗЫКЕ."
+)
+
+RECIPE_SYSTEM_PROMPT = (
+    "Сгенерируй полный рецепт с точными количествами ингредиентов, "
+    "шагами приготовления, оборудованием и реалистичным временем. "
+    "ВАЖНО: Весь рецепт (ингредиенты, инструкции, советы, оборудование) должен быть НА РУССКОМ ЯЗЫКЕ."
+)
+
+# Placeholder for the image URL in a serialized vision request
+_IMAGE_URL_PLACEHOLDER = "__IMAGE_URL__"
+# Base64 encoding chunk; a multiple of 3 so chunks concatenate without padding
+_BASE64_CHUNK = 3 * 256 * 1024
+
+
+@functools.lru_cache(maxsize=8)
+def _vision_envelope(model: str) -> tuple[bytes, bytes]:
+    """Serialized vision request around the image URL, split at the placeholder."""
+    envelope = json.dumps(
+        {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": VISION_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": "Проанализируй это фото холодильника."},
+                        {"type": "image_url", "image_url": {"url": _IMAGE_URL_PLACEHOLDER}},
+                    ],
+                },
+            ],
+            "response_format": EXTRACTION_FORMAT.response_format,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    head, tail = envelope.split(_IMAGE_URL_PLACEHOLDER.encode("ascii"), 1)
+    return head, tail
+
+
+def build_vision_request(model: str, image_bytes: bytes, mime_type: str) -> bytes:
+    """
+    Serialize a vision chat completion request with the image inlined as a data URL.
+    
+    The JSON envelope is rendered once per model around a placeholder and the
+    image is base64-encoded chunk by chunk straight into the output buffer, so
+    the request body is the only full-size copy of the encoded image. The
+    result is sent as-is and reused by client retries.
+    """
+    head, tail = _vision_envelope(model)
+    body = io.BytesIO()
+    body.write(head)
+    body.write(f"data:{mime_type};base64,".encode("ascii"))
+    view = memoryview(image_bytes)
+    for offset in range(0, len(view), _BASE64_CHUNK):
+        body.write(binascii.b2a_base64(view[offset:offset + _BASE64_CHUNK], newline=False))
+    body.write(tail)
+    return body.getvalue()
+
 
 class AgentService:
     """Service for ingredient detection and meal suggestions using OpenAI Agents SDK."""
 
-    def __init__(self, openai_client: OpenAIClient):
+    def __init__(
+        self,
+        openai_client: OpenAIClient,
+        image_cache: Optional[PerceptualImageCache] = None,
+        suggestion_cache: Optional[SuggestionCache] = None,
+        store: Optional[RecipeStore] = None,
+        prefetcher: Optional[RecipePrefetcher] = None,
+        admission: Optional[AdmissionController] = None,
+        recipe_index: Optional[RecipeIndex] = None,
+        shared_cache: Optional[SharedResultCache] = None,
+    ):
         """
         Initialize the service with OpenAI client.
         
         Args:
             openai_client: Configured OpenAI client wrapper
+            image_cache: Optional cache of extraction results of same and near-duplicate photos
+            suggestion_cache: Optional cache of suggestions by canonical request
+            store: Optional persistent store of served suggestions and built recipes
+            prefetcher: Optional background builder of recipes for top suggestions
+            admission: Optional concurrency limits for upstream calls per tool
+            recipe_index: Optional ingredient index of built recipes for local search
+            shared_cache: Optional result cache shared with the other worker processes
         """
         self.openai_client = openai_client
+        self.image_cache = image_cache
+        self.suggestion_cache = suggestion_cache
+        self.store = store
+        self.prefetcher = prefetcher
+        self.admission = admission
+        self.recipe_index = recipe_index
+        self.shared_cache = shared_cache
+        # Identical concurrent suggestion requests and recipe builds share one upstream call
+        self._flights: SingleFlight[tuple, object] = SingleFlight()
         self._agent: Agent | None = None
     
     def _get_agent(self) -> Agent:
-        """Lazy initialization of agent."""
+        """
+        Lazy initialization of agent.
+
+        The service calls the tool methods directly and needs only `AsyncOpenAI`;
+        the openai-agents SDK is imported here, on first use of agent orchestration.
+
+        Raises:
+            ImportError: If the SDK is not installed (`uv sync --extra agents`)
+        """
         if self._agent is None:
+            from agents import Agent
+
             tools = self._build_tools()
             self._agent = Agent(
                 name="Holodilnik Kitchen Assistant",
@@ -50,76 +177,24 @@ class AgentService:
         return self._agent
     
     def _build_tools(self) -> list:
-        """Build tools that use the OpenAI client."""
-        client = self.openai_client.client
-        model_name = self.openai_client.model_name
-        
-        def _schema(model_cls):
-            """Generate JSON schema for structured output."""
-            schema = model_cls.model_json_schema()
-            
-            # Add additionalProperties: false to all objects for compatibility
-            def add_additional_properties(obj):
-                if isinstance(obj, dict):
-                    if obj.get("type") == "object":
-                        obj["additionalProperties"] = False
-                    for value in obj.values():
-                        add_additional_properties(value)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        add_additional_properties(item)
-            
-            add_additional_properties(schema)
-            
-            return {
-                "type": "json_schema",
-                "json_schema": {
-                    "name": model_cls.__name__,
-                    "schema": schema,
-                    "strict": False,  # ProxyAPI doesn't support strict mode
-                },
-            }
+        """
+        Build agent tools around the direct tool methods.
         
+        The service itself calls `_vision_ingredient_extractor`, `_dish_suggester`
+        and `_recipe_writer` directly; these wrappers only exist for agent
+        orchestration, where arguments arrive as JSON strings.
+        """
+        from agents import function_tool
+
         @function_tool
-        async def vision_ingredient_extractor(image_base64: str) -> dict:
+        async def vision_ingredient_extractor(image_base64: str, mime_type: str = "image/jpeg") -> dict:
             """Extracts ingredients from a fridge photo and returns structured detection results."""
             try:
-                # Validate base64
-                base64.b64decode(image_base64, validate=True)
-                
-                response = await client.chat.completions.create(
-                    model=model_name,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "Извлеки все съедобные ингредиенты, которые ты можешь определить на изображении. "
-                                "Верни структурированный JSON, соответствующий схеме ExtractIngredientsResult. "
-                                "ВАЖНО: Все названия ингредиентов, заметки и описания должны быть НА РУССКОМ ЯЗЫКЕ."
-                            ),
-                        },
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": "Проанализируй это фото холодильника."},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"},
-                                },
-                            ],
-                        },
-                    ],
-                    response_format=_schema(ExtractIngredientsResult),
-                )
-                
-                result = ExtractIngredientsResult.model_validate_json(
-                    response.choices[0].message.content
-                )
-                return result.model_dump()
-                
-            except Exception as e:
-                logger.error(f"Vision extraction failed: {e}")
+                image_bytes = base64.b64decode(image_base64, validate=True)
+            except binascii.Error as e:
                 raise AIServiceError(f"Failed to extract ingredients: {str(e)}")
+            result = await self._vision_ingredient_extractor(image_bytes, mime_type)
+            return result.model_dump()
 
         @function_tool
         async def dish_suggester(
@@ -128,65 +203,8 @@ class AgentService:
             dietary_preferences: Optional[list[str]] = None,
         ) -> dict:
             """Creates 3-5 dish suggestions given a list of ingredients and optional preferences."""
-            try:
-                request_data = {
-                    "ingredients": ingredients,
-                    "servings": servings,
-                    "dietary_preferences": dietary_preferences,
-                }
-                
-                response = await client.chat.completions.create(
-                    model=model_name,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "Предложи от трёх до пяти реалистичных блюд. "
-                                "Сосредоточься на блюдах, которые в основном используют предоставленные ингредиенты. "
-                                "ВАЖНО: Все названия блюд и описания должны быть НА РУССКОМ ЯЗЫКЕ."
-                            ),
-                        },
-                        {
-                            "role": "user",
-                            "content": json.dumps(request_data),
-                        },
-                    ],
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "DishSuggestions",
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "dishes": {
-                                        "type": "array",
-                                        "items": {
-                                            "type": "object",
-                                            "properties": {
-                                                "title": {"type": "string"},
-                                                "short_description": {"type": "string"},
-                                                "estimated_time_minutes": {"type": "integer"},
-                                                "confidence": {"type": "number"},
-                                            },
-                                            "required": ["title", "short_description", "estimated_time_minutes", "confidence"],
-                                            "additionalProperties": False,
-                                        },
-                                    },
-                                },
-                                "required": ["dishes"],
-                                "additionalProperties": False,
-                            },
-                            "strict": False,
-                        },
-                    },
-                )
-                
-                result = json.loads(response.choices[0].message.content)
-                return result
-                
-            except Exception as e:
-                logger.error(f"Dish suggestion failed: {e}")
-                raise AIServiceError(f"Failed to generate suggestions: {str(e)}")
+            suggestions = await self._dish_suggester(ingredients, servings, dietary_preferences)
+            return suggestions.model_dump()
 
         @function_tool
         async def recipe_writer(
@@ -195,96 +213,179 @@ class AgentService:
             servings: Optional[int] = None,
         ) -> dict:
             """Expands a selected dish into a detailed recipe."""
-            try:
-                request_data = {
-                    "title": title,
-                    "context_summary": context_summary,
-                    "servings": servings,
-                }
-                
-                response = await client.chat.completions.create(
-                    model=model_name,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "Сгенерируй полный рецепт с точными количествами ингредиентов, "
-                                "шагами приготовления, оборудованием и реалистичным временем. "
-                                "ВАЖНО: Весь рецепт (ингредиенты, инструкции, советы, оборудование) должен быть НА РУССКОМ ЯЗЫКЕ."
-                            ),
-                        },
-                        {
-                            "role": "user",
-                            "content": json.dumps(request_data),
-                        },
-                    ],
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "Recipe",
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "title": {"type": "string"},
-                                    "servings": {"type": ["integer", "null"]},
-                                    "prep_time_minutes": {"type": "integer"},
-                                    "cook_time_minutes": {"type": "integer"},
-                                    "ingredients": {
-                                        "type": "array",
-                                        "items": {
-                                            "type": "object",
-                                            "properties": {
-                                                "ingredient": {"type": "string"},
-                                                "quantity": {"type": "string"},
-                                                "preparation": {"type": ["string", "null"]},
-                                            },
-                                            "required": ["ingredient", "quantity"],
-                                            "additionalProperties": False,
-                                        },
-                                    },
-                                    "steps": {
-                                        "type": "array",
-                                        "items": {
-                                            "type": "object",
-                                            "properties": {
-                                                "number": {"type": "integer"},
-                                                "instruction": {"type": "string"},
-                                                "tip": {"type": ["string", "null"]},
-                                            },
-                                            "required": ["number", "instruction"],
-                                            "additionalProperties": False,
-                                        },
-                                    },
-                                    "equipment": {"type": "array", "items": {"type": "string"}},
-                                },
-                                "required": ["title", "prep_time_minutes", "cook_time_minutes", "ingredients", "steps"],
-                                "additionalProperties": False,
-                            },
-                            "strict": False,
-                        },
-                    },
-                )
-                
-                result = json.loads(response.choices[0].message.content)
-                return result
-                
-            except Exception as e:
-                logger.error(f"Recipe generation failed: {e}")
-                raise AIServiceError(f"Failed to build recipe: {str(e)}")
+            recipe = await self._recipe_writer(title, context_summary, servings)
+            return recipe.model_dump()
 
         return [vision_ingredient_extractor, dish_suggester, recipe_writer]
 
+    async def _vision_ingredient_extractor(self, image_bytes: bytes, mime_type: str) -> ExtractIngredientsResult:
+        """Extract ingredients from raw image bytes."""
+        try:
+            async with self._admit("vision"):
+                with (
+                    self.openai_client.router.route("vision") as model,
+                    track_upstream("vision_ingredient_extractor", model) as call,
+                ):
+                    body = build_vision_request(model, image_bytes, mime_type)
+                    IMAGE_BYTES.labels("request").observe(len(body))
+                    response = await call.request(
+                        self.openai_client.upstream.call(
+                            "vision",
+                            lambda client: client.post("/chat/completions", cast_to=ChatCompletion, body=body),
+                        )
+                    )
+                    call.record_usage(response.usage)
+            
+            draft = EXTRACTION_FORMAT.parse(response.choices[0].message.content)
+            draft.model = model
+            return ExtractIngredientsResult.from_draft(draft)
+            
+        except AIServiceError:
+            raise
+        except Exception as e:
+            logger.error(f"Vision extraction failed: {e}")
+            raise AIServiceError(f"Failed to extract ingredients: {str(e)}")
+
+    async def _dish_suggester(
+        self,
+        ingredients: list[str],
+        servings: Optional[int] = None,
+        dietary_preferences: Optional[list[str]] = None,
+    ) -> DishSuggestions:
+        """Create 3-5 dish suggestions (without ids) for a list of ingredients."""
+        try:
+            request_data = {
+                "ingredients": ingredients,
+                "servings": servings,
+                "dietary_preferences": dietary_preferences,
+            }
+            
+            async with self._admit("suggestion"):
+                with (
+                    self.openai_client.router.route("suggestion") as model,
+                    track_upstream("dish_suggester", model) as call,
+                ):
+                    messages = [
+                        {"role": "system", "content": SUGGESTION_SYSTEM_PROMPT},
+                        {"role": "user", "content": json.dumps(request_data)},
+                    ]
+                    response = await call.request(
+                        self.openai_client.upstream.call(
+                            "suggestion",
+                            lambda client: client.chat.completions.create(
+                                model=model,
+                                messages=messages,
+                                response_format=DISH_SUGGESTIONS_FORMAT.response_format,
+                            ),
+                        )
+                    )
+                    call.record_usage(response.usage)
+            
+            suggestions = DISH_SUGGESTIONS_FORMAT.parse(response.choices[0].message.content)
+            suggestions.model = model
+            return suggestions
+            
+        except AIServiceError:
+            raise
+        except Exception as e:
+            logger.error(f"Dish suggestion failed: {e}")
+            raise AIServiceError(f"Failed to generate suggestions: {str(e)}")
+
+    async def _recipe_writer(
+        self,
+        title: str,
+        context_summary: Optional[str] = None,
+        servings: Optional[int] = None,
+    ) -> RecipeDraft:
+        """Expand a selected dish into a detailed recipe (without suggestion id)."""
+        try:
+            async with self._admit("recipe"):
+                with (
+                    self.openai_client.router.route("recipe") as model,
+                    track_upstream("recipe_writer", model) as call,
+                ):
+                    messages = self._recipe_messages(title, context_summary, servings)
+                    response = await call.request(
+                        self.openai_client.upstream.call(
+                            "recipe",
+                            lambda client: client.chat.completions.create(
+                                model=model,
+                                messages=messages,
+                                response_format=RECIPE_FORMAT.response_format,
+                            ),
+                        )
+                    )
+                    call.record_usage(response.usage)
+            
+            draft = RECIPE_FORMAT.parse(response.choices[0].message.content)
+            draft.model = model
+            return draft
+            
+        except AIServiceError:
+            raise
+        except Exception as e:
+            logger.error(f"Recipe generation failed: {e}")
+            raise AIServiceError(f"Failed to build recipe: {str(e)}")
+
+    def stats(self) -> dict:
+        """Return counters of the service caches."""
+        stats = {}
+        if self.image_cache is not None:
+            stats["image_cache"] = self.image_cache.stats()
+        if self.suggestion_cache is not None:
+            stats["suggestion_cache"] = self.suggestion_cache.stats()
+        if self.prefetcher is not None:
+            stats["prefetch"] = self.prefetcher.stats()
+        stats["single_flight"] = self._flights.stats()
+        stats["upstream"] = self.openai_client.upstream.stats()
+        stats["models"] = self.openai_client.router.stats()
+        if self.admission is not None:
+            stats["admission"] = self.admission.stats()
+        if self.recipe_index is not None:
+            stats["recipe_index"] = self.recipe_index.stats()
+        if self.shared_cache is not None:
+            stats["shared_cache"] = self.shared_cache.stats()
+        return stats
+
+    def _admit(self, tool: str) -> AsyncContextManager[None]:
+        """Hold an admission slot for an upstream call of a tool, if limits are configured."""
+        if self.admission is None:
+            return contextlib.nullcontext()
+        return self.admission.admit(tool)
+
+    async def close(self) -> None:
+        """Stop background work."""
+        if self.prefetcher is not None:
+            await self.prefetcher.close()
+
     @staticmethod
-    def _encode_image(image_bytes: bytes) -> str:
-        """Encode image bytes to base64."""
-        return base64.b64encode(image_bytes).decode("utf-8")
+    def _recipe_messages(
+        title: str,
+        context_summary: Optional[str] = None,
+        servings: Optional[int] = None,
+    ) -> list[dict]:
+        """Build the chat messages for recipe generation."""
+        request_data = {
+            "title": title,
+            "context_summary": context_summary,
+            "servings": servings,
+        }
+        return [
+            {"role": "system", "content": RECIPE_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(request_data)},
+        ]
 
-    async def extract_ingredients(self, image_bytes: bytes) -> ExtractIngredientsResult:
+    async def extract_ingredients(
+        self,
+        image_bytes: bytes,
+        mime_type: str = "image/jpeg",
+    ) -> ExtractIngredientsResult:
         """
         Extract ingredients from fridge photo.
         
         Args:
             image_bytes: Image data
+            mime_type: MIME type of the image data
             
         Returns:
             Extraction result with detected ingredients
@@ -292,18 +393,35 @@ class AgentService:
         Raises:
             AIServiceError: If extraction fails
         """
+        fingerprint = None
+        if self.image_cache is not None:
+            fingerprint = await PerceptualImageCache.fingerprint(image_bytes)
+        # Other workers see exact content only: near-duplicate matching stays in-process
+        digest = content_digest(image_bytes).hex() if self.shared_cache is not None else None
+
+        cached = self.image_cache.get(fingerprint) if fingerprint is not None else None
+        if cached is None and digest is not None:
+            cached = await self.shared_cache.get("extraction", digest, ExtractIngredientsResult)
+            if cached is not None and fingerprint is not None:
+                self.image_cache.set(fingerprint, cached)
+        if cached is not None:
+            logger.info("Image cache hit, skipping vision call")
+            return cached
+
         try:
-            image_base64 = self._encode_image(image_bytes)
-            agent = self._get_agent()
-            tool = agent.tools[0]  # vision_ingredient_extractor
-            result_dict = await tool.on_invoke_tool(None, json.dumps({"image_base64": image_base64}))
-            return ExtractIngredientsResult.model_validate(result_dict)
+            result = await self._vision_ingredient_extractor(image_bytes, mime_type)
         except AIServiceError:
             raise
         except Exception as e:
             logger.error(f"Ingredient extraction failed: {e}")
             raise AIServiceError(f"Failed to extract ingredients: {str(e)}")
 
+        if fingerprint is not None:
+            self.image_cache.set(fingerprint, result)
+        if digest is not None:
+            self.shared_cache.set("extraction", digest, result)
+        return result
+
     async def suggest_meals(
         self,
         ingredients: list[str],
@@ -324,35 +442,70 @@ class AgentService:
         Raises:
             AIServiceError: If suggestion generation fails
         """
+        cache_key = suggestion_key(ingredients, servings, dietary_preferences)
+        cached = self.suggestion_cache.get(cache_key) if self.suggestion_cache is not None else None
+        if cached is None and self.shared_cache is not None:
+            cached = await self.shared_cache.get("suggestions", cache_key, DishSuggestions)
+            if cached is not None and self.suggestion_cache is not None:
+                self.suggestion_cache.set(cache_key, cached)
+        if cached is None and self.suggestion_cache is not None:
+            cached = self.suggestion_cache.get_similar(cache_key)
+        if cached is not None:
+            logger.info("Suggestion cache hit, skipping dish suggester call")
+            result = SuggestionsResult.from_drafts(cached.dishes, cached.model)
+            await self._after_suggestions(result, servings)
+            return result
+
         try:
-            agent = self._get_agent()
-            tool = agent.tools[1]  # dish_suggester
-            args = {
-                "ingredients": ingredients,
-                "servings": servings,
-                "dietary_preferences": dietary_preferences,
-            }
-            result_dict = await tool.on_invoke_tool(None, json.dumps(args))
-            return SuggestionsResult.from_agent_result(result_dict["dishes"])
+            # Concurrent identical requests share the dishes, each gets its own ids
+            suggestions = await self._flights.do(
+                ("suggestions", cache_key),
+                lambda: self._dish_suggester(ingredients, servings, dietary_preferences),
+            )
+            result = SuggestionsResult.from_drafts(suggestions.dishes, suggestions.model)
         except AIServiceError:
             raise
         except Exception as e:
             logger.error(f"Meal suggestion failed: {e}")
             raise AIServiceError(f"Failed to generate meal suggestions: {str(e)}")
 
+        if self.suggestion_cache is not None:
+            self.suggestion_cache.set(cache_key, suggestions)
+        if self.shared_cache is not None:
+            self.shared_cache.set("suggestions", cache_key, suggestions)
+        await self._after_suggestions(result, servings)
+        return result
+
+    async def _after_suggestions(self, result: SuggestionsResult, servings: Optional[int]) -> None:
+        """Persist served dishes and start prefetching recipes for the top ones."""
+        if self.store is not None:
+            await self.store.save_suggestions(result, servings)
+        if self.prefetcher is not None:
+            self.prefetcher.schedule(result.dishes, servings, self._prefetch_recipe)
+
+    async def _prefetch_recipe(self, dish: DishSummary, servings: Optional[int]) -> RecipeResult:
+        """Build a recipe for a suggested dish in the background."""
+        async with background_priority():
+            return await self._shared_build_recipe(
+                dish.suggestion_id, dish.title, dish.short_description, servings
+            )
+
     async def build_recipe(
         self,
         suggestion_id: str,
-        title: str,
-        context_summary: str,
+        title: Optional[str] = None,
+        context_summary: Optional[str] = None,
         servings: Optional[int] = None,
     ) -> RecipeResult:
         """
         Build detailed recipe.
         
+        A recipe already built for the same suggestion (and servings) is
+        returned from the store; `recipe_writer` only runs on first use.
+        
         Args:
             suggestion_id: ID of the selected suggestion
-            title: Dish title
+            title: Dish title (looked up from the stored suggestion if omitted)
             context_summary: Context about the selection
             servings: Number of servings
             
@@ -360,21 +513,272 @@ class AgentService:
             Detailed recipe with steps
             
         Raises:
+            NotFoundError: If title is omitted and the suggestion is unknown
             AIServiceError: If recipe generation fails
         """
+        if self.prefetcher is not None:
+            prefetched = await self.prefetcher.take(suggestion_id, servings)
+            if prefetched is not None:
+                logger.info(f"Prefetched recipe used for suggestion {suggestion_id}")
+                return prefetched
+
+        return await self._shared_build_recipe(suggestion_id, title, context_summary, servings)
+
+    async def _shared_build_recipe(
+        self,
+        suggestion_id: str,
+        title: Optional[str],
+        context_summary: Optional[str],
+        servings: Optional[int],
+    ) -> RecipeResult:
+        """Build a recipe, joining a build already running for the same suggestion and servings."""
+        return await self._flights.do(
+            ("recipe", suggestion_id, servings),
+            lambda: self._build_recipe(suggestion_id, title, context_summary, servings),
+        )
+
+    async def _build_recipe(
+        self,
+        suggestion_id: str,
+        title: Optional[str],
+        context_summary: Optional[str],
+        servings: Optional[int],
+    ) -> RecipeResult:
+        """Return the stored recipe or generate and store a new one."""
+        stored = await self._stored_recipe(suggestion_id, servings)
+        if stored is not None:
+            return stored
+
+        title, context_summary, servings = await self._resolve_dish(
+            suggestion_id, title, context_summary, servings
+        )
+        shared = await self._shared_recipe(suggestion_id, title, context_summary, servings)
+        if shared is not None:
+            return shared
+
         try:
-            agent = self._get_agent()
-            tool = agent.tools[2]  # recipe_writer
-            args = {
-                "title": title,
-                "context_summary": context_summary,
-                "servings": servings,
-            }
-            result_dict = await tool.on_invoke_tool(None, json.dumps(args))
-            return RecipeResult.from_agent_result(result_dict, suggestion_id)
+            draft = await self._recipe_writer(title, context_summary, servings)
+            recipe = RecipeResult.from_draft(draft, suggestion_id)
         except AIServiceError:
             raise
         except Exception as e:
             logger.error(f"Recipe building failed: {e}")
             raise AIServiceError(f"Failed to build recipe: {str(e)}")
 
+        if self.shared_cache is not None:
+            self.shared_cache.set("recipe", dish_key(title, context_summary, servings), draft)
+        await self._remember_recipe(recipe, servings)
+        return recipe
+
+    async def stream_recipe(
+        self,
+        suggestion_id: str,
+        title: Optional[str] = None,
+        context_summary: Optional[str] = None,
+        servings: Optional[int] = None,
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Build a detailed recipe, yielding parts as soon as they are generated.
+        
+        Lookup errors are raised here, before anything is streamed. The returned
+        iterator yields `(event, data)` pairs: `title`, `ingredients`, one `step`
+        per recipe step and finally the validated `recipe`.
+        
+        Args:
+            suggestion_id: ID of the selected suggestion
+            title: Dish title (looked up from the stored suggestion if omitted)
+            context_summary: Context about the selection
+            servings: Number of servings
+            
+        Returns:
+            Async iterator of recipe events
+            
+        Raises:
+            NotFoundError: If title is omitted and the suggestion is unknown
+        """
+        if self.prefetcher is not None:
+            prefetched = await self.prefetcher.take(suggestion_id, servings)
+            if prefetched is not None:
+                return self._replay_recipe(prefetched)
+
+        stored = await self._stored_recipe(suggestion_id, servings)
+        if stored is not None:
+            return self._replay_recipe(stored)
+
+        title, context_summary, servings = await self._resolve_dish(
+            suggestion_id, title, context_summary, servings
+        )
+        shared = await self._shared_recipe(suggestion_id, title, context_summary, servings)
+        if shared is not None:
+            return self._replay_recipe(shared)
+        return self._generate_recipe_stream(suggestion_id, title, context_summary, servings)
+
+    @staticmethod
+    async def _replay_recipe(recipe: RecipeResult) -> AsyncIterator[tuple[str, dict]]:
+        """Yield the events of an already built recipe."""
+        yield "title", {"title": recipe.title}
+        yield "ingredients", {"ingredients": [ing.model_dump() for ing in recipe.ingredients]}
+        for step in recipe.steps:
+            yield "step", step.model_dump()
+        yield "recipe", recipe.model_dump()
+
+    async def _generate_recipe_stream(
+        self,
+        suggestion_id: str,
+        title: str,
+        context_summary: Optional[str],
+        servings: Optional[int],
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """Stream a recipe completion and yield each part once it is complete."""
+        parser = JSONStreamParser()
+        try:
+            # The slot is held for the whole stream
+            async with self._admit("recipe"):
+                with (
+                    self.openai_client.router.route("recipe") as model,
+                    track_upstream("recipe_writer", model) as call,
+                ):
+                    # Not hedged: a losing stream would hold its connection open
+                    messages = self._recipe_messages(title, context_summary, servings)
+                    stream = await call.request(
+                        self.openai_client.upstream.call(
+                            "recipe_stream",
+                            lambda client: client.chat.completions.create(
+                                model=model,
+                                messages=messages,
+                                response_format=RECIPE_FORMAT.response_format,
+                                stream=True,
+                                stream_options={"include_usage": True},
+                            ),
+                            hedge=False,
+                        )
+                    )
+                    # Closing releases the upstream response when the client goes away mid-stream
+                    async with stream:
+                        async for chunk in stream:
+                            # With include_usage the last chunk has no choices, only usage
+                            call.record_usage(getattr(chunk, "usage", None))
+                            if not chunk.choices or not chunk.choices[0].delta.content:
+                                continue
+                            for event in parser.feed(chunk.choices[0].delta.content):
+                                if event.path == ("title",):
+                                    yield "title", {"title": event.value}
+                                elif event.path == ("ingredients",):
+                                    ingredients = [RecipeIngredient.model_validate(ing) for ing in event.value]
+                                    yield "ingredients", {"ingredients": [ing.model_dump() for ing in ingredients]}
+                                elif len(event.path) == 2 and event.path[0] == "steps":
+                                    yield "step", RecipeStep.model_validate(event.value).model_dump()
+
+            draft = RECIPE_FORMAT.parse(parser.text)
+            draft.model = model
+            recipe = RecipeResult.from_draft(draft, suggestion_id)
+        except AIServiceError:
+            raise
+        except Exception as e:
+            logger.error(f"Recipe streaming failed: {e}")
+            raise AIServiceError(f"Failed to build recipe: {str(e)}")
+
+        if self.shared_cache is not None:
+            self.shared_cache.set("recipe", dish_key(title, context_summary, servings), draft)
+
+        await self._remember_recipe(recipe, servings)
+        yield "recipe", recipe.model_dump()
+
+    async def _shared_recipe(
+        self,
+        suggestion_id: str,
+        title: str,
+        context_summary: Optional[str],
+        servings: Optional[int],
+    ) -> Optional[RecipeResult]:
+        """Return a recipe another worker built for the same dish, stored for this suggestion."""
+        if self.shared_cache is None:
+            return None
+        draft = await self.shared_cache.get("recipe", dish_key(title, context_summary, servings), RecipeDraft)
+        if draft is None:
+            return None
+        logger.info(f"Shared cache hit for recipe of suggestion {suggestion_id}")
+        recipe = RecipeResult.from_draft(draft, suggestion_id)
+        await self._remember_recipe(recipe, servings)
+        return recipe
+
+    async def _remember_recipe(self, recipe: RecipeResult, servings: Optional[int]) -> None:
+        """Persist a built recipe and make it searchable."""
+        if self.store is not None:
+            await self.store.save_recipe(recipe, servings)
+        if self.recipe_index is not None:
+            self.recipe_index.add(recipe)
+
+    async def _stored_recipe(self, suggestion_id: str, servings: Optional[int]) -> Optional[RecipeResult]:
+        """Return a stored recipe if it was built for the same servings."""
+        if self.store is None:
+            return None
+        stored = await self.store.get_recipe(suggestion_id)
+        if stored is None:
+            return None
+        recipe, requested_servings = stored
+        if servings is not None and servings != requested_servings:
+            return None
+        logger.info(f"Recipe store hit for suggestion {suggestion_id}")
+        return recipe
+
+    async def _resolve_dish(
+        self,
+        suggestion_id: str,
+        title: Optional[str],
+        context_summary: Optional[str],
+        servings: Optional[int],
+    ) -> tuple[str, Optional[str], Optional[int]]:
+        """Fill in dish details missing from a recipe request from the stored suggestion."""
+        if title is not None:
+            return title, context_summary, servings
+        suggestion = await self.store.get_suggestion(suggestion_id) if self.store is not None else None
+        if suggestion is None:
+            raise NotFoundError(
+                f"Unknown suggestion: {suggestion_id}",
+                details={"suggestion_id": suggestion_id},
+            )
+        return (
+            suggestion.dish.title,
+            context_summary or suggestion.dish.short_description,
+            servings or suggestion.servings,
+        )
+
+    async def get_recipe(self, suggestion_id: str) -> RecipeResult:
+        """
+        Get a previously built recipe.
+        
+        Args:
+            suggestion_id: ID of the suggestion the recipe was built for
+            
+        Returns:
+            Stored recipe
+            
+        Raises:
+            NotFoundError: If no recipe was built for this suggestion
+        """
+        stored = await self.store.get_recipe(suggestion_id) if self.store is not None else None
+        if stored is None:
+            raise NotFoundError(
+                f"Recipe not found: {suggestion_id}",
+                details={"suggestion_id": suggestion_id},
+            )
+        return stored[0]
+
+
+    def search_recipes(self, ingredients: list[str], limit: int = 10, min_coverage: float = 0.0) -> RecipeSearchResult:
+        """
+        Find built recipes that can be cooked from the given ingredients.
+        
+        Args:
+            ingredients: Available ingredients
+            limit: Maximum number of recipes
+            min_coverage: Minimum share of a recipe's ingredients that must be available
+            
+        Returns:
+            Recipes best covered by the ingredients; empty if search is disabled
+        """
+        if self.recipe_index is None:
+            return RecipeSearchResult(hits=[], recipes_indexed=0)
+        hits = self.recipe_index.search(ingredients, limit=limit, min_coverage=min_coverage)
+        return RecipeSearchResult(hits=hits, recipes_indexed=len(self.recipe_index))
@@ -0,0 +1,154 @@
+"""Near-duplicate photo cache for ingredient extraction results."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.config import Settings
+from app.models.domain import ExtractIngredientsResult
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# dHash compares HASH_SIZE + 1 columns per row, giving a 64-bit fingerprint
+HASH_SIZE = 8
+# Colour thumbnail compared alongside the dHash, which only sees brightness edges
+COLOR_SIZE = 4
+COLOR_TOLERANCE = 12  # Max mean absolute difference of thumbnail channels, out of 255
+ASPECT_TOLERANCE = 0.02
+MAX_DISTANCE = 2  # Larger Hamming distances match unrelated photos
+
+
+@dataclass(frozen=True, slots=True)
+class ImageFingerprint:
+    """What a photo is compared by: its exact bytes, brightness structure, colours and shape."""
+
+    digest: bytes
+    dhash: int
+    colors: bytes
+    aspect: float
+
+    def resembles(self, other: ImageFingerprint, max_distance: int) -> bool:
+        """Whether two photos are near-duplicates: close dHash, colours and aspect ratio."""
+        if (self.dhash ^ other.dhash).bit_count() > max_distance:
+            return False
+        if abs(self.aspect - other.aspect) > ASPECT_TOLERANCE * max(self.aspect, other.aspect):
+            return False
+        difference = sum(abs(a - b) for a, b in zip(self.colors, other.colors))
+        return difference <= COLOR_TOLERANCE * len(self.colors)
+
+
+def content_digest(image_bytes: bytes) -> bytes:
+    """Cryptographic digest of the exact image bytes."""
+    return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+
+def image_fingerprint(image_bytes: bytes) -> ImageFingerprint:
+    """
+    Fingerprint an image for near-duplicate matching.
+
+    The image is decoded at reduced scale where the codec allows it and
+    rotated according to its EXIF orientation. The 64-bit difference hash
+    (dHash) records, on a 9x8 grayscale version, whether each pixel is
+    brighter than its right neighbour; a 4x4 RGB thumbnail and the aspect
+    ratio catch photos whose brightness edges happen to coincide.
+
+    Raises:
+        UnidentifiedImageError, OSError: If the image cannot be decoded
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.draft("RGB", (HASH_SIZE * 8, HASH_SIZE * 8))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        aspect = image.width / image.height
+        small = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+        colors = image.resize((COLOR_SIZE, COLOR_SIZE), Image.Resampling.BOX).tobytes()
+
+    pixels = small.tobytes()
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return ImageFingerprint(digest=content_digest(image_bytes), dhash=value, colors=colors, aspect=aspect)
+
+
+class PerceptualImageCache:
+    """
+    Cache of `ExtractIngredientsResult` keyed by image fingerprint.
+
+    A lookup returns the entry of the same image bytes, or else the closest
+    stored photo whose dHash is within `max_distance` bits (at most 2) and
+    whose colours and aspect ratio match, so re-sent and re-compressed
+    photos share one vision call while different photos never do.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the cache with limits from settings."""
+        self.max_distance = min(settings.image_cache_max_distance, MAX_DISTANCE)
+        self._cache: TTLCache[bytes, tuple[ImageFingerprint, ExtractIngredientsResult]] = TTLCache(
+            max_entries=settings.image_cache_max_entries,
+            ttl_seconds=settings.image_cache_ttl_seconds,
+            max_bytes=settings.image_cache_max_bytes,
+            sizeof=lambda entry: len(entry[1].model_dump_json()),
+        )
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    async def fingerprint(image_bytes: bytes) -> Optional[ImageFingerprint]:
+        """Fingerprint an image in a worker thread; returns None if it cannot be decoded."""
+        try:
+            return await asyncio.to_thread(image_fingerprint, image_bytes)
+        except (UnidentifiedImageError, OSError, ValueError) as e:
+            logger.debug(f"Skipping image cache, cannot fingerprint image: {e}")
+            return None
+
+    def get(self, fingerprint: ImageFingerprint) -> Optional[ExtractIngredientsResult]:
+        """Return the cached result of the same or a near-duplicate image."""
+        entry = self._cache.get(fingerprint.digest)
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+
+        best_key: Optional[bytes] = None
+        best_value: Optional[ExtractIngredientsResult] = None
+        best_distance = self.max_distance + 1
+        for key, (stored, value) in self._cache.items():
+            distance = (stored.dhash ^ fingerprint.dhash).bit_count()
+            if distance < best_distance and stored.resembles(fingerprint, self.max_distance):
+                best_key, best_value, best_distance = key, value, distance
+
+        if best_key is None:
+            self.misses += 1
+            return None
+
+        self._cache.touch(best_key)
+        self.hits += 1
+        self.near_hits += 1
+        return best_value
+
+    def set(self, fingerprint: ImageFingerprint, result: ExtractIngredientsResult) -> None:
+        """Store an extraction result for an image."""
+        self._cache.set(fingerprint.digest, (fingerprint, result))
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "bytes": self._cache.total_bytes,
+            "max_bytes": self._cache.max_bytes,
+            "evictions": self._cache.evictions,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
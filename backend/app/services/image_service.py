@@ -1,7 +1,41 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
 from fastapi import UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
 
 from app.config import Settings
 from app.core.exceptions import ImageValidationError
+from app.core.metrics import IMAGE_BYTES
+
+OUTPUT_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+SNIFF_BYTES = 16
+READ_CHUNK_SIZE = 256 * 1024
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Detect an image MIME type from the first bytes of a file."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedImage:
+    """Image bytes ready to be sent to the vision model."""
+
+    data: bytes
+    mime_type: str
 
 
 class ImageService:
@@ -11,49 +45,177 @@ class ImageService:
         """Initialize image service with settings."""
         self.max_size = settings.max_image_size_mb * 1024 * 1024
         self.allowed_types = settings.allowed_image_types
+        self.preprocess_enabled = settings.image_preprocess_enabled
+        self.max_edge = settings.image_max_edge
+        self.output_format = settings.image_output_format.upper()
+        self.output_quality = settings.image_output_quality
+        if self.output_format not in OUTPUT_MIME_TYPES:
+            raise ValueError(f"Unsupported image output format: {settings.image_output_format}")
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.image_workers,
+            thread_name_prefix="image",
+        )
+    
+    def close(self) -> None:
+        """Stop the preprocessing thread pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
     
-    async def validate_and_read(self, file: UploadFile) -> bytes:
+    async def validate_upload(self, file: UploadFile) -> str:
         """
-        Validate image and return bytes.
+        Validate an uploaded image without loading it into memory.
+        
+        The type is sniffed from the first bytes instead of trusting the
+        client-supplied content type, and the size is checked in chunks with
+        an early abort. The upload stays in its spooled buffer (memory for
+        small files, a temporary file beyond that) and is rewound for reading.
         
         Args:
             file: Uploaded image file
             
         Returns:
-            Image bytes
+            Detected MIME type of the image
             
         Raises:
             ImageValidationError: If validation fails
         """
-        # Validate content type
-        if not file.content_type or not file.content_type.startswith("image/"):
-            raise ImageValidationError(
-                f"Invalid file type: {file.content_type}",
-                details={"content_type": file.content_type}
-            )
+        # Detect the actual type from magic bytes
+        head = await file.read(SNIFF_BYTES)
+        mime_type = self._check_type(head, file.content_type)
+        
+        # Validate size, reading in chunks only when the size is unknown
+        size = file.size
+        if size is None:
+            size = len(head)
+            while chunk := await file.read(READ_CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_size:
+                    break
+        self._check_size(size)
+        
+        await file.seek(0)
+        return mime_type
+    
+    def validate_bytes(self, data: bytes) -> str:
+        """
+        Validate an image received in memory, e.g. as a WebSocket frame.
+        
+        Args:
+            data: Image bytes
+            
+        Returns:
+            Detected MIME type of the image
+            
+        Raises:
+            ImageValidationError: If validation fails
+        """
+        mime_type = self._check_type(data[:SNIFF_BYTES], None)
+        self._check_size(len(data))
+        return mime_type
+    
+    def _check_type(self, head: bytes, declared_type: Optional[str]) -> str:
+        """Sniff the image type from its first bytes and check that it is allowed."""
+        if not head:
+            raise ImageValidationError("Image file is empty")
+        
+        mime_type = sniff_image_type(head)
+        if mime_type is None:
+            message = "File is not a recognised JPEG, PNG, WebP or GIF image"
+            details = {}
+            if declared_type:
+                message += f" (declared type: {declared_type})"
+                details["content_type"] = declared_type
+            raise ImageValidationError(message, details=details)
         
         # Check if type is allowed
-        if file.content_type not in self.allowed_types:
+        if mime_type not in self.allowed_types:
             raise ImageValidationError(
-                f"Image type not allowed: {file.content_type}",
+                f"Image type not allowed: {mime_type}",
                 details={
-                    "content_type": file.content_type,
+                    "content_type": mime_type,
                     "allowed_types": self.allowed_types
                 }
             )
-        
-        # Read and validate size
-        data = await file.read()
-        if len(data) > self.max_size:
-            size_mb = len(data) / 1024 / 1024
+        return mime_type
+    
+    def _check_size(self, size: int) -> None:
+        """Reject images over `max_image_size_mb` and record the upload size."""
+        if size > self.max_size:
+            size_mb = size / 1024 / 1024
             max_mb = self.max_size / 1024 / 1024
             raise ImageValidationError(
                 f"Image too large: {size_mb:.1f}MB (max: {max_mb:.0f}MB)",
-                details={"size_bytes": len(data), "max_bytes": self.max_size}
+                details={"size_bytes": size, "max_bytes": self.max_size}
             )
+        IMAGE_BYTES.labels("upload").observe(size)
+    
+    async def prepare(self, source: bytes | BinaryIO, mime_type: str) -> PreparedImage:
+        """
+        Downscale and re-encode an image for the vision model.
         
-        if len(data) == 0:
-            raise ImageValidationError("Image file is empty")
+        Runs in the image thread pool. The image is decoded, rotated according
+        to its EXIF orientation, stripped of metadata, shrunk so its longest
+        edge is at most `image_max_edge` and re-encoded as `image_output_format`.
         
-        return data
-
+        Args:
+            source: Validated image bytes or a file positioned at its start
+            mime_type: MIME type of the image
+        
+        Returns:
+            Prepared image with its actual MIME type
+        
+        Raises:
+            ImageValidationError: If the image cannot be decoded
+        """
+        loop = asyncio.get_running_loop()
+        if not self.preprocess_enabled:
+            if isinstance(source, bytes):
+                prepared = PreparedImage(data=source, mime_type=mime_type)
+            else:
+                data = await loop.run_in_executor(self._executor, source.read)
+                prepared = PreparedImage(data=data, mime_type=mime_type)
+        else:
+            prepared = await loop.run_in_executor(self._executor, self._preprocess, source)
+        
+        IMAGE_BYTES.labels("prepared").observe(len(prepared.data))
+        return prepared
+    
+    def _preprocess(self, source: bytes | BinaryIO) -> PreparedImage:
+        """Decode, orient, downscale and re-encode an image (blocking)."""
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        try:
+            with Image.open(source) as image:
+                # Let the JPEG decoder scale down by a power of two while decoding
+                image.draft("RGB", self._target_size(image.size))
+                image.thumbnail((self.max_edge, self.max_edge), Image.Resampling.BICUBIC)
+                # Rotate after shrinking: same result, far fewer pixels to move
+                image = ImageOps.exif_transpose(image)
+                image = self._flatten(image)
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+            raise ImageValidationError(
+                "Unable to decode image",
+                details={"reason": str(e)},
+            )
+        
+        output = io.BytesIO()
+        # No exif/icc arguments: metadata is not carried over
+        image.save(output, format=self.output_format, quality=self.output_quality)
+        return PreparedImage(data=output.getvalue(), mime_type=OUTPUT_MIME_TYPES[self.output_format])
+    
+    def _target_size(self, size: tuple[int, int]) -> tuple[int, int]:
+        """Size of an image after shrinking its longest edge to `max_edge`."""
+        width, height = size
+        scale = min(1.0, self.max_edge / max(width, height))
+        return max(1, round(width * scale)), max(1, round(height * scale))
+    
+    @staticmethod
+    def _flatten(image: Image.Image) -> Image.Image:
+        """Convert to RGB, compositing transparency onto white."""
+        if image.mode == "RGB":
+            return image
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image.convert("RGB")
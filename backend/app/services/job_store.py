@@ -0,0 +1,114 @@
+"""Persistent store of asynchronous jobs shared by worker processes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.config import Settings
+from app.models.domain import JobInfo
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed store of job states keyed by `job_id`.
+
+    Every worker process on the host opens the same file, so a job can be
+    polled through any of them; the unique idempotency key lets only one
+    process take a key. As in `RecipeStore`, all database work runs on one
+    dedicated thread and WAL mode lets processes read while one writes.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the store with its file location."""
+        self.path = Path(settings.job_store_path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def open(self) -> None:
+        """Create the database file and schema, dropping expired jobs."""
+        await self._run(self._open)
+        logger.info(f"Job store opened at {self.path}")
+
+    async def close(self) -> None:
+        """Close the connection and stop the store thread."""
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    async def save_job(self, job: JobInfo, idempotency_key: Optional[str], expires_at: float) -> None:
+        """
+        Store the current state of a job so any worker process can report it.
+
+        Raises:
+            sqlite3.IntegrityError: If another job holds the idempotency key
+        """
+        await self._run(self._save_job, job.job_id, idempotency_key, job.model_dump_json(), expires_at)
+
+    async def get_job(self, job_id: str) -> Optional[JobInfo]:
+        """Return an unexpired job by id."""
+        row = await self._run(
+            self._fetchone,
+            "SELECT payload FROM jobs WHERE job_id = ? AND expires_at >= ?",
+            (job_id, time.time()),
+        )
+        return JobInfo.model_validate_json(row[0]) if row is not None else None
+
+    async def find_job(self, idempotency_key: str) -> Optional[JobInfo]:
+        """Return an unexpired job submitted with an idempotency key."""
+        row = await self._run(
+            self._fetchone,
+            "SELECT payload FROM jobs WHERE idempotency_key = ? AND expires_at >= ?",
+            (idempotency_key, time.time()),
+        )
+        return JobInfo.model_validate_json(row[0]) if row is not None else None
+
+    # Store thread helpers
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+        self._conn = conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _save_job(self, job_id: str, idempotency_key: Optional[str], payload: str, expires_at: float) -> None:
+        with self._conn:
+            # An expired job may still hold the idempotency key
+            self._conn.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (job_id) DO UPDATE SET payload = excluded.payload, expires_at = excluded.expires_at",
+                (job_id, idempotency_key, payload, expires_at),
+            )
+
+    def _fetchone(self, sql: str, params: tuple) -> Optional[tuple]:
+        return self._conn.execute(sql, params).fetchone()
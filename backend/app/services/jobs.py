@@ -0,0 +1,230 @@
+"""Asynchronous jobs for long-running endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from pydantic import BaseModel
+
+from app.config import Settings
+from app.core.exceptions import HolodilnikException, NotFoundError, QueueFullError
+from app.models.domain import JobInfo
+from app.services.job_store import JobStore
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[[], Awaitable[Any]]
+
+STORE_POLL_INTERVAL = 0.25  # Seconds between store reads when long-polling a job of another process
+
+
+@dataclass(slots=True)
+class _Job:
+    info: JobInfo
+    run: JobRunner
+    idempotency_key: Optional[str]
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class JobQueue:
+    """
+    Bounded queue of jobs run by a fixed pool of worker tasks.
+
+    A submitted job is answered right away with its id; its work runs on one
+    of `jobs_workers` tasks, at most `jobs_max_queued` jobs wait. Finished
+    jobs stay readable for `jobs_result_ttl_seconds`. Every state change is
+    also written to the store, so with several server processes a job can be
+    polled through any of them.
+    """
+
+    def __init__(self, settings: Settings, store: Optional[JobStore] = None):
+        """Initialize the queue; call `start()` from the event loop before submitting."""
+        self.workers = settings.jobs_workers
+        self.ttl_seconds = settings.jobs_result_ttl_seconds
+        self.max_wait_seconds = settings.jobs_max_wait_seconds
+        self.store = store
+        self.max_queued = settings.jobs_max_queued
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue()
+        self._active: dict[str, _Job] = {}  # Queued and running
+        self._finished: TTLCache[str, _Job] = TTLCache(
+            max_entries=settings.jobs_max_entries,
+            ttl_seconds=self.ttl_seconds,
+        )
+        self._keys: TTLCache[str, str] = TTLCache(
+            max_entries=settings.jobs_max_entries,
+            ttl_seconds=self.ttl_seconds,
+        )
+        self._tasks: list[asyncio.Task[None]] = []
+        self.running = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the worker tasks."""
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def close(self) -> None:
+        """Stop the workers; queued and running jobs are abandoned."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, run: JobRunner, idempotency_key: Optional[str] = None) -> JobInfo:
+        """
+        Queue a job.
+
+        Args:
+            kind: Endpoint the job stands for, e.g. "build-recipe"
+            run: Coroutine factory doing the work; its result is returned to pollers
+            idempotency_key: Client key of the submission; resubmitting with the same
+                key returns the existing job instead of starting another
+
+        Returns:
+            The queued job, or the earlier job with the same idempotency key
+
+        Raises:
+            QueueFullError: If too many jobs are already waiting
+        """
+        if idempotency_key is not None:
+            idempotency_key = f"{kind}:{idempotency_key}"
+            existing = await self._find(idempotency_key)
+            if existing is not None:
+                self.deduplicated += 1
+                return existing
+        if len(self._active) - self.running >= self.max_queued:
+            self.rejected += 1
+            raise QueueFullError(
+                "Too many queued jobs",
+                details={"kind": kind, "max_queued": self.max_queued},
+            )
+
+        job = _Job(JobInfo(kind=kind, created_at=time.time()), run, idempotency_key)
+        job_id = job.info.job_id
+        # Hold the queue slot and the key while the job is written to the store
+        self._active[job_id] = job
+        if idempotency_key is not None:
+            self._keys.set(idempotency_key, job_id)
+        try:
+            await self._persist(job)
+        except sqlite3.IntegrityError:
+            # Another process took the same idempotency key first
+            self._forget_submission(job)
+            existing = await self.store.find_job(idempotency_key)
+            if existing is None:
+                raise
+            self.deduplicated += 1
+            return existing
+        except BaseException:
+            self._forget_submission(job)
+            raise
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        logger.info(f"Queued {kind} job {job.info.job_id}")
+        return job.info
+
+    async def get(self, job_id: str, wait: float = 0.0) -> JobInfo:
+        """
+        Return a job, waiting up to `wait` seconds (capped by `jobs_max_wait_seconds`) for it to finish.
+
+        Raises:
+            NotFoundError: If the job is unknown or expired
+        """
+        wait = min(max(wait, 0.0), self.max_wait_seconds)
+        job = self._active.get(job_id) or self._finished.get(job_id)
+        if job is not None:
+            if wait and not job.done.is_set():
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(job.done.wait(), wait)
+            return job.info
+
+        # Submitted to another process: follow it through the store
+        info = await self.store.get_job(job_id) if self.store is not None else None
+        deadline = time.monotonic() + wait
+        while info is not None and not info.finished and time.monotonic() < deadline:
+            await asyncio.sleep(min(STORE_POLL_INTERVAL, deadline - time.monotonic()))
+            info = await self.store.get_job(job_id)
+        if info is None:
+            raise NotFoundError(f"Job not found: {job_id}", details={"job_id": job_id})
+        return info
+
+    def stats(self) -> dict:
+        """Return queue depth and job counters."""
+        return {
+            "queued": len(self._active) - self.running,
+            "running": self.running,
+            "finished": len(self._finished),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+    async def _find(self, idempotency_key: str) -> Optional[JobInfo]:
+        info = self._find_local(idempotency_key)
+        if info is None and self.store is not None:
+            info = await self.store.find_job(idempotency_key)
+            # A submission with the same key may have been queued here meanwhile
+            info = info or self._find_local(idempotency_key)
+        return info
+
+    def _find_local(self, idempotency_key: str) -> Optional[JobInfo]:
+        job_id = self._keys.get(idempotency_key)
+        job = (self._active.get(job_id) or self._finished.get(job_id)) if job_id is not None else None
+        return job.info if job is not None else None
+
+    def _forget_submission(self, job: _Job) -> None:
+        del self._active[job.info.job_id]
+        if job.idempotency_key is not None:
+            self._keys.pop(job.idempotency_key)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            info = job.info
+            info.status = "running"
+            self.running += 1
+            try:
+                await self._persist_quietly(job)
+                result = await job.run()
+                info.result = result.model_dump(mode="json") if isinstance(result, BaseModel) else result
+                info.status = "succeeded"
+                self.succeeded += 1
+            except HolodilnikException as e:
+                info.error = {"error": e.__class__.__name__, "message": e.message, "details": e.details}
+                info.status = "failed"
+                self.failed += 1
+            except Exception as e:
+                logger.exception(f"{info.kind} job {info.job_id} failed")
+                info.error = {"error": e.__class__.__name__, "message": str(e), "details": {}}
+                info.status = "failed"
+                self.failed += 1
+            finally:
+                self.running -= 1
+                info.finished_at = time.time()
+                self._active.pop(info.job_id, None)
+            self._finished.set(info.job_id, job)
+            job.done.set()
+            await self._persist_quietly(job)
+
+    async def _persist(self, job: _Job) -> None:
+        if self.store is not None:
+            await self.store.save_job(job.info, job.idempotency_key, time.time() + self.ttl_seconds)
+
+    async def _persist_quietly(self, job: _Job) -> None:
+        # Only pollers in other processes depend on it: a store error must not fail the job
+        try:
+            await self._persist(job)
+        except Exception as e:
+            logger.warning(f"Failed to store {job.info.kind} job {job.info.job_id}: {e}")
@@ -0,0 +1,134 @@
+"""Per-tool model selection with latency budgets."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+TOOLS = ("vision", "suggestion", "recipe")
+LATENCY_WINDOW = 50  # Recent primary-model latencies kept per tool
+MIN_SAMPLES = 20  # Do not judge the budget on fewer calls
+RECOVERY_FACTOR = 0.8  # Return to the primary model once p95 is this far under budget
+
+
+class ToolRoute:
+    """
+    Model choice for one tool.
+
+    Calls use the primary model while its recent p95 latency is within the
+    budget. Above the budget the route downgrades to the fast model, still
+    sending every `probe_every`-th call to the primary model so its latency
+    keeps being measured; once that p95 drops under `RECOVERY_FACTOR` of the
+    budget the route upgrades again.
+    """
+
+    def __init__(self, tool: str, primary: str, fast: Optional[str], budget: float, probe_every: int):
+        """Initialize a route on the primary model."""
+        self.tool = tool
+        self.primary = primary
+        self.fast = fast
+        self.budget = budget
+        self.probe_every = probe_every
+        self.downgraded = False
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._p95 = 0.0
+        self._since_probe = 0
+        self.primary_calls = 0
+        self.fast_calls = 0
+        self.downgrades = 0
+
+    def choose(self) -> str:
+        """Return the model for the next call."""
+        model = self.primary
+        if self.downgraded:
+            self._since_probe += 1
+            if self._since_probe < self.probe_every:
+                model = self.fast
+            else:
+                self._since_probe = 0
+        if model == self.primary:
+            self.primary_calls += 1
+        else:
+            self.fast_calls += 1
+        return model
+
+    def observe(self, model: str, seconds: float) -> None:
+        """Record the latency of a finished call."""
+        if model != self.primary or self.fast is None:
+            return
+        self._latencies.append(seconds)
+        if len(self._latencies) < MIN_SAMPLES:
+            return
+        # While downgraded only probes are measured: judge recovery on the latest ones
+        ordered = sorted(list(self._latencies)[-MIN_SAMPLES:] if self.downgraded else self._latencies)
+        self._p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        if not self.downgraded and self._p95 > self.budget:
+            self.downgraded = True
+            self.downgrades += 1
+            # Judge recovery on probes only, not on the slow calls that caused the downgrade
+            self._latencies.clear()
+            logger.warning(
+                f"{self.tool} p95 {self._p95:.1f}s over budget {self.budget:.1f}s, "
+                f"downgrading {self.primary} -> {self.fast}"
+            )
+        elif self.downgraded and self._p95 < self.budget * RECOVERY_FACTOR:
+            self.downgraded = False
+            self._latencies.clear()
+            logger.info(f"{self.tool} p95 {self._p95:.1f}s back within budget, using {self.primary}")
+
+    def stats(self) -> dict:
+        """Return the current choice and call counts per model."""
+        return {
+            "model": self.fast if self.downgraded else self.primary,
+            "downgraded": int(self.downgraded),
+            "downgrades": self.downgrades,
+            "primary_p95_ms": round(self._p95 * 1000, 1),
+            "budget_ms": round(self.budget * 1000, 1),
+            "primary_calls": self.primary_calls,
+            "fast_calls": self.fast_calls,
+        }
+
+
+class ModelRouter:
+    """Models of the vision, suggestion and recipe tools."""
+
+    def __init__(self, settings: Settings):
+        """Create one route per tool; without the adaptive router every tool keeps its configured model."""
+        adaptive = settings.model_router_enabled
+        ratio = settings.model_router_probe_ratio
+        probe_every = max(1, round(1 / ratio)) if ratio > 0 else 10**9
+        self.routes = {
+            tool: ToolRoute(
+                tool,
+                primary=getattr(settings, f"{tool}_model") or settings.agent_model,
+                fast=getattr(settings, f"{tool}_fast_model") if adaptive else None,
+                budget=getattr(settings, f"{tool}_latency_budget_seconds"),
+                probe_every=probe_every,
+            )
+            for tool in TOOLS
+        }
+
+    @contextmanager
+    def route(self, tool: str) -> Iterator[str]:
+        """Choose the model for an upstream call of a tool and time the enclosed call."""
+        route = self.routes[tool]
+        model = route.choose()
+        start = time.perf_counter()
+        try:
+            yield model
+        except Exception:
+            # A failed call, e.g. a timeout, still tells how slow the model is
+            route.observe(model, time.perf_counter() - start)
+            raise
+        route.observe(model, time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        """Return the route of every tool."""
+        return {tool: route.stats() for tool, route in self.routes.items()}
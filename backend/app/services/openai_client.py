@@ -1,40 +1,110 @@
 """OpenAI client wrapper."""
 
-from openai import AsyncOpenAI
-from agents import OpenAIResponsesModel
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 from app.config import Settings
+from app.core.metrics import count_retry
+from app.services.model_router import ModelRouter
+from app.services.upstream import UpstreamPool
+
+if TYPE_CHECKING:
+    from agents import OpenAIResponsesModel
+
+logger = logging.getLogger(__name__)
 
 
 class OpenAIClient:
-    """Wrapper around OpenAI client with configuration."""
-    
+    """Wrapper around OpenAI client with configuration.
+
+    A single instance is meant to be shared by the whole process so that
+    every upstream call reuses the same pooled keep-alive connections.
+    """
+
     def __init__(self, settings: Settings):
         """Initialize OpenAI client with settings."""
         self._settings = settings
-        self._client = AsyncOpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_base_url,
-            timeout=settings.openai_timeout,
-            max_retries=settings.openai_max_retries,
+        self._http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry=settings.openai_keepalive_expiry,
+            ),
+            http2=settings.openai_http2,
+            event_hooks={"request": [count_retry]},
         )
-        self._model = OpenAIResponsesModel(
-            model=settings.agent_model,
-            openai_client=self._client
-        )
-    
+        self._upstream = UpstreamPool(settings, self._http_client)
+        self._router = ModelRouter(settings)
+        self._client = self._upstream.primary
+        self._model: Optional[OpenAIResponsesModel] = None
+
     @property
     def client(self) -> AsyncOpenAI:
         """Get the underlying OpenAI client."""
         return self._client
-    
+
+    @property
+    def upstream(self) -> UpstreamPool:
+        """Get the pool routing calls across upstream endpoints."""
+        return self._upstream
+
+    @property
+    def router(self) -> ModelRouter:
+        """Get the per-tool model router."""
+        return self._router
+
     @property
     def model(self) -> OpenAIResponsesModel:
-        """Get the OpenAI responses model for agent."""
+        """
+        Get the OpenAI responses model for agent, importing the openai-agents SDK on first use.
+
+        Raises:
+            ImportError: If the SDK is not installed (`uv sync --extra agents`)
+        """
+        if self._model is None:
+            from agents import OpenAIResponsesModel
+
+            self._model = OpenAIResponsesModel(
+                model=self._settings.agent_model,
+                openai_client=self._client
+            )
         return self._model
-    
+
     @property
     def model_name(self) -> str:
-        """Get the model name."""
+        """Get the model name used by the agent."""
         return self._settings.agent_model
 
+    async def warmup(self) -> None:
+        """
+        Open `openai_prewarm_connections` pooled connections per endpoint ahead of traffic.
+
+        Concurrent lightweight requests force the pool to establish separate
+        TCP/TLS connections, which are then kept alive for real calls. Failures
+        are logged and ignored: warmup is an optimization, not a requirement.
+        """
+        count = self._settings.openai_prewarm_connections
+        if count <= 0:
+            return
+
+        urls = [str(endpoint.client.base_url) for endpoint in self._upstream.endpoints]
+
+        async def _touch(url: str) -> None:
+            try:
+                response = await self._http_client.head(url, timeout=self._settings.openai_timeout)
+                await response.aclose()
+            except httpx.HTTPError as e:
+                logger.warning(f"Connection prewarm to {url} failed: {e}")
+
+        await asyncio.gather(*(_touch(url) for url in urls for _ in range(count)))
+        logger.info(f"Prewarmed {count} upstream connections to each of {', '.join(urls)}")
+
+    async def close(self) -> None:
+        """Close the underlying connection pool."""
+        await self._upstream.close()
@@ -0,0 +1,131 @@
+"""Speculative background prefetch of recipes for top suggestions."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from app.config import Settings
+from app.models.domain import DishSummary, RecipeResult
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+RecipeBuilder = Callable[[DishSummary, Optional[int]], Awaitable[RecipeResult]]
+
+
+class RecipePrefetcher:
+    """
+    Start recipe generation for the most likely dishes before they are requested.
+
+    Tasks are parked by `suggestion_id` for `prefetch_ttl_seconds`. A later
+    request takes the finished result or awaits the in-flight task. Wasted
+    work is capped by a limit on concurrent tasks and a per-minute budget
+    shared by the whole process.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the prefetcher with limits from settings."""
+        self.top_n = settings.prefetch_top_n
+        self.max_inflight = settings.prefetch_max_inflight
+        self.budget_per_minute = settings.prefetch_budget_per_minute
+        self._tasks: TTLCache[str, tuple[asyncio.Task[RecipeResult], Optional[int]]] = TTLCache(
+            max_entries=settings.prefetch_max_entries,
+            ttl_seconds=settings.prefetch_ttl_seconds,
+        )
+        self._running: set[asyncio.Task[RecipeResult]] = set()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.scheduled = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self.hits = 0
+        self.inflight_hits = 0
+        self.misses = 0
+
+    def schedule(self, dishes: list[DishSummary], servings: Optional[int], build: RecipeBuilder) -> None:
+        """Start background builds for the top dishes by confidence, within budget."""
+        candidates = sorted(dishes, key=lambda dish: dish.confidence, reverse=True)[: self.top_n]
+        for dish in candidates:
+            if not self._take_budget():
+                self.skipped += 1
+                continue
+            task = asyncio.create_task(build(dish, servings), name=f"prefetch-{dish.suggestion_id}")
+            task.add_done_callback(self._on_done)
+            self._running.add(task)
+            self._tasks.set(dish.suggestion_id, (task, servings))
+            self.scheduled += 1
+
+    async def take(self, suggestion_id: str, servings: Optional[int] = None) -> Optional[RecipeResult]:
+        """
+        Return the prefetched recipe for a suggestion, awaiting it if still running.
+
+        Returns None when nothing was prefetched, the prefetch was for other
+        servings or it failed.
+        """
+        entry = self._tasks.pop(suggestion_id)
+        if entry is None or (servings is not None and servings != entry[1]):
+            self.misses += 1
+            return None
+        task = entry[0]
+
+        if task.done():
+            self.hits += 1
+        else:
+            self.inflight_hits += 1
+        try:
+            # Shield so a disconnecting client does not cancel the shared build
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+        except Exception:
+            return None
+
+    async def close(self) -> None:
+        """Cancel all running prefetch tasks."""
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+        self._tasks.clear()
+
+    def stats(self) -> dict:
+        """Return prefetch counters and hit rate."""
+        taken = self.hits + self.inflight_hits
+        lookups = taken + self.misses
+        return {
+            "scheduled": self.scheduled,
+            "skipped_budget": self.skipped,
+            "inflight": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "hits": self.hits,
+            "inflight_hits": self.inflight_hits,
+            "misses": self.misses,
+            "hit_rate": taken / lookups if lookups else 0.0,
+            "unused": max(self.scheduled - taken, 0),
+        }
+
+    def _take_budget(self) -> bool:
+        now = time.monotonic()
+        if now - self._window_start >= 60:
+            self._window_start = now
+            self._window_count = 0
+        if len(self._running) >= self.max_inflight or self._window_count >= self.budget_per_minute:
+            return False
+        self._window_count += 1
+        return True
+
+    def _on_done(self, task: asyncio.Task[RecipeResult]) -> None:
+        self._running.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.failed += 1
+            logger.warning(f"Recipe prefetch {task.get_name()} failed: {task.exception()}")
+        else:
+            self.completed += 1
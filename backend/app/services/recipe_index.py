@@ -0,0 +1,159 @@
+"""In-memory inverted index of generated recipes by ingredient."""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Iterable
+
+from app.models.domain import RecipeResult, RecipeSearchHit
+from app.utils.text import ingredient_terms
+
+# Pantry staples counted as available even when not listed in a query
+STAPLE_TERMS = frozenset(
+    term
+    for name in ("соль", "вода", "сахар", "масло", "salt", "water", "sugar", "oil")
+    for term in ingredient_terms(name)
+)
+
+
+@dataclass(slots=True)
+class _Doc:
+    suggestion_id: str
+    title: str
+    ingredients: list[str]
+    terms: frozenset[str]
+    staple_mask: int
+    total_time_minutes: int
+
+
+class RecipeIndex:
+    """
+    Inverted index from ingredient term to the recipes using it.
+
+    Each posting maps a recipe to a bitmask of the positions of its
+    ingredients that contain the term. A query ingredient covers a recipe
+    ingredient when all of its terms occur in it, so per recipe the query
+    masks are ANDed over the terms of one query ingredient and ORed across
+    query ingredients. Coverage is the share of the recipe's ingredients
+    covered, staples included.
+
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_recipes: int) -> None:
+        """Initialize an empty index keeping at most `max_recipes`, dropping the oldest first."""
+        self.max_recipes = max_recipes
+        self._docs: list[_Doc | None] = []
+        self._doc_ids: dict[str, int] = {}  # In insertion order, oldest first
+        self._postings: dict[str, dict[int, int]] = {}
+        self._free: list[int] = []
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def add(self, recipe: RecipeResult) -> None:
+        """Index a recipe, replacing an earlier one built for the same suggestion."""
+        self.remove(recipe.suggestion_id)
+        doc_id = self._free.pop() if self._free else len(self._docs)
+        names = [item.ingredient for item in recipe.ingredients]
+        masks: dict[str, int] = {}
+        staple_mask = 0
+        for position, name in enumerate(names):
+            terms = ingredient_terms(name)
+            for term in terms:
+                masks[term] = masks.get(term, 0) | (1 << position)
+            if STAPLE_TERMS.intersection(terms):
+                staple_mask |= 1 << position
+        doc = _Doc(
+            suggestion_id=recipe.suggestion_id,
+            title=recipe.title,
+            ingredients=names,
+            terms=frozenset(masks),
+            staple_mask=staple_mask,
+            total_time_minutes=recipe.prep_time_minutes + recipe.cook_time_minutes,
+        )
+        if doc_id == len(self._docs):
+            self._docs.append(doc)
+        else:
+            self._docs[doc_id] = doc
+        self._doc_ids[recipe.suggestion_id] = doc_id
+        for term, mask in masks.items():
+            self._postings.setdefault(term, {})[doc_id] = mask
+        while len(self._doc_ids) > self.max_recipes:
+            self.remove(next(iter(self._doc_ids)))
+
+    def add_all(self, recipes: Iterable[RecipeResult]) -> None:
+        """Index several recipes."""
+        for recipe in recipes:
+            self.add(recipe)
+
+    def remove(self, suggestion_id: str) -> None:
+        """Drop the recipe of a suggestion if indexed."""
+        doc_id = self._doc_ids.pop(suggestion_id, None)
+        if doc_id is None:
+            return
+        for term in self._docs[doc_id].terms:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+        self._docs[doc_id] = None
+        self._free.append(doc_id)
+
+    def search(self, ingredients: list[str], limit: int = 10, min_coverage: float = 0.0) -> list[RecipeSearchHit]:
+        """
+        Return the recipes best covered by the given ingredients.
+
+        Args:
+            ingredients: Available ingredients
+            limit: Maximum number of hits
+            min_coverage: Minimum share of a recipe's ingredients covered
+
+        Returns:
+            Hits by coverage, then by matched ingredients, then by total time
+        """
+        self.searches += 1
+        covered: dict[int, int] = {}
+        for name in ingredients:
+            terms = ingredient_terms(name)
+            postings = [self._postings.get(term) for term in terms]
+            if not postings or any(p is None for p in postings):
+                continue
+            postings.sort(key=len)
+            rarest, rest = postings[0], postings[1:]
+            for doc_id, mask in rarest.items():
+                for posting in rest:
+                    mask &= posting.get(doc_id, 0)
+                    if not mask:
+                        break
+                if mask:
+                    covered[doc_id] = covered.get(doc_id, 0) | mask
+
+        ranked = []
+        for doc_id, mask in covered.items():
+            doc = self._docs[doc_id]
+            total = len(doc.ingredients)
+            matched = mask.bit_count()
+            coverage = (mask | doc.staple_mask).bit_count() / total
+            if coverage >= min_coverage:
+                ranked.append((coverage, matched, -doc.total_time_minutes, doc_id, mask))
+        top = heapq.nlargest(limit, ranked)
+        return [self._hit(self._docs[doc_id], mask, coverage) for coverage, _, _, doc_id, mask in top]
+
+    def stats(self) -> dict:
+        """Return index size and usage."""
+        return {"recipes": len(self._doc_ids), "terms": len(self._postings), "searches": self.searches}
+
+    @staticmethod
+    def _hit(doc: _Doc, mask: int, coverage: float) -> RecipeSearchHit:
+        have = mask | doc.staple_mask
+        return RecipeSearchHit(
+            suggestion_id=doc.suggestion_id,
+            title=doc.title,
+            coverage=round(coverage, 3),
+            matched_ingredients=[name for i, name in enumerate(doc.ingredients) if mask >> i & 1],
+            missing_ingredients=[name for i, name in enumerate(doc.ingredients) if not have >> i & 1],
+            total_time_minutes=doc.total_time_minutes,
+        )
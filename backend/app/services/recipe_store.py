@@ -0,0 +1,150 @@
+"""Persistent store of served suggestions and generated recipes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.config import Settings
+from app.models.domain import DishSummary, RecipeResult, SuggestionsResult
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suggestions (
+    suggestion_id TEXT PRIMARY KEY,
+    servings INTEGER,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recipes (
+    suggestion_id TEXT PRIMARY KEY,
+    requested_servings INTEGER,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS suggestions_created_at ON suggestions (created_at);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class StoredSuggestion:
+    """A dish suggestion as it was served, with the servings it was requested for."""
+
+    dish: DishSummary
+    servings: Optional[int]
+
+
+class RecipeStore:
+    """
+    SQLite-backed store keyed by `suggestion_id`.
+
+    All database work runs on one dedicated thread, so the connection is
+    never shared between threads and the event loop never blocks on disk.
+    WAL mode lets several worker processes share the same file.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the store with its file location and retention."""
+        self.path = Path(settings.store_path)
+        self.retention_seconds = settings.store_retention_days * 24 * 3600
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recipe-store")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def open(self) -> None:
+        """Create the database file and schema, dropping expired rows."""
+        await self._run(self._open)
+        logger.info(f"Recipe store opened at {self.path}")
+
+    async def close(self) -> None:
+        """Close the connection and stop the store thread."""
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    async def save_suggestions(self, result: SuggestionsResult, servings: Optional[int] = None) -> None:
+        """Remember served dishes so recipes can be built from `suggestion_id` alone."""
+        now = time.time()
+        rows = [(dish.suggestion_id, servings, dish.model_dump_json(), now) for dish in result.dishes]
+        await self._run(self._executemany, "INSERT OR REPLACE INTO suggestions VALUES (?, ?, ?, ?)", rows)
+
+    async def get_suggestion(self, suggestion_id: str) -> Optional[StoredSuggestion]:
+        """Return a served suggestion by id."""
+        row = await self._run(
+            self._fetchone,
+            "SELECT payload, servings FROM suggestions WHERE suggestion_id = ?",
+            (suggestion_id,),
+        )
+        if row is None:
+            return None
+        return StoredSuggestion(dish=DishSummary.model_validate_json(row[0]), servings=row[1])
+
+    async def save_recipe(self, recipe: RecipeResult, requested_servings: Optional[int] = None) -> None:
+        """Store a generated recipe under its `suggestion_id`."""
+        await self._run(
+            self._execute,
+            "INSERT OR REPLACE INTO recipes VALUES (?, ?, ?, ?)",
+            (recipe.suggestion_id, requested_servings, recipe.model_dump_json(), time.time()),
+        )
+
+    async def get_recipe(self, suggestion_id: str) -> Optional[tuple[RecipeResult, Optional[int]]]:
+        """Return a stored recipe and the servings it was requested for."""
+        row = await self._run(
+            self._fetchone,
+            "SELECT payload, requested_servings FROM recipes WHERE suggestion_id = ?",
+            (suggestion_id,),
+        )
+        if row is None:
+            return None
+        return RecipeResult.model_validate_json(row[0]), row[1]
+
+    async def load_recipes(self, limit: int) -> list[RecipeResult]:
+        """Return up to `limit` most recently stored recipes, oldest first."""
+        rows = await self._run(
+            self._fetchall,
+            "SELECT payload FROM (SELECT payload, created_at FROM recipes ORDER BY created_at DESC LIMIT ?) "
+            "ORDER BY created_at",
+            (limit,),
+        )
+        return [RecipeResult.model_validate_json(row[0]) for row in rows]
+
+    # Store thread helpers
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        cutoff = time.time() - self.retention_seconds
+        with conn:
+            conn.execute("DELETE FROM suggestions WHERE created_at < ?", (cutoff,))
+        self._conn = conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._conn:
+            self._conn.execute(sql, params)
+
+    def _executemany(self, sql: str, rows: list[tuple]) -> None:
+        with self._conn:
+            self._conn.executemany(sql, rows)
+
+    def _fetchone(self, sql: str, params: tuple) -> Optional[tuple]:
+        return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: tuple) -> list[tuple]:
+        return self._conn.execute(sql, params).fetchall()
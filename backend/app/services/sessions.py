@@ -0,0 +1,102 @@
+"""State and limits of WebSocket kitchen sessions."""
+
+from __future__ import annotations
+
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import Settings
+from app.core.exceptions import NotFoundError
+from app.models.domain import DishSummary, SuggestionsResult
+
+
+@dataclass(slots=True)
+class KitchenSession:
+    """
+    What the server remembers of one session between messages.
+
+    Only small state is kept: the photo is dropped once its ingredients are
+    extracted, and at most `max_dishes` suggested dishes are remembered, the
+    oldest forgotten first.
+    """
+
+    max_dishes: int
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    servings: Optional[int] = None
+    dietary_preferences: Optional[list[str]] = None
+    ingredients: list[str] = field(default_factory=list)
+    dishes: OrderedDict[str, DishSummary] = field(default_factory=OrderedDict)
+
+    def remember(self, suggestions: SuggestionsResult) -> None:
+        """Keep the suggested dishes so recipes can be asked for by id."""
+        for dish in suggestions.dishes:
+            self.dishes[dish.suggestion_id] = dish
+        while len(self.dishes) > self.max_dishes:
+            self.dishes.popitem(last=False)
+
+    def dish(self, suggestion_id: str) -> DishSummary:
+        """
+        Return a dish suggested in this session.
+
+        Raises:
+            NotFoundError: If the dish was not suggested here or was forgotten
+        """
+        dish = self.dishes.get(suggestion_id)
+        if dish is None:
+            raise NotFoundError(
+                f"Unknown suggestion in this session: {suggestion_id}",
+                details={"suggestion_id": suggestion_id},
+            )
+        return dish
+
+
+class SessionManager:
+    """
+    Registry of the open sessions of a process, with their limits and counters.
+
+    At most `session_max_connections` sessions are open at once; a session
+    that receives no message for `session_idle_timeout_seconds` is closed by
+    its connection handler and dropped here.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize an empty registry."""
+        self.max_sessions = settings.session_max_connections
+        self.idle_timeout = settings.session_idle_timeout_seconds
+        self.max_dishes = settings.session_max_dishes
+        self._sessions: dict[str, KitchenSession] = {}
+        self.opened = 0
+        self.rejected = 0
+        self.closed_idle = 0
+        self.messages = 0
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def open(self) -> Optional[KitchenSession]:
+        """Start a session, or return None if too many are open."""
+        if len(self._sessions) >= self.max_sessions:
+            self.rejected += 1
+            return None
+        session = KitchenSession(max_dishes=self.max_dishes)
+        self._sessions[session.session_id] = session
+        self.opened += 1
+        return session
+
+    def close(self, session: KitchenSession) -> None:
+        """Forget a session."""
+        self._sessions.pop(session.session_id, None)
+
+    def stats(self) -> dict:
+        """Return open sessions and counters."""
+        return {
+            "active": len(self._sessions),
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "closed_idle": self.closed_idle,
+            "messages": self.messages,
+            "errors": self.errors,
+        }
@@ -0,0 +1,262 @@
+"""Result cache shared by the worker processes of a host."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Hashable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from app.config import Settings
+from app.utils.codec import decode_model, encode_model
+from app.utils.text import normalize_ingredient
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+KINDS = ("extraction", "suggestions", "recipe")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key BLOB NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO usage VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE usage SET bytes = bytes + length(NEW.value) WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF value ON entries BEGIN
+    UPDATE usage SET bytes = bytes - length(OLD.value) + length(NEW.value) WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE usage SET bytes = bytes - length(OLD.value) WHERE id = 0;
+END;
+"""
+
+THREADS = 4  # Concurrent lookups per process; WAL readers do not block each other
+TOUCH_INTERVAL = 60.0  # Seconds between recency updates of a hot entry, so reads rarely write
+EVICT_TO = 0.9  # Eviction frees space down to this share of the budget
+EVICT_BATCH = 256
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+def dish_key(title: str, context_summary: Optional[str], servings: Optional[int]) -> tuple:
+    """Key of a recipe by the dish it describes rather than by suggestion."""
+    return normalize_ingredient(title), context_summary, servings
+
+
+def _digest(key: Hashable) -> bytes:
+    # Keys are ints, strings and nested tuples of them: their JSON form is canonical
+    return hashlib.blake2b(json.dumps(key, ensure_ascii=False).encode(), digest_size=16).digest()
+
+
+class SharedResultCache:
+    """
+    SQLite-backed cache of extraction, suggestion and recipe results.
+
+    Every worker process on the host opens the same file. WAL mode lets
+    readers proceed while a writer commits, and reads go through a memory
+    map. Values are stored in the binary format of `app.utils.codec`.
+
+    The payload size of all entries is kept in a `usage` row maintained by
+    triggers, so every process sees the same total; a write that takes it
+    over `shared_cache_max_bytes` evicts the least recently used entries.
+    Recency is refreshed at most every `TOUCH_INTERVAL` seconds per entry.
+
+    A lookup reads on the event loop through a connection that never waits
+    for a lock: a hit is a memory-mapped page read, cheaper than a hop to a
+    thread. Only when the database is busy is the read retried on a cache
+    thread. Writes are fire-and-forget on those threads. A failing lookup
+    counts as a miss: the cache is never the reason a request fails.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the cache with its file location and limits."""
+        self.path = Path(settings.shared_cache_path)
+        self.max_bytes = settings.shared_cache_max_bytes
+        self.ttl_seconds = settings.shared_cache_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix="shared-cache")
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._loop_conn: Optional[sqlite3.Connection] = None
+        self.bytes = 0
+        self.hits = dict.fromkeys(KINDS, 0)
+        self.misses = dict.fromkeys(KINDS, 0)
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    async def open(self) -> None:
+        """Create the database file and schema."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._open)
+        self._loop_conn = self._connect(timeout=0.0)
+        logger.info(f"Shared cache opened at {self.path}")
+
+    async def close(self) -> None:
+        """Wait for pending writes and close all connections."""
+        self._executor.shutdown(wait=True)
+        if self._loop_conn is not None:
+            self._loop_conn.close()
+            self._loop_conn = None
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+    async def get(self, kind: str, key: Hashable, cls: type[M]) -> Optional[M]:
+        """Return the cached value of a key, or None."""
+        digest = _digest(key)
+        try:
+            try:
+                data = self._get(kind, digest, self._loop_conn)
+            except sqlite3.OperationalError:
+                # Busy (e.g. a checkpoint): wait for it on a cache thread instead
+                loop = asyncio.get_running_loop()
+                data = await loop.run_in_executor(self._executor, self._get, kind, digest)
+            value = decode_model(cls, data) if data is not None else None
+        except (sqlite3.Error, ValueError) as e:
+            self.errors += 1
+            logger.warning(f"Shared cache lookup failed ({kind}): {e}")
+            value = None
+        if value is None:
+            self.misses[kind] += 1
+        else:
+            self.hits[kind] += 1
+        return value
+
+    def set(self, kind: str, key: Hashable, value: BaseModel) -> None:
+        """Store a value in the background."""
+        try:
+            future = self._executor.submit(self._set, kind, _digest(key), encode_model(value))
+        except RuntimeError:
+            return  # Shutting down
+        future.add_done_callback(self._on_written)
+
+    def stats(self) -> dict:
+        """Return counters per kind and the payload size last seen."""
+        lookups = sum(self.hits.values()) + sum(self.misses.values())
+        return {
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "hit_rate": sum(self.hits.values()) / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+    def _on_written(self, future: Future) -> None:
+        error = future.exception()
+        if error is not None:
+            self.errors += 1
+            logger.warning(f"Shared cache write failed: {error}")
+
+    # Database access (cache threads, except lookups on the event loop)
+
+    def _connect(self, timeout: float) -> sqlite3.Connection:
+        # Autocommit: transactions are opened explicitly for writes
+        conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect(timeout=5.0)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self.bytes = conn.execute("SELECT bytes FROM usage").fetchone()[0]
+
+    def _get(self, kind: str, key: bytes, conn: Optional[sqlite3.Connection] = None) -> Optional[bytes]:
+        conn = conn or self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE kind = ? AND key = ?",
+            (kind, key),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        # Writes need the database lock: never make the lookup wait for it
+        if expires_at < now:
+            self._background(
+                "DELETE FROM entries WHERE kind = ? AND key = ? AND expires_at < ?", (kind, key, now)
+            )
+            return None
+        if now - accessed_at > TOUCH_INTERVAL:
+            self._background("UPDATE entries SET accessed_at = ? WHERE kind = ? AND key = ?", (now, kind, key))
+        return value
+
+    def _background(self, sql: str, params: tuple) -> None:
+        try:
+            future = self._executor.submit(lambda: self._connection().execute(sql, params))
+        except RuntimeError:
+            return  # Shutting down
+        future.add_done_callback(self._on_written)
+
+    def _set(self, kind: str, key: bytes, value: bytes) -> None:
+        conn = self._connection()
+        now = time.time()
+        # Take the write lock up front: upgrading a read transaction can deadlock
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (kind, key) DO UPDATE SET "
+                "value = excluded.value, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (kind, key, value, now + self.ttl_seconds, now),
+            )
+            total = conn.execute("SELECT bytes FROM usage").fetchone()[0]
+            if total > self.max_bytes:
+                total = self._evict(conn, total)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.bytes = total
+        self.writes += 1
+
+    def _evict(self, conn: sqlite3.Connection, total: int) -> int:
+        target = int(self.max_bytes * EVICT_TO)
+        while total > target:
+            rows = conn.execute(
+                "SELECT kind, key, length(value) FROM entries ORDER BY accessed_at LIMIT ?",
+                (EVICT_BATCH,),
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for kind, key, size in rows:
+                victims.append((kind, key))
+                total -= size
+                if total <= target:
+                    break
+            conn.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", victims)
+            self.evictions += len(victims)
+        return conn.execute("SELECT bytes FROM usage").fetchone()[0]
@@ -0,0 +1,97 @@
+"""Result cache for meal suggestions keyed by a canonical request."""
+
+from __future__ import annotations
+
+import logging
+from typing import Hashable, Optional
+
+from app.config import Settings
+from app.models.domain import DishSuggestions
+from app.utils.cache import TTLCache
+from app.utils.minhash import MinHashIndex
+from app.utils.text import canonical_set, ingredient_terms, normalize_ingredient
+
+logger = logging.getLogger(__name__)
+
+SuggestionKey = tuple[Hashable, ...]
+
+
+def _canonical_ingredient(name: str) -> str:
+    # Names without search terms (e.g. only numbers) are kept as normalized text
+    return " ".join(ingredient_terms(name)) or normalize_ingredient(name)
+
+
+def suggestion_key(
+    ingredients: list[str],
+    servings: Optional[int] = None,
+    dietary_preferences: Optional[list[str]] = None,
+) -> SuggestionKey:
+    """
+    Build the canonical cache key of a suggestion request.
+
+    Ingredients are reduced to their search terms (see `ingredient_terms`)
+    and preferences are normalized, both order-independent, so
+    ["Томат", "курица"] and ["курица ", "томаты"] share a key, as do
+    "помидоры" and "помидор".
+    """
+    canonical = tuple(sorted({term for term in map(_canonical_ingredient, ingredients) if term}))
+    return canonical, servings, canonical_set(dietary_preferences)
+
+
+class SuggestionCache:
+    """
+    Cache of `dish_suggester` output by canonical request.
+
+    Dishes are stored without `suggestion_id`s, together with the model that
+    generated them, so every hit can be turned into a `SuggestionsResult`
+    with fresh ids.
+
+    With similarity reuse enabled, dishes are also indexed by ingredient set
+    so a request with the same servings and preferences and a near-identical
+    set of ingredients (Jaccard similarity above the threshold) can
+    reuse them.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the cache with limits from settings."""
+        self._cache: TTLCache[SuggestionKey, DishSuggestions] = TTLCache(
+            max_entries=settings.suggestion_cache_max_entries,
+            ttl_seconds=settings.suggestion_cache_ttl_seconds,
+        )
+        self._similar: Optional[MinHashIndex[DishSuggestions]] = None
+        if settings.suggestion_similarity_enabled:
+            self._similar = MinHashIndex(
+                threshold=settings.suggestion_similarity_threshold,
+                max_entries=settings.suggestion_similarity_max_entries,
+                ttl_seconds=settings.suggestion_cache_ttl_seconds,
+            )
+
+    def get(self, key: SuggestionKey) -> Optional[DishSuggestions]:
+        """Return cached dishes for a canonical request."""
+        return self._cache.get(key)
+
+    def get_similar(self, key: SuggestionKey) -> Optional[DishSuggestions]:
+        """Return cached dishes of the most similar ingredient set with the same servings and preferences."""
+        if self._similar is None:
+            return None
+        ingredients, servings, dietary_preferences = key
+        match = self._similar.query(ingredients, partition=(servings, dietary_preferences))
+        if match is None:
+            return None
+        similarity, suggestions = match
+        logger.info(f"Reusing suggestions of a similar ingredient set (Jaccard {similarity:.2f})")
+        return suggestions
+
+    def set(self, key: SuggestionKey, suggestions: DishSuggestions) -> None:
+        """Store dishes for a canonical request."""
+        self._cache.set(key, suggestions)
+        if self._similar is not None:
+            ingredients, servings, dietary_preferences = key
+            self._similar.insert(ingredients, suggestions, partition=(servings, dietary_preferences))
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and occupancy."""
+        stats = self._cache.stats()
+        if self._similar is not None:
+            stats["similar"] = self._similar.stats()
+        return stats
@@ -0,0 +1,266 @@
+"""Routing of upstream model calls across several OpenAI-compatible endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Errors that say something about the endpoint rather than the request
+ENDPOINT_ERRORS = (openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError)
+
+LATENCY_WINDOW = 256  # Recent call latencies kept per call kind for the hedge threshold
+MIN_HEDGE_SAMPLES = 20  # Do not hedge before the threshold is based on this many calls
+
+
+class UpstreamEndpoint:
+    """
+    One upstream base URL with its health score and circuit breaker.
+
+    Latency and error rate are tracked as exponentially weighted moving
+    averages. After `breaker_failures` consecutive failures the breaker opens
+    and the endpoint is skipped for `cooldown` seconds; then it is half-open:
+    the next success closes the breaker, the next failure opens it again.
+    """
+
+    def __init__(self, url: str, client: AsyncOpenAI, alpha: float, breaker_failures: int, cooldown: float):
+        """Initialize a healthy endpoint."""
+        self.url = url
+        self.client = client
+        self.alpha = alpha
+        self.breaker_failures = breaker_failures
+        self.cooldown = cooldown
+        self.latency = 0.0  # EWMA of successful call latency, seconds
+        self.error_rate = 0.0  # EWMA of the failure indicator
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+
+    @property
+    def state(self) -> str:
+        """Breaker state: closed, open or half_open."""
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half_open"
+
+    def score(self, unmeasured_latency: float) -> float:
+        """
+        Expected cost of a call; lower is better.
+
+        An endpoint that has not succeeded yet is assumed as slow as
+        `unmeasured_latency`, so its errors still count against it.
+        """
+        latency = self.latency or unmeasured_latency
+        return latency * (1.0 + 4.0 * self.error_rate)
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latency = latency if self.latency == 0.0 else self.latency + self.alpha * (latency - self.latency)
+        self.error_rate -= self.alpha * self.error_rate
+        self.consecutive_failures = 0
+        if self.open_until:
+            logger.info(f"Upstream {self.url} recovered, closing circuit breaker")
+            self.open_until = 0.0
+
+    def record_cancelled(self, elapsed: float) -> None:
+        """Account for a call cut short, e.g. a lost hedge: it took at least `elapsed`."""
+        if elapsed > self.latency:
+            self.latency += self.alpha * (elapsed - self.latency)
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.error_rate += self.alpha * (1.0 - self.error_rate)
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.breaker_failures:
+            if self.state != "open":
+                self.ejections += 1
+                logger.warning(f"Upstream {self.url} ejected for {self.cooldown}s after {self.consecutive_failures} failures")
+            self.open_until = time.monotonic() + self.cooldown
+
+    def stats(self) -> dict:
+        """Return health and counters of the endpoint."""
+        return {
+            "url": self.url,
+            "state": self.state,
+            "ewma_latency_ms": round(self.latency * 1000, 1),
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+        }
+
+
+class UpstreamPool:
+    """
+    Send each upstream call to the healthiest endpoint, hedging slow ones.
+
+    Endpoints are ranked by score, with open breakers last. A call that is
+    still running after the `hedge_percentile` latency of recent calls of the
+    same kind is duplicated to the next endpoint; the first answer wins and
+    the other call is cancelled. A call failing with an endpoint error is
+    retried once on the next endpoint. With a single endpoint calls go
+    straight through.
+    """
+
+    def __init__(self, settings: Settings, http_client: httpx.AsyncClient):
+        """Create one OpenAI client per configured base URL, all sharing `http_client`."""
+        urls = settings.openai_base_urls or [settings.openai_base_url]
+        # With several endpoints the pool fails over itself instead of retrying a dead one
+        max_retries = settings.openai_max_retries if len(urls) == 1 else 0
+        self.endpoints = [
+            UpstreamEndpoint(
+                url or "https://api.openai.com/v1",
+                AsyncOpenAI(
+                    api_key=settings.openai_api_key,
+                    base_url=url,
+                    timeout=settings.openai_timeout,
+                    max_retries=max_retries,
+                    http_client=http_client,
+                ),
+                alpha=settings.upstream_ewma_alpha,
+                breaker_failures=settings.upstream_breaker_failures,
+                cooldown=settings.upstream_breaker_cooldown_seconds,
+            )
+            for url in urls
+        ]
+        self.hedge_enabled = settings.upstream_hedge_enabled and len(self.endpoints) > 1
+        self.hedge_percentile = settings.upstream_hedge_percentile
+        self.hedge_min_delay = settings.upstream_hedge_min_delay_seconds
+        self._latencies: dict[str, deque[float]] = {}
+        self._thresholds: dict[str, float] = {}
+        self._observed: dict[str, int] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @property
+    def primary(self) -> AsyncOpenAI:
+        """Client of the first configured endpoint."""
+        return self.endpoints[0].client
+
+    def ranked(self) -> list[UpstreamEndpoint]:
+        """
+        Endpoints from best to worst; open breakers last, soonest to reopen first.
+
+        Endpoints without a measured latency are ranked as the slowest measured
+        one (or the minimum hedge delay), not as the fastest.
+        """
+        unmeasured = max((ep.latency for ep in self.endpoints), default=0.0) or self.hedge_min_delay
+        return sorted(
+            self.endpoints,
+            key=lambda ep: (ep.state == "open", ep.open_until if ep.state == "open" else ep.score(unmeasured)),
+        )
+
+    async def call(self, kind: str, fn: Callable[[AsyncOpenAI], Awaitable[T]], hedge: bool = True) -> T:
+        """
+        Run `fn(client)` against the best endpoint and return its result.
+
+        Args:
+            kind: Kind of call (e.g. tool name); hedge thresholds are tracked per kind
+            fn: Coroutine factory issuing the upstream request with the given client
+            hedge: Whether a slow call may be duplicated. Disable for calls whose
+                result holds resources, such as streams
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            Exception: The error of the last attempt if all attempts failed
+        """
+        if len(self.endpoints) == 1:
+            return await self._attempt(self.endpoints[0], kind, fn)
+
+        candidates = self.ranked()[:2]
+        primary = asyncio.ensure_future(self._attempt(candidates[0], kind, fn))
+        delay = self._hedge_delay(kind) if hedge and self.hedge_enabled else None
+        secondary: Optional[asyncio.Future[T]] = None
+        try:
+            done, _ = await asyncio.wait((primary,), timeout=delay)
+            if not done and candidates[1].state != "open":
+                self.hedged += 1
+                secondary = asyncio.ensure_future(self._attempt(candidates[1], kind, fn))
+                done, _ = await asyncio.wait((primary, secondary), return_when=asyncio.FIRST_COMPLETED)
+
+            winner = done.pop() if done else primary
+            if not winner.done():
+                await asyncio.wait((winner,))
+            error = winner.exception()
+            if error is None:
+                if winner is secondary:
+                    self.hedge_wins += 1
+                return winner.result()
+
+            other = secondary if winner is primary else primary
+            if other is not None:
+                # The hedge is still running: it is now the only chance
+                return await other
+            if isinstance(error, ENDPOINT_ERRORS):
+                self.failovers += 1
+                logger.warning(f"Upstream {candidates[0].url} failed ({error}), failing over to {candidates[1].url}")
+                return await self._attempt(candidates[1], kind, fn)
+            raise error
+        finally:
+            for task in (primary, secondary):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        """Return hedging counters and the health of every endpoint."""
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "hedge_thresholds_ms": {kind: round(value * 1000, 1) for kind, value in self._thresholds.items()},
+            "endpoints": {str(i): ep.stats() for i, ep in enumerate(self.endpoints)},
+        }
+
+    async def close(self) -> None:
+        """Close the endpoint clients (they share one connection pool)."""
+        await self.endpoints[0].client.close()
+
+    async def _attempt(self, endpoint: UpstreamEndpoint, kind: str, fn: Callable[[AsyncOpenAI], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        try:
+            result = await fn(endpoint.client)
+        except ENDPOINT_ERRORS:
+            endpoint.record_failure()
+            raise
+        except asyncio.CancelledError:
+            endpoint.record_cancelled(time.perf_counter() - start)
+            raise
+        latency = time.perf_counter() - start
+        endpoint.record_success(latency)
+        self._observe(kind, latency)
+        return result
+
+    def _observe(self, kind: str, latency: float) -> None:
+        window = self._latencies.get(kind)
+        if window is None:
+            window = self._latencies[kind] = deque(maxlen=LATENCY_WINDOW)
+        window.append(latency)
+        self._observed[kind] = observed = self._observed.get(kind, 0) + 1
+        # Sorting the window on every call is wasteful; refresh the threshold periodically
+        if observed == MIN_HEDGE_SAMPLES or (observed > MIN_HEDGE_SAMPLES and observed % 16 == 0):
+            ordered = sorted(window)
+            self._thresholds[kind] = ordered[min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))]
+
+    def _hedge_delay(self, kind: str) -> Optional[float]:
+        threshold = self._thresholds.get(kind)
+        if threshold is None:
+            return None
+        return max(threshold, self.hedge_min_delay)
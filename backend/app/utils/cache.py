@@ -0,0 +1,141 @@
+"""In-process cache primitives."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Iterator, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class _Entry(Generic[V]):
+    value: V
+    expires_at: float
+    size: int
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded LRU cache with per-entry time-to-live and an optional byte budget.
+
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_remove: Optional[Callable[[K, V], None]] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl_seconds: Lifetime of an entry after it is stored
+            max_bytes: Optional budget for the sum of entry sizes
+            sizeof: Function estimating an entry size in bytes (required with max_bytes)
+            clock: Monotonic time source
+            on_remove: Called with the key and value of every entry that is
+                replaced, evicted, expired, popped or cleared
+        """
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("sizeof is required when max_bytes is set")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._on_remove = on_remove
+        self._data: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        """Return a live value and mark it as recently used, counting hits and misses."""
+        entry = self._data.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting least recently used entries to stay within bounds."""
+        if key in self._data:
+            self._remove(key)
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._data[key] = _Entry(value, self._clock() + self.ttl_seconds, size)
+        self.total_bytes += size
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        """Remove an entry and return its value if present and live."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        self._remove(key)
+        return entry.value if entry.expires_at > self._clock() else None
+
+    def touch(self, key: K) -> None:
+        """Mark an entry as recently used without counting a hit."""
+        if key in self._data:
+            self._data.move_to_end(key)
+
+    def items(self) -> Iterator[tuple[K, V]]:
+        """Iterate over live entries from least to most recently used."""
+        now = self._clock()
+        for key, entry in list(self._data.items()):
+            if entry.expires_at <= now:
+                self._remove(key)
+            else:
+                yield key, entry.value
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        if self._on_remove is not None:
+            for key, entry in self._data.items():
+                self._on_remove(key, entry.value)
+        self._data.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        """Return counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: K) -> None:
+        entry = self._data.pop(key)
+        self.total_bytes -= entry.size
+        if self._on_remove is not None:
+            self._on_remove(key, entry.value)
@@ -0,0 +1,51 @@
+"""Compact binary encoding of pydantic results."""
+
+from __future__ import annotations
+
+import marshal
+import zlib
+from typing import TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+# First byte of an encoded value: how the rest is laid out
+_MARSHAL = 1
+_MARSHAL_ZLIB = 2
+COMPRESS_MIN_BYTES = 512  # Smaller payloads gain little from compression
+
+
+def encode_model(model: BaseModel) -> bytes:
+    """
+    Encode a model as a tagged `marshal` dump of its fields, zlib-compressed when large.
+
+    `marshal` handles the plain dicts, lists and scalars of `model_dump()`
+    natively, is several times smaller than JSON for Cyrillic text and loads
+    faster than JSON parses.
+    """
+    payload = marshal.dumps(model.model_dump())
+    if len(payload) >= COMPRESS_MIN_BYTES:
+        return bytes((_MARSHAL_ZLIB,)) + zlib.compress(payload, 1)
+    return bytes((_MARSHAL,)) + payload
+
+
+def decode_model(cls: type[M], data: bytes) -> M:
+    """
+    Decode and validate a value produced by `encode_model`.
+
+    Raises:
+        ValueError: If the data is corrupt, from an unknown format or does
+            not validate as `cls` (e.g. written by an older schema)
+    """
+    if not data:
+        raise ValueError("Empty encoded value")
+    tag, body = data[0], data[1:]
+    try:
+        if tag == _MARSHAL_ZLIB:
+            body = zlib.decompress(body)
+        elif tag != _MARSHAL:
+            raise ValueError(f"Unknown encoding tag {tag}")
+        return cls.model_validate(marshal.loads(body))
+    except (zlib.error, EOFError, TypeError, ValidationError) as e:
+        raise ValueError(f"Cannot decode {cls.__name__}: {e}") from e
@@ -0,0 +1,140 @@
+"""Incremental parser for a streamed JSON object."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+_WHITESPACE = " \t\r\n"
+
+
+@dataclass(frozen=True, slots=True)
+class JSONStreamEvent:
+    """
+    A value that became complete while streaming.
+
+    `path` is `(key,)` for a member of the top-level object and
+    `(key, index)` for an element of a top-level array member.
+    """
+
+    path: tuple[Any, ...]
+    value: Any
+
+
+class JSONStreamParser:
+    """
+    Emit members of a top-level JSON object as soon as each one is complete.
+
+    Text is fed in arbitrary chunks (e.g. deltas of a streamed completion).
+    Every top-level member produces an event once its value is closed, and
+    every element of a top-level array produces an event as soon as the
+    element itself is closed, before the rest of the array arrives.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._item_index = 0
+        self._events: list[JSONStreamEvent] = []
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> list[JSONStreamEvent]:
+        """Consume a chunk of text and return the values completed by it."""
+        self._buffer += chunk
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._end_string(i)
+                continue
+            if ch in _WHITESPACE:
+                continue
+            if ch == '"':
+                self._start_value(i)
+                self._in_string = True
+            elif ch in "{[":
+                self._start_value(i)
+                self._stack.append(ch)
+                if ch == "{" and len(self._stack) == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                self._end_scalar(i)
+                self._stack.pop()
+                self._end_container(i)
+            elif ch == ",":
+                self._end_scalar(i)
+                if len(self._stack) == 1:
+                    self._expect_key = True
+            elif ch == ":":
+                if len(self._stack) == 1:
+                    self._expect_key = False
+            else:
+                self._start_value(i)
+        self._pos = len(buffer)
+
+        events, self._events = self._events, []
+        return events
+
+    def _in_top_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "["
+
+    def _start_value(self, i: int) -> None:
+        if len(self._stack) == 1:
+            if self._expect_key:
+                self._key_start = i
+            elif self._value_start is None:
+                self._value_start = i
+                self._item_index = 0
+        elif self._in_top_array() and self._item_start is None:
+            self._item_start = i
+
+    def _end_string(self, i: int) -> None:
+        if len(self._stack) == 1:
+            if self._expect_key:
+                self._key = json.loads(self._buffer[self._key_start:i + 1])
+            else:
+                self._emit_value(i + 1)
+        elif self._in_top_array():
+            self._emit_item(i + 1)
+
+    def _end_scalar(self, i: int) -> None:
+        if len(self._stack) == 1 and self._value_start is not None:
+            self._emit_value(i)
+        elif self._in_top_array() and self._item_start is not None:
+            self._emit_item(i)
+
+    def _end_container(self, i: int) -> None:
+        if len(self._stack) == 1 and self._value_start is not None:
+            self._emit_value(i + 1)
+        elif self._in_top_array() and self._item_start is not None:
+            self._emit_item(i + 1)
+
+    def _emit_value(self, end: int) -> None:
+        value = json.loads(self._buffer[self._value_start:end])
+        self._events.append(JSONStreamEvent((self._key,), value))
+        self._value_start = None
+
+    def _emit_item(self, end: int) -> None:
+        value = json.loads(self._buffer[self._item_start:end])
+        self._events.append(JSONStreamEvent((self._key, self._item_index), value))
+        self._item_start = None
+        self._item_index += 1
@@ -0,0 +1,211 @@
+"""MinHash/LSH index for finding near-duplicate sets."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import random
+import time
+from typing import Callable, Generic, Hashable, Iterable, Optional, TypeVar, Union
+
+from app.utils.cache import TTLCache
+
+V = TypeVar("V")
+_Key = tuple[Hashable, frozenset[str]]
+
+_PRIME = (1 << 61) - 1  # Mersenne prime for the universal hash family
+_MAX_CANDIDATES = 64  # Exact comparisons per query; keeps lookups bounded on popular buckets
+_ELEMENT_CACHE_SIZE = 8192  # Ingredient names repeat a lot; their hash rows are cached
+
+
+def _element_hash(element: str) -> int:
+    return int.from_bytes(hashlib.blake2b(element.encode(), digest_size=8).digest(), "big")
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def optimal_bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    """
+    Choose `(bands, rows)` with `bands * rows == num_perm` for a similarity threshold.
+
+    Minimizes the weighted area of false positives below the threshold and
+    false negatives above it under the LSH S-curve `1 - (1 - s^rows)^bands`.
+    False negatives weigh more: they lose a reuse, while false positives only
+    cost an exact comparison.
+    """
+    steps = 200
+
+    def collision(s: float, bands: int, rows: int) -> float:
+        return 1.0 - (1.0 - s ** rows) ** bands
+
+    best, best_error = (num_perm, 1), float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        points = [i / steps for i in range(steps + 1)]
+        false_positive = sum(collision(s, bands, rows) for s in points if s < threshold) / steps
+        false_negative = sum(1.0 - collision(s, bands, rows) for s in points if s >= threshold) / steps
+        error = 0.3 * false_positive + 0.7 * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashIndex(Generic[V]):
+    """
+    Bounded index returning the stored value whose set is most similar to a query.
+
+    Each set is summarized by a MinHash signature of `num_perm` values, split
+    into bands; sets sharing any band land in a common bucket and become
+    candidates. Candidates are then compared by exact Jaccard similarity, so
+    the signature only decides which entries are looked at. Entries live in
+    a `TTLCache` and are evicted least recently used first; sets are only
+    compared within the same `partition`.
+
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        max_entries: int,
+        ttl_seconds: float,
+        num_perm: int = 64,
+        seed: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            threshold: Jaccard similarity a match must exceed
+            max_entries: Maximum number of sets kept
+            ttl_seconds: Lifetime of a set after it is inserted
+            num_perm: Number of hash functions in a signature
+            seed: Seed of the hash functions
+            clock: Monotonic time source
+        """
+        self.threshold = threshold
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._element_row = functools.lru_cache(maxsize=_ELEMENT_CACHE_SIZE)(self._hash_row)
+        # Keys are (partition, element set). Most buckets hold a single key, which
+        # is stored as is; a set is only allocated once a bucket is shared
+        self._buckets: dict[int, Union[_Key, set[_Key]]] = {}
+        self._entries: TTLCache[_Key, V] = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            clock=clock,
+            on_remove=self._unbucket,
+        )
+        self.hits = 0
+        self.misses = 0
+        self.candidates = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def insert(self, elements: tuple[str, ...], value: V, partition: Hashable = None) -> None:
+        """Index `value` under a set of elements, replacing the value of an identical set."""
+        if not elements:
+            return
+        key = (partition, frozenset(elements))
+        self._entries.set(key, value)
+        for bucket in self._bucket_keys(elements, partition):
+            current = self._buckets.get(bucket)
+            if current is None:
+                self._buckets[bucket] = key
+            elif isinstance(current, set):
+                current.add(key)
+            elif current != key:
+                self._buckets[bucket] = {current, key}
+
+    def query(self, elements: tuple[str, ...], partition: Hashable = None) -> Optional[tuple[float, V]]:
+        """
+        Find the most similar indexed set at or above the threshold.
+
+        Returns:
+            Similarity and value of the best match, or None
+        """
+        if not elements:
+            self.misses += 1
+            return None
+        query = frozenset(elements)
+        candidates: set[_Key] = set()
+        for bucket in self._bucket_keys(elements, partition):
+            current = self._buckets.get(bucket)
+            if current is None:
+                continue
+            if isinstance(current, set):
+                candidates.update(current)
+            else:
+                candidates.add(current)
+            if len(candidates) >= _MAX_CANDIDATES:
+                break
+        self.candidates += len(candidates)
+
+        scored = []
+        for key in candidates:
+            similarity = jaccard(query, key[1])
+            if similarity > self.threshold:
+                scored.append((similarity, key))
+        for similarity, key in sorted(scored, key=lambda item: item[0], reverse=True):
+            value = self._entries.get(key)  # Drops the entry if it has expired
+            if value is not None:
+                self.hits += 1
+                return similarity, value
+        self.misses += 1
+        return None
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        """Return counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "buckets": len(self._buckets),
+            "bands": self.bands,
+            "rows": self.rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self._entries.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "candidates_per_lookup": self.candidates / lookups if lookups else 0.0,
+        }
+
+    def _bucket_keys(self, elements: Iterable[str], partition: Hashable) -> tuple[int, ...]:
+        # Signature of a set: element-wise minimum of the rows of its elements
+        element_rows = [self._element_row(element) for element in elements]
+        signature = element_rows[0] if len(element_rows) == 1 else list(map(min, *element_rows))
+        rows = self.rows
+        return tuple(
+            hash((partition, band, *signature[band * rows:(band + 1) * rows]))
+            for band in range(self.bands)
+        )
+
+    def _hash_row(self, element: str) -> tuple[int, ...]:
+        h = _element_hash(element)
+        return tuple((a * h + b) % _PRIME for a, b in self._perms)
+
+    def _unbucket(self, key: _Key, value: V) -> None:
+        # Bucket ids are recomputed rather than stored: cheap with cached element rows
+        partition, elements = key
+        for bucket in self._bucket_keys(elements, partition):
+            current = self._buckets.get(bucket)
+            if isinstance(current, set):
+                current.discard(key)
+                if len(current) == 1:
+                    self._buckets[bucket] = next(iter(current))
+            elif current == key:
+                del self._buckets[bucket]
@@ -0,0 +1,68 @@
+"""Coalescing of concurrent identical calls."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Flight(Generic[V]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[V]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Run at most one call per key at a time and share its result.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await the same task. Each waiter is shielded, so a caller
+    that is cancelled (e.g. a client disconnect) leaves the call running for
+    the others; the call itself is cancelled only when its last waiter goes.
+    Results are not kept once the call completes.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[K, _Flight[V]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """Return the result of `fn()`, sharing an in-flight call for the same key."""
+        self.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is waiting any more: stop the call and let the next caller start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def stats(self) -> dict:
+        """Return call counters and the share of calls served by another caller's flight."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._flights),
+            "coalescing_ratio": self.coalesced / self.calls if self.calls else 0.0,
+        }
+
+    def _forget(self, key: K, flight: _Flight[V]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
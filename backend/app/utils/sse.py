@@ -0,0 +1,9 @@
+"""Server-Sent Events helpers."""
+
+import json
+
+
+def format_sse(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event with a JSON payload."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
@@ -0,0 +1,57 @@
+"""Text normalization helpers."""
+
+import re
+from typing import Iterable, Optional
+
+
+def normalize_ingredient(name: str) -> str:
+    """
+    Normalize an ingredient name for comparison.
+
+    Case-folds, trims, collapses inner whitespace and folds "ё" into "е",
+    so "  Свёкла " and "свекла" compare equal.
+    """
+    return " ".join(name.casefold().replace("ё", "е").split())
+
+
+def canonical_set(values: Optional[Iterable[str]]) -> tuple[str, ...]:
+    """Return sorted unique normalized values, dropping empty ones."""
+    if not values:
+        return ()
+    return tuple(sorted({v for v in map(normalize_ingredient, values) if v}))
+
+
+_WORD = re.compile(r"[^\W\d_]+")
+# Longest first, so "ами" is stripped before "и"
+_ENDINGS = sorted(
+    (
+        "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ой", "ей", "ый", "ий", "ая", "яя",
+        "ое", "ее", "ые", "ие", "ов", "ев", "ам", "ям", "ах", "ях", "ом", "ем", "ы", "и", "а", "я",
+        "о", "е", "у", "ю", "ь", "й", "es", "s",
+    ),
+    key=len,
+    reverse=True,
+)
+_STEM_LENGTH = 5
+# Negations such as "без" are not stop words: "без сахара" must not become "сахар"
+_STOP_WORDS = {"для", "или", "по", "вкусу", "свежий", "молотый", "and", "or", "fresh", "ground"}
+
+
+def _stem(word: str) -> str:
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            word = word[: -len(ending)]
+            break
+    return word[:_STEM_LENGTH]
+
+
+def ingredient_terms(name: str) -> tuple[str, ...]:
+    """
+    Return the search terms of an ingredient name.
+
+    Words are normalized, stripped of common Russian and English inflection
+    endings and cut to a short prefix, so "Томаты черри" and "томат" share
+    the term "томат". Numbers, short words and stop words are dropped.
+    """
+    words = _WORD.findall(normalize_ingredient(name))
+    return tuple(dict.fromkeys(_stem(w) for w in words if len(w) >= 3 and w not in _STOP_WORDS))
@@ -0,0 +1,72 @@
+"""
+Benchmark: per-request vs shared OpenAI client / AgentService.
+
+Starts the local stub from `benchmarks.stub_openai` with no added latency and
+counts the TCP connections it accepts. The same number of `suggest_meals`
+calls is then issued in two modes:
+
+- per-request: a new `OpenAIClient` + `AgentService` for every call, which is
+  what `app.core.dependencies` used to do;
+- shared: one client/service for all calls, as created by the app lifespan.
+
+The stub is plain TCP on localhost, so real savings against a TLS upstream
+are larger than reported here.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_client_pool --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.config import Settings
+from app.services.agent_service import AgentService
+from app.services.openai_client import OpenAIClient
+from benchmarks.stub_openai import StubConfig, StubOpenAIServer, parse_latency
+
+
+async def _run_per_request(settings: Settings, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        client = OpenAIClient(settings)
+        service = AgentService(client)
+        await service.suggest_meals(["яйца", "молоко"])
+        await client.close()
+    return time.perf_counter() - start
+
+
+async def _run_shared(settings: Settings, requests: int) -> float:
+    client = OpenAIClient(settings)
+    service = AgentService(client)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await service.suggest_meals(["яйца", "молоко"])
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return elapsed
+
+
+async def main(requests: int) -> None:
+    stub = StubOpenAIServer(StubConfig(parse_latency("fixed:0"), {}))
+    base_url = await stub.start()
+    settings = Settings(openai_api_key="bench", openai_base_url=base_url, openai_max_retries=0)
+
+    for name, runner in (("per-request", _run_per_request), ("shared", _run_shared)):
+        stub.connections = 0
+        elapsed = await runner(settings, requests)
+        print(
+            f"{name:>12}: {elapsed / requests * 1000:7.3f} ms/request, "
+            f"{stub.connections} TCP connections for {requests} requests"
+        )
+
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,65 @@
+"""
+Benchmark: response compression per coding, and what the compressed-body cache saves.
+
+For the bodies of the four model routes (see `bench_json_responses`), and
+every coding installed (`br` and `zstd` need `uv sync --extra compression`),
+reports:
+
+- size: compressed bytes against the JSON body;
+- cold: hashing the body for its ETag plus compressing it, as for a body
+  the worker has not served before;
+- cached: hashing plus the lookup in `ResponseCompressor`, as when the
+  same recipe is served again.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_compression --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.config import Settings
+from app.core.compression import ResponseCompressor, _compressors, digest_body
+from app.core.responses import ModelResponse
+from benchmarks.bench_json_responses import COMBINED, EXTRACTION, RECIPE_RESULT, SUGGESTIONS
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    codings = list(_compressors())
+    compressor = ResponseCompressor(Settings(openai_api_key="bench", openai_base_url="", compression_encodings=codings))
+    bodies = (
+        ("/extract-ingredients", ModelResponse(EXTRACTION).body),
+        ("/suggest-meals", ModelResponse(SUGGESTIONS).body),
+        ("/build-recipe", ModelResponse(RECIPE_RESULT).body),
+        ("/extract-and-suggest", ModelResponse(COMBINED).body),
+    )
+    print(f"{'route':<22} {'coding':<6} {'bytes':>12} {'cold':>10} {'cached':>10}")
+    for route, body in bodies:
+        for coding in codings:
+            compress = compressor._compressors[coding]
+            size = len(compress(body))
+
+            def cold() -> None:
+                digest_body(body)
+                compress(body)
+
+            cold_us = _per_call_us(cold, iterations)
+            cached_us = _per_call_us(lambda: compressor.compress(digest_body(body), coding, body), iterations)
+            print(f"{route:<22} {coding:<6} {len(body):5d} -> {size:4d} {cold_us:8.1f}us {cached_us:8.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
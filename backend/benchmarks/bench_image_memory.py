@@ -0,0 +1,83 @@
+"""
+Benchmark: peak Python memory per vision request, JSON tool path vs direct path.
+
+Compares, with tracemalloc, one `extract_ingredients` round trip to a local
+stub server through:
+
+- tool: the image is base64-encoded, dumped into a JSON argument string and
+  passed through the agent tool's `on_invoke_tool`, which parses it back,
+  validates it with `b64decode` and builds the data URL with an f-string
+  (how every request used to run);
+- direct: `AgentService.extract_ingredients`, which calls the typed tool
+  method with raw bytes; the image is base64-encoded chunk by chunk straight
+  into the serialized request body.
+
+Both peaks include the copy HTTP/1.1 framing makes of the request body.
+The tool path needs the openai-agents SDK (`uv sync --extra agents`).
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_image_memory --size-mb 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import tracemalloc
+
+from app.config import Settings
+from app.services.agent_service import AgentService
+from app.services.openai_client import OpenAIClient
+from benchmarks.stub_openai import StubConfig, StubOpenAIServer, parse_latency
+
+
+async def _tool_path(service: AgentService, data: bytes) -> None:
+    tool = service._get_agent().tools[0]  # vision_ingredient_extractor
+    args = json.dumps({"image_base64": base64.b64encode(data).decode("utf-8"), "mime_type": "image/jpeg"})
+    await tool.on_invoke_tool(None, args)
+
+
+async def _direct_path(service: AgentService, data: bytes) -> None:
+    await service.extract_ingredients(data, "image/jpeg")
+
+
+async def _peak(run, service: AgentService, data: bytes) -> int:
+    await run(service, data)  # warm up connections and lazy state
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    await run(service, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+async def main(size_mb: float) -> None:
+    data = b"\xff\xd8\xff" + os.urandom(int(size_mb * 1024 * 1024))
+    stub = StubOpenAIServer(StubConfig(parse_latency("fixed:0"), {}))
+    base_url = await stub.start()
+    settings = Settings(
+        openai_api_key="bench",
+        openai_base_url=base_url,
+        openai_max_retries=0,
+        image_cache_enabled=False,
+    )
+    client = OpenAIClient(settings)
+    service = AgentService(client)
+
+    print(f"image: {len(data) / 1024 / 1024:.1f} MiB")
+    for name, run in (("tool", _tool_path), ("direct", _direct_path)):
+        peak = await _peak(run, service, data)
+        print(f"{name:>7}: peak {peak / 1024 / 1024:7.1f} MiB ({peak / len(data):.1f}x image size)")
+
+    await client.close()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb))
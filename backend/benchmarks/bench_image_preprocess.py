@@ -0,0 +1,107 @@
+"""
+Benchmark: vision payload size and latency with and without image preprocessing.
+
+Generates a synthetic phone-camera-sized photo, then for both the raw upload
+and the output of `ImageService.prepare` reports the bytes sent upstream and
+the end-to-end `extract_ingredients` latency (preprocessing + encoding +
+request to a local stub server). Loopback transfer is nearly free, so the
+time to upload the request body over a link of `--uplink-mbps` is added as an
+estimate of what a real deployment pays.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_image_preprocess --width 4032 --height 3024
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import time
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.config import Settings
+from app.services.agent_service import AgentService
+from app.services.image_service import ImageService
+from app.services.openai_client import OpenAIClient
+from benchmarks.stub_openai import StubConfig, StubOpenAIServer, parse_latency
+
+
+def make_photo(width: int, height: int, quality: int = 95) -> bytes:
+    """Create a noisy, photo-like JPEG of the given size."""
+    rng = random.Random(42)
+    image = Image.new("RGB", (width, height), (190, 195, 205))
+    draw = ImageDraw.Draw(image)
+    for _ in range(200):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(width // 40, width // 6)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x, y, x + r, y + r * 0.7), fill=color)
+    image = image.filter(ImageFilter.GaussianBlur(2))
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(image, noise, 0.15)
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+async def _measure(service: AgentService, images: ImageService | None, data: bytes, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        if images is not None:
+            prepared = await images.prepare(data, "image/jpeg")
+            await service.extract_ingredients(prepared.data, prepared.mime_type)
+        else:
+            await service.extract_ingredients(data, "image/jpeg")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main(width: int, height: int, runs: int, uplink_mbps: float) -> None:
+    photo = make_photo(width, height)
+    stub = StubOpenAIServer(StubConfig(parse_latency("fixed:0"), {}))
+    base_url = await stub.start()
+    settings = Settings(
+        openai_api_key="bench",
+        openai_base_url=base_url,
+        openai_max_retries=0,
+        image_cache_enabled=False,
+    )
+    client = OpenAIClient(settings)
+    service = AgentService(client)
+    images = ImageService(settings)
+
+    prepared = await images.prepare(photo, "image/jpeg")
+    print(f"input: {width}x{height} JPEG, {len(photo) / 1024:.0f} KiB")
+    print(f"prepared: {prepared.mime_type}, {len(prepared.data) / 1024:.0f} KiB "
+          f"(max edge {settings.image_max_edge}px, quality {settings.image_output_quality})")
+
+    for name, image_service in (("raw", None), ("prepared", images)):
+        stub.bytes_received = 0
+        timings = await _measure(service, image_service, photo, runs)
+        payload = stub.bytes_received / runs
+        upload_ms = payload * 8 / (uplink_mbps * 1_000_000) * 1000
+        p50_ms = statistics.median(timings) * 1000
+        print(
+            f"{name:>9}: {payload / 1024:8.0f} KiB upstream/request, "
+            f"local p50 {p50_ms:7.1f} ms, "
+            f"with {uplink_mbps:g} Mbit/s upload {p50_ms + upload_ms:7.1f} ms"
+        )
+
+    images.close()
+    await client.close()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--uplink-mbps", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.width, args.height, args.runs, args.uplink_mbps))
@@ -0,0 +1,117 @@
+"""
+Benchmark: serializing route results to a response body, FastAPI's path vs `ModelResponse`.
+
+Compares, for the results of the four model routes:
+
+- fastapi: how routes used to answer. The returned model is validated again
+  against `response_model`, dumped to Python objects and encoded by
+  `JSONResponse` with the stdlib `json` module (for `/extract-and-suggest`,
+  which had no response model, two `model_dump()` dicts encoded by
+  `jsonable_encoder` and `json`);
+- model: `ModelResponse`, which serializes the model to bytes in one pass
+  with pydantic-core.
+
+Checks that both bodies decode to the same JSON. No network is involved;
+only the CPU work per response is timed.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_json_responses --iterations 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.responses import ModelResponse
+from app.models.domain import (
+    DishDraft,
+    ExtractAndSuggestResult,
+    ExtractIngredientsResult,
+    RecipeResult,
+    SuggestionsResult,
+)
+from benchmarks.stub_openai import RECIPE
+
+EXTRACTION = ExtractIngredientsResult.model_validate({
+    "ingredients": [
+        {"name": f"Ингредиент {i}", "confidence": 0.5 + i / 50, "notes": "в контейнере" if i % 3 == 0 else None}
+        for i in range(15)
+    ],
+    "unsure_items": ["Соус в банке", "Зелень"],
+    "spoiled_items": ["Молоко"],
+    "model": "gpt-4o",
+})
+SUGGESTIONS = SuggestionsResult.from_drafts(
+    [
+        DishDraft(
+            title=f"Блюдо {i}",
+            short_description="Быстрое блюдо из того, что есть в холодильнике, на сковороде.",
+            estimated_time_minutes=20 + i * 5,
+            confidence=0.8,
+        )
+        for i in range(5)
+    ],
+    "gpt-4o",
+)
+RECIPE_RESULT = RecipeResult.model_validate({**RECIPE, "suggestion_id": "id", "model": "gpt-4o"})
+COMBINED = ExtractAndSuggestResult(extraction=EXTRACTION, suggestions=SUGGESTIONS)
+
+
+def _fastapi_path(response_model: Optional[type], content: Any) -> Callable[[], Awaitable[bytes]]:
+    if response_model is None:
+        async def render() -> bytes:
+            # `/extract-and-suggest` returned a dict of dumps
+            dumped = {"extraction": content.extraction.model_dump(), "suggestions": content.suggestions.model_dump()}
+            return JSONResponse(jsonable_encoder(dumped)).body
+        return render
+
+    field = create_model_field(name="Response", type_=response_model, mode="serialization")
+
+    async def render() -> bytes:
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+    return render
+
+
+async def _per_call_us(render: Callable[[], Awaitable[bytes]], iterations: int) -> float:
+    await render()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await render()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int) -> None:
+    cases = (
+        ("/extract-ingredients", ExtractIngredientsResult, EXTRACTION),
+        ("/suggest-meals", SuggestionsResult, SUGGESTIONS),
+        ("/build-recipe", RecipeResult, RECIPE_RESULT),
+        ("/extract-and-suggest", None, COMBINED),
+    )
+    print(f"{'route':<22} {'bytes':>6} {'fastapi':>10} {'model':>10} {'speedup':>8}")
+    for route, response_model, content in cases:
+        legacy = _fastapi_path(response_model, content)
+
+        async def model() -> bytes:
+            return ModelResponse(content).body
+
+        body = await model()
+        assert json.loads(body) == json.loads(await legacy()), route
+        legacy_us = await _per_call_us(legacy, iterations)
+        model_us = await _per_call_us(model, iterations)
+        print(f"{route:<22} {len(body):6d} {legacy_us:8.1f}us {model_us:8.1f}us {legacy_us / model_us:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,134 @@
+"""
+Benchmark: per-call overhead of building response formats and parsing completions.
+
+Compares, for each structured tool output:
+
+- legacy: how every call used to run. The extraction schema is regenerated
+  with `model_json_schema()` and walked to forbid additional properties; the
+  suggestion and recipe completions are parsed with `json.loads` and then
+  rebuilt field by field (their hand-written schemas cost next to nothing);
+- registry: the precompiled `ResponseFormat` is looked up and the completion
+  is validated in one pass by its cached `TypeAdapter`.
+
+No network is involved; only the client-side CPU work per call is timed.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_response_formats --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import uuid
+from typing import Callable
+
+from app.models.domain import (
+    DishSummary,
+    ExtractIngredientsResult,
+    RecipeIngredient,
+    RecipeResult,
+    RecipeStep,
+    SuggestionsResult,
+)
+from app.models.response_formats import DISH_SUGGESTIONS_FORMAT, EXTRACTION_FORMAT, RECIPE_FORMAT
+from benchmarks.stub_openai import DISHES, EXTRACTION, RECIPE
+
+
+def _legacy_schema(model_cls) -> dict:
+    schema = model_cls.model_json_schema()
+
+    def add_additional_properties(obj):
+        if isinstance(obj, dict):
+            if obj.get("type") == "object":
+                obj["additionalProperties"] = False
+            for value in obj.values():
+                add_additional_properties(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                add_additional_properties(item)
+
+    add_additional_properties(schema)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model_cls.__name__, "schema": schema, "strict": False},
+    }
+
+
+def _legacy_extraction(raw: str) -> None:
+    _legacy_schema(ExtractIngredientsResult)
+    ExtractIngredientsResult.model_validate_json(raw)
+
+
+def _legacy_suggestions(raw: str) -> None:
+    dishes = json.loads(raw)["dishes"]
+    SuggestionsResult(
+        dishes=[
+            DishSummary(
+                suggestion_id=str(uuid.uuid4()),
+                title=dish["title"],
+                short_description=dish["short_description"],
+                estimated_time_minutes=dish["estimated_time_minutes"],
+                confidence=dish["confidence"],
+            )
+            for dish in dishes
+        ]
+    )
+
+
+def _legacy_recipe(raw: str) -> None:
+    result = json.loads(raw)
+    RecipeResult(
+        suggestion_id="id",
+        title=result["title"],
+        servings=result.get("servings"),
+        prep_time_minutes=result["prep_time_minutes"],
+        cook_time_minutes=result["cook_time_minutes"],
+        ingredients=[RecipeIngredient(**ing) for ing in result["ingredients"]],
+        steps=[RecipeStep(**step) for step in result["steps"]],
+        equipment=result.get("equipment", []),
+    )
+
+
+def _registry_extraction(raw: str) -> None:
+    EXTRACTION_FORMAT.response_format
+    ExtractIngredientsResult.from_draft(EXTRACTION_FORMAT.parse(raw))
+
+
+def _registry_suggestions(raw: str) -> None:
+    DISH_SUGGESTIONS_FORMAT.response_format
+    SuggestionsResult.from_drafts(DISH_SUGGESTIONS_FORMAT.parse(raw).dishes)
+
+
+def _registry_recipe(raw: str) -> None:
+    RECIPE_FORMAT.response_format
+    RecipeResult.from_draft(RECIPE_FORMAT.parse(raw), "id")
+
+
+def _per_call_us(fn: Callable[[str], None], raw: str, iterations: int) -> float:
+    fn(raw)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(raw)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    cases = (
+        ("extraction", json.dumps(EXTRACTION, ensure_ascii=False), _legacy_extraction, _registry_extraction),
+        ("suggestions", json.dumps(DISHES, ensure_ascii=False), _legacy_suggestions, _registry_suggestions),
+        ("recipe", json.dumps(RECIPE, ensure_ascii=False), _legacy_recipe, _registry_recipe),
+    )
+    print(f"{'output':<12} {'legacy':>10} {'registry':>10} {'speedup':>8}")
+    for name, raw, legacy, registry in cases:
+        legacy_us = _per_call_us(legacy, raw, iterations)
+        registry_us = _per_call_us(registry, raw, iterations)
+        print(f"{name:<12} {legacy_us:8.1f}us {registry_us:8.1f}us {legacy_us / registry_us:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,199 @@
+"""
+Benchmark: lookups in the shared SQLite cache tier versus the in-process tier.
+
+Fills a `SharedResultCache` file and an in-process `TTLCache` with the same
+recipe drafts, then times hits of:
+
+- in-process: `TTLCache.get`, which returns the live object;
+- shared, sequential: `SharedResultCache.get` from the event loop, i.e. the
+  SQLite read through the memory map and decoding of the binary value;
+- shared, raw read / decode only: the two parts of that lookup on their own;
+- shared, multi-process: the same lookups from several processes at once
+  while another process keeps writing, as with several uvicorn workers.
+
+Also reports the encoded size of a value and that the file stayed within
+its byte budget.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_shared_cache --entries 20000 --lookups 5000 --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import Settings
+from app.models.domain import RecipeDraft
+from app.services.shared_cache import SharedResultCache, _digest, dish_key
+from app.utils.cache import TTLCache
+from app.utils.codec import decode_model, encode_model
+
+WORDS = "картофель морковь лук чеснок курица говядина томат перец сыр сметана укроп петрушка рис гречка".split()
+
+
+def _draft(rng: random.Random, i: int) -> RecipeDraft:
+    def phrase(n: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    return RecipeDraft.model_validate({
+        "title": f"Блюдо {i}: {phrase(3)}",
+        "servings": rng.randint(1, 6),
+        "prep_time_minutes": rng.randint(5, 40),
+        "cook_time_minutes": rng.randint(10, 120),
+        "ingredients": [
+            {"ingredient": phrase(2), "quantity": f"{rng.randint(1, 500)} г", "preparation": phrase(2)}
+            for _ in range(rng.randint(5, 12))
+        ],
+        "steps": [
+            {"number": n + 1, "instruction": phrase(rng.randint(12, 30)), "tip": phrase(6) if n % 3 == 0 else None}
+            for n in range(rng.randint(4, 10))
+        ],
+    })
+
+
+def _settings(path: Path, max_bytes: int) -> Settings:
+    return Settings(
+        openai_api_key="bench",
+        openai_base_url="",
+        shared_cache_path=path,
+        shared_cache_max_bytes=max_bytes,
+    )
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+
+    return f"p50 {pick(0.5):8.1f}us  p99 {pick(0.99):8.1f}us"
+
+
+async def _lookups(path: Path, max_bytes: int, keys: list[tuple], lookups: int, seed: int) -> list[float]:
+    cache = SharedResultCache(_settings(path, max_bytes))
+    await cache.open()
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(lookups):
+        key = rng.choice(keys)
+        start = time.perf_counter()
+        await cache.get("recipe", key, RecipeDraft)
+        samples.append(time.perf_counter() - start)
+    await cache.close()
+    return samples
+
+
+def _reader(path: Path, max_bytes: int, keys: list[tuple], lookups: int, seed: int, results) -> None:
+    results.put(asyncio.run(_lookups(path, max_bytes, keys, lookups, seed)))
+
+
+def _writer(path: Path, max_bytes: int, stop, seed: int) -> None:
+    async def run() -> None:
+        cache = SharedResultCache(_settings(path, max_bytes))
+        await cache.open()
+        rng = random.Random(seed)
+        i = 0
+        while not stop.is_set():
+            cache.set("recipe", ("writer", i), _draft(rng, i))
+            i += 1
+            await asyncio.sleep(0.002)
+        await cache.close()
+
+    asyncio.run(run())
+
+
+async def main(entries: int, lookups: int, processes: int, max_mb: int, seed: int) -> None:
+    rng = random.Random(seed)
+    drafts = [_draft(rng, i) for i in range(entries)]
+    keys = [dish_key(draft.title, None, i) for i, draft in enumerate(drafts)]
+    max_bytes = max_mb * 2**20
+    sizes = sorted(len(encode_model(draft)) for draft in drafts[:1000])
+    json_sizes = sorted(len(draft.model_dump_json()) for draft in drafts[:1000])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "shared_cache.db"
+        cache = SharedResultCache(_settings(path, max_bytes))
+        await cache.open()
+        start = time.perf_counter()
+        for key, draft in zip(keys, drafts):
+            # What a background write costs, run inline so the fill is complete when timed
+            cache._set("recipe", _digest(key), encode_model(draft))
+        fill_us = (time.perf_counter() - start) / entries * 1e6
+
+        local: TTLCache[tuple, RecipeDraft] = TTLCache(max_entries=entries, ttl_seconds=3600)
+        for key, draft in zip(keys, drafts):
+            local.set(key, draft)
+
+        in_process, raw, decode = [], [], []
+        for _ in range(lookups):
+            key = rng.choice(keys)
+            t = time.perf_counter()
+            local.get(key)
+            in_process.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            data = cache._get("recipe", _digest(key))
+            raw.append(time.perf_counter() - t)
+            if data is None:
+                continue  # Evicted: the budget is smaller than the data set
+            t = time.perf_counter()
+            decode_model(RecipeDraft, data)
+            decode.append(time.perf_counter() - t)
+        await cache.close()
+
+        sequential = await _lookups(path, max_bytes, keys, lookups, seed)
+
+        context = multiprocessing.get_context("spawn")
+        results, stop = context.Queue(), context.Event()
+        writer = context.Process(target=_writer, args=(path, max_bytes, stop, seed))
+        readers = [
+            context.Process(target=_reader, args=(path, max_bytes, keys, lookups, seed + i, results))
+            for i in range(processes)
+        ]
+        writer.start()
+        start = time.perf_counter()
+        for reader in readers:
+            reader.start()
+        concurrent = [sample for _ in readers for sample in results.get()]
+        elapsed = time.perf_counter() - start
+        for reader in readers:
+            reader.join()
+        stop.set()
+        writer.join()
+
+        final = SharedResultCache(_settings(path, max_bytes))
+        await final.open()
+        stored_bytes = final.bytes
+        await final.close()
+
+    print(f"entries {entries}, value size p50 {sizes[len(sizes) // 2]} B encoded vs {json_sizes[len(json_sizes) // 2]} B JSON")
+    print(f"write                         {fill_us:8.1f}us per entry (background)")
+    print(f"in-process hit                {_percentiles(in_process)}")
+    print(f"shared hit, sequential        {_percentiles(sequential)}")
+    print(f"  raw SQLite read             {_percentiles(raw)}")
+    print(f"  decode                      {_percentiles(decode)}")
+    print(
+        f"shared hit, {processes} processes + writer {_percentiles(concurrent)}  "
+        f"({len(concurrent) / elapsed:.0f} lookups/s overall)"
+    )
+    print(
+        f"stored payload                {stored_bytes / 2**20:.1f} MiB of {max_mb} MiB budget, "
+        f"{len(decode)}/{lookups} sampled keys still cached"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--max-mb", type=int, default=256, help="Byte budget of the shared file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.entries, args.lookups, args.processes, args.max_mb, args.seed))
@@ -0,0 +1,100 @@
+"""
+Benchmark: MinHash/LSH lookup of similar ingredient sets at scale.
+
+Fills a `MinHashIndex` with random ingredient sets (3-10 items from a
+vocabulary of a few hundred names, a handful of servings/preference
+partitions) and times:
+
+- insert: indexing one set;
+- near-duplicate lookup: a stored set with one ingredient swapped, which
+  should be found when its similarity exceeds the threshold;
+- miss lookup: a fresh random set, which usually matches nothing.
+
+Also reports recall of near duplicates above the threshold and the
+memory held by the index.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_similar_suggestions --entries 300000 --queries 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.utils.minhash import MinHashIndex, jaccard
+
+VOCABULARY = [f"ингредиент {i}" for i in range(400)]
+PARTITIONS = [(servings, prefs) for servings in (None, 1, 2, 4) for prefs in ((), ("вегетарианское",))]
+
+
+def _random_set(rng: random.Random) -> tuple[str, ...]:
+    return tuple(sorted(rng.sample(VOCABULARY, rng.randint(3, 10))))
+
+
+def _swap_one(rng: random.Random, elements: tuple[str, ...]) -> tuple[str, ...]:
+    kept = list(elements)
+    kept.pop(rng.randrange(len(kept)))
+    while True:
+        extra = rng.choice(VOCABULARY)
+        if extra not in elements:
+            return tuple(sorted(kept + [extra]))
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+
+    return f"p50 {pick(0.5):7.1f}us  p99 {pick(0.99):7.1f}us"
+
+
+def main(entries: int, queries: int, threshold: float, seed: int) -> None:
+    rng = random.Random(seed)
+    tracemalloc.start()
+    index: MinHashIndex[int] = MinHashIndex(threshold=threshold, max_entries=entries, ttl_seconds=3600)
+    stored = []
+    start = time.perf_counter()
+    for i in range(entries):
+        elements, partition = _random_set(rng), rng.choice(PARTITIONS)
+        index.insert(elements, i, partition)
+        stored.append((elements, partition))
+    insert_us = (time.perf_counter() - start) / entries * 1e6
+    memory_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    near, miss = [], []
+    eligible = found = 0
+    for _ in range(queries):
+        elements, partition = rng.choice(stored)
+        query = _swap_one(rng, elements)
+        t = time.perf_counter()
+        match = index.query(query, partition)
+        near.append(time.perf_counter() - t)
+        if jaccard(frozenset(query), frozenset(elements)) > threshold:
+            eligible += 1
+            found += match is not None
+
+        t = time.perf_counter()
+        index.query(_random_set(rng), rng.choice(PARTITIONS))
+        miss.append(time.perf_counter() - t)
+
+    print(f"entries {len(index)}, bands x rows {index.bands}x{index.rows}, threshold {threshold}")
+    print(f"insert                 {insert_us:7.1f}us per set")
+    print(f"near-duplicate lookup  {_percentiles(near)}")
+    print(f"miss lookup            {_percentiles(miss)}")
+    print(f"recall at threshold    {found}/{eligible} ({found / max(eligible, 1):.1%})")
+    print(f"index memory           {memory_mb:.0f} MiB ({memory_mb * 2**20 / entries:.0f} B per entry, values excluded)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.entries, args.queries, args.threshold, args.seed)
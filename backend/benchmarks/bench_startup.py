@@ -0,0 +1,104 @@
+"""
+Benchmark: cold import time and memory of `app.main`.
+
+Every sample runs in a fresh interpreter, as a worker process or a freshly
+started container would, and measures:
+
+- direct: `import app.main`, which builds the app in direct-call mode; the
+  openai-agents SDK is not imported;
+- agents: the same plus building the agent (`AgentService._get_agent`),
+  i.e. what the first use of agent orchestration adds.
+
+For each it reports the median import time, the resident set size after
+import and the number of loaded modules. Results are compared with the
+committed `benchmarks/results/startup.json`; `--save` overwrites it.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.bench_startup --runs 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RESULTS = Path(__file__).parent / "results" / "startup.json"
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+if {agents}:
+    from app.config import get_settings
+    from app.services.agent_service import AgentService
+    from app.services.openai_client import OpenAIClient
+    AgentService(OpenAIClient(get_settings()))._get_agent()
+elapsed = time.perf_counter() - start
+rss = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS:"))
+print(json.dumps({{"seconds": elapsed, "rss_kib": rss, "modules": len(sys.modules), "agents_loaded": "agents" in sys.modules}}))
+"""
+
+MODES = {"direct": False, "agents": True}
+
+
+def _sample(agents: bool) -> dict:
+    env = {**os.environ, "OPENAI_API_KEY": "bench", "OPENAI_BASE_URL": ""}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(agents=agents)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def _measure(agents: bool, runs: int) -> dict:
+    _sample(agents)  # Warm the OS file cache and bytecode caches
+    samples = [_sample(agents) for _ in range(runs)]
+    return {
+        "import_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1),
+        "rss_mib": round(statistics.median(s["rss_kib"] for s in samples) / 1024, 1),
+        "modules": samples[-1]["modules"],
+        "agents_loaded": samples[-1]["agents_loaded"],
+    }
+
+
+def main(runs: int, save: bool) -> None:
+    results = {mode: _measure(agents, runs) for mode, agents in MODES.items()}
+    baseline = json.loads(RESULTS.read_text())["modes"] if RESULTS.exists() else {}
+
+    for mode, result in results.items():
+        line = (
+            f"{mode:8} import {result['import_ms']:7.1f} ms  rss {result['rss_mib']:6.1f} MiB  "
+            f"{result['modules']:5d} modules  agents SDK loaded: {result['agents_loaded']}"
+        )
+        if mode in baseline:
+            before = baseline[mode]
+            line += f"  (saved: {before['import_ms']:.1f} ms, {before['rss_mib']:.1f} MiB)"
+        print(line)
+
+    if save:
+        RESULTS.parent.mkdir(parents=True, exist_ok=True)
+        RESULTS.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "runs": runs,
+            "modes": results,
+        }, indent=2) + "\n")
+        print(f"Saved to {RESULTS}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per mode")
+    parser.add_argument("--save", action="store_true", help="Overwrite the committed results")
+    args = parser.parse_args()
+    main(args.runs, args.save)
@@ -0,0 +1,341 @@
+"""
+Load test: drive the API routes at fixed concurrency against a stub OpenAI server.
+
+Starts `benchmarks.stub_openai` and `uvicorn main:app` with the requested
+number of workers on free local ports, then runs every scenario at every
+concurrency level for a fixed duration with closed-loop clients. Reports
+p50/p95/p99 latency, throughput, error count and the peak resident memory
+of each uvicorn worker.
+
+Caches are disabled by default so every request reaches the stub; inputs
+are randomized so identical in-flight calls are not coalesced either.
+
+Results can be saved and later used as a baseline: the run fails (exit
+code 1) when a scenario's p95 grows or its throughput drops by more than
+`--tolerance`, or its error rate rises.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.loadgen --workers 2 --concurrency 1 8 32 --duration 10 \\
+        --latency lognormal:0.3:0.4 --save results.json
+    uv run python -m benchmarks.loadgen --baseline results.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.bench_image_preprocess import make_photo
+from benchmarks.stub_openai import add_arguments
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+INGREDIENTS = [
+    "яйца", "молоко", "сыр", "помидоры", "огурцы", "курица", "рис", "картофель",
+    "лук", "морковь", "чеснок", "перец", "гречка", "сметана", "капуста", "грибы",
+]
+
+
+@dataclass
+class ScenarioResult:
+    """Outcome of one scenario at one concurrency level."""
+
+    scenario: str
+    concurrency: int
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    worker_rss_mb: list[float] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario}@{self.concurrency}"
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _random_ingredients(rng: random.Random) -> list[str]:
+    return rng.sample(INGREDIENTS, rng.randint(3, 8))
+
+
+def _worker_pids(parent: int) -> list[int]:
+    """Return the pids of the uvicorn workers, or the server itself when it has none."""
+    children = []
+    for task in Path(f"/proc/{parent}/task").glob("*"):
+        try:
+            children += [int(pid) for pid in (task / "children").read_text().split()]
+        except OSError:
+            pass
+    # Skip the multiprocessing resource tracker
+    workers = [pid for pid in children if b"resource_tracker" not in _cmdline(pid)]
+    return workers or [parent]
+
+
+def _cmdline(pid: int) -> bytes:
+    try:
+        return Path(f"/proc/{pid}/cmdline").read_bytes()
+    except OSError:
+        return b""
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class Scenarios:
+    """Request builders for each load-tested route."""
+
+    def __init__(self, photo: bytes, rng: random.Random):
+        self.photo = photo
+        self.rng = rng
+
+    def names(self) -> list[str]:
+        return ["extract-ingredients", "suggest-meals", "build-recipe", "build-recipe-stream", "extract-and-suggest"]
+
+    async def extract_ingredients(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(
+            "/api/v1/extract-ingredients",
+            files={"image": ("fridge.jpg", self.photo, "image/jpeg")},
+        )
+
+    async def suggest_meals(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(
+            "/api/v1/suggest-meals",
+            json={"ingredients": _random_ingredients(self.rng), "servings": self.rng.randint(1, 6)},
+        )
+
+    async def build_recipe(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(
+            "/api/v1/build-recipe",
+            json={"suggestion_id": str(uuid.uuid4()), "title": "Омлет с сыром", "servings": 2},
+        )
+
+    async def build_recipe_stream(self, client: httpx.AsyncClient) -> httpx.Response:
+        payload = {"suggestion_id": str(uuid.uuid4()), "title": "Омлет с сыром", "servings": 2}
+        async with client.stream("POST", "/api/v1/build-recipe/stream", json=payload) as response:
+            async for _ in response.aiter_bytes():
+                pass
+        return response
+
+    async def extract_and_suggest(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(
+            "/api/v1/extract-and-suggest",
+            files={"image": ("fridge.jpg", self.photo, "image/jpeg")},
+            data={"servings": "2"},
+        )
+
+    def get(self, name: str) -> Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]:
+        return getattr(self, name.replace("-", "_"))
+
+
+async def run_scenario(
+    base_url: str,
+    request: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]],
+    concurrency: int,
+    duration: float,
+    server_pid: int,
+) -> tuple[list[float], int, float, list[float]]:
+    """Run closed-loop clients for `duration` seconds; return latencies, errors, elapsed and peak RSS."""
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def loop() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await request(client)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        peak: dict[int, float] = {}
+
+        async def sample_memory() -> None:
+            while True:
+                for pid in _worker_pids(server_pid):
+                    peak[pid] = max(peak.get(pid, 0.0), _rss_mb(pid))
+                await asyncio.sleep(0.2)
+
+        sampler = asyncio.create_task(sample_memory())
+        start = time.perf_counter()
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+
+    return latencies, errors, elapsed, sorted(peak.values(), reverse=True)
+
+
+def _server_env(stub_url: str, args: argparse.Namespace, data_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        OPENAI_API_KEY="sk-loadtest",
+        OPENAI_BASE_URL=stub_url,
+        STORE_PATH=str(Path(data_dir) / "loadtest.db"),
+        JOB_STORE_PATH=str(Path(data_dir) / "loadtest_jobs.db"),
+        PREFETCH_ENABLED="false",
+        LOG_LEVEL="WARNING",
+    )
+    if not args.with_caches:
+        env.update(IMAGE_CACHE_ENABLED="false", SUGGESTION_CACHE_ENABLED="false")
+    return env
+
+
+async def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Process exited with code {process.returncode} before becoming ready")
+            try:
+                await client.get(url, timeout=1)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def compare(results: list[ScenarioResult], baseline: dict, tolerance: float) -> list[str]:
+    """Return regressions of `results` against a saved baseline."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.key)
+        if previous is None:
+            continue
+        if result.p95_ms > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{result.key}: p95 {previous['p95_ms']:.0f}ms -> {result.p95_ms:.0f}ms")
+        if result.rps < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{result.key}: rps {previous['rps']:.1f} -> {result.rps:.1f}")
+        previous_rate = previous["errors"] / previous["requests"] if previous["requests"] else 0.0
+        if result.error_rate > previous_rate + tolerance * 0.05:
+            regressions.append(f"{result.key}: error rate {previous_rate:.1%} -> {result.error_rate:.1%}")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    stub_port, api_port = _free_port(), _free_port()
+    stub_cmd = [sys.executable, "-m", "benchmarks.stub_openai", "--port", str(stub_port)]
+    stub_cmd += [f"--latency={spec}" for spec in args.latency]
+    stub_cmd += ["--error-rate", str(args.error_rate), "--error-status", str(args.error_status), "--seed", str(args.seed)]
+    stub_url = f"http://127.0.0.1:{stub_port}/v1"
+    api_url = f"http://127.0.0.1:{api_port}"
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        stub = subprocess.Popen(stub_cmd, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port),
+             "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR,
+            env=_server_env(stub_url, args, data_dir),
+        )
+        try:
+            await _wait_ready(f"http://127.0.0.1:{stub_port}/", stub)
+            await _wait_ready(f"{api_url}/health", server)
+
+            scenarios = Scenarios(make_photo(args.photo_width, args.photo_height), random.Random(args.seed))
+            names = args.scenarios or scenarios.names()
+            results = []
+            print(f"{'scenario':<22} {'conc':>5} {'reqs':>6} {'err':>5} {'rps':>8} "
+                  f"{'p50':>8} {'p95':>8} {'p99':>8}  worker RSS MB")
+            for name in names:
+                for concurrency in args.concurrency:
+                    latencies, errors, elapsed, rss = await run_scenario(
+                        api_url, scenarios.get(name), concurrency, args.duration, server.pid
+                    )
+                    result = ScenarioResult(
+                        scenario=name,
+                        concurrency=concurrency,
+                        requests=len(latencies),
+                        errors=errors,
+                        rps=len(latencies) / elapsed,
+                        p50_ms=_percentile(latencies, 0.50) * 1000,
+                        p95_ms=_percentile(latencies, 0.95) * 1000,
+                        p99_ms=_percentile(latencies, 0.99) * 1000,
+                        worker_rss_mb=[round(mb, 1) for mb in rss],
+                    )
+                    results.append(result)
+                    print(f"{name:<22} {concurrency:>5} {result.requests:>6} {errors:>5} {result.rps:>8.1f} "
+                          f"{result.p50_ms:>6.0f}ms {result.p95_ms:>6.0f}ms {result.p99_ms:>6.0f}ms  "
+                          f"{', '.join(f'{mb:.0f}' for mb in result.worker_rss_mb)}")
+        finally:
+            for process in (server, stub):
+                process.terminate()
+            for process in (server, stub):
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    if args.save:
+        Path(args.save).write_text(
+            json.dumps({result.key: asdict(result) for result in results}, indent=2)
+        )
+        print(f"Saved results to {args.save}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario and concurrency level")
+    parser.add_argument("--scenarios", nargs="+", choices=Scenarios(b"", random.Random()).names())
+    parser.add_argument("--photo-width", type=int, default=4032)
+    parser.add_argument("--photo-height", type=int, default=3024)
+    parser.add_argument("--with-caches", action="store_true", help="Keep the image and suggestion caches enabled")
+    parser.add_argument("--save", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    add_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,289 @@
+"""
+Stub OpenAI-compatible server for offline load tests.
+
+Answers `POST /v1/chat/completions` with canned, schema-valid JSON for the
+response format named in the request (`ExtractIngredientsResult`,
+`DishSuggestions`, `Recipe`), after a delay drawn from a configurable
+latency distribution. Streaming requests get Server-Sent Events chunks
+spread over the same delay, with a final usage chunk when
+`stream_options.include_usage` is set. A share of requests can be failed
+on purpose to exercise client retries.
+
+Latency specs: `fixed:SECONDS`, `uniform:LOW:HIGH` or `lognormal:MEDIAN:SIGMA`,
+optionally prefixed with a response format name to override it for one tool.
+
+Usage (from the backend directory):
+    uv run python -m benchmarks.stub_openai --port 8100 \\
+        --latency lognormal:0.3:0.4 --latency Recipe=lognormal:1.5:0.3 \\
+        --error-rate 0.01 --error-status 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from app.models.response_formats import REGISTRY
+
+EXTRACTION = {
+    "ingredients": [{"name": "Яйца", "confidence": 0.9, "notes": None}],
+    "unsure_items": [],
+    "spoiled_items": [],
+}
+
+DISHES = {
+    "dishes": [
+        {
+            "title": "Омлет",
+            "short_description": "Быстрый завтрак",
+            "estimated_time_minutes": 10,
+            "confidence": 0.9,
+        }
+    ]
+}
+
+RECIPE = {
+    "title": "Омлет с сыром",
+    "servings": 2,
+    "prep_time_minutes": 5,
+    "cook_time_minutes": 10,
+    "ingredients": [
+        {"ingredient": f"Ингредиент {i}", "quantity": f"{i * 10} г", "preparation": "нарезать"}
+        for i in range(1, 11)
+    ],
+    "steps": [
+        {"number": i, "instruction": f"Шаг приготовления номер {i}.", "tip": None}
+        for i in range(1, 9)
+    ],
+    "equipment": ["Сковорода", "Миска", "Венчик"],
+}
+
+CANNED = {
+    "ExtractIngredientsResult": EXTRACTION,
+    "DishSuggestions": DISHES,
+    "Recipe": RECIPE,
+}
+STREAM_CHUNKS = 24
+
+# Canned answers must stay valid for the schemas the service actually sends
+for _name, _content in CANNED.items():
+    REGISTRY[_name].parse(json.dumps(_content))
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a latency spec into a sampler of delays in seconds."""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub server."""
+
+    latency: Callable[[random.Random], float]
+    latency_by_format: dict[str, Callable[[random.Random], float]]
+    error_rate: float = 0.0
+    error_status: int = 500
+    seed: int = 0
+
+
+class StubOpenAIServer:
+    """Keep-alive HTTP/1.1 server implementing the chat completions endpoint."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+        self.bytes_received = 0
+        self._rng = random.Random(config.seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}/v1"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in self._writers:
+                writer.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                self.bytes_received += len(head) + length
+
+                if method == "POST" and path.endswith("/chat/completions"):
+                    await self._completion(json.loads(body), len(body), writer)
+                else:
+                    self._respond(writer, 404, b'{"error":{"message":"not found"}}')
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _completion(self, request: dict, request_size: int, writer: asyncio.StreamWriter) -> None:
+        self.requests += 1
+        name = request.get("response_format", {}).get("json_schema", {}).get("name", "")
+        sampler = self.config.latency_by_format.get(name, self.config.latency)
+        delay = sampler(self._rng)
+
+        if self._rng.random() < self.config.error_rate:
+            self.errors += 1
+            await asyncio.sleep(delay / 4)
+            extra = {"retry-after": "1"} if self.config.error_status == 429 else {}
+            self._respond(writer, self.config.error_status, b'{"error":{"message":"injected failure"}}', extra)
+            return
+
+        content = json.dumps(CANNED.get(name, CANNED["ExtractIngredientsResult"]), ensure_ascii=False)
+        usage = {
+            "prompt_tokens": request_size // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": request_size // 4 + len(content) // 4,
+        }
+        if request.get("stream"):
+            include_usage = bool(request.get("stream_options", {}).get("include_usage"))
+            await self._stream(content, usage if include_usage else None, delay, writer)
+            return
+
+        await asyncio.sleep(delay)
+        response = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": usage,
+        }
+        self._respond(writer, 200, json.dumps(response, ensure_ascii=False).encode())
+
+    async def _stream(self, content: str, usage: Optional[dict], delay: float, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        size = max(1, math.ceil(len(content) / STREAM_CHUNKS))
+        pieces = [content[i:i + size] for i in range(0, len(content), size)]
+        # A fifth of the delay before the first token, the rest spread over the chunks
+        await asyncio.sleep(delay * 0.2)
+        for piece in pieces:
+            self._write_event(writer, self._chunk([{"index": 0, "delta": {"content": piece}, "finish_reason": None}]))
+            await writer.drain()
+            await asyncio.sleep(delay * 0.8 / len(pieces))
+        self._write_event(writer, self._chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if usage is not None:
+            self._write_event(writer, self._chunk([], usage))
+        self._write_chunk(writer, b"data: [DONE]\n\n")
+        self._write_chunk(writer, b"")
+
+    @staticmethod
+    def _chunk(choices: list, usage: Optional[dict] = None) -> dict:
+        chunk = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "stub",
+            "choices": choices,
+        }
+        if usage is not None:
+            chunk["usage"] = usage
+        return chunk
+
+    def _write_event(self, writer: asyncio.StreamWriter, data: dict) -> None:
+        self._write_chunk(writer, b"data: " + json.dumps(data, ensure_ascii=False).encode() + b"\n\n")
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+        extra = "".join(f"{key}: {value}\r\n" for key, value in (headers or {}).items())
+        writer.write(
+            f"HTTP/1.1 {status} STUB\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n{extra}\r\n".encode()
+            + body
+        )
+
+
+def build_config(latency: list[str], error_rate: float, error_status: int, seed: int) -> StubConfig:
+    """Build a stub configuration from command-line style options."""
+    default = parse_latency("lognormal:0.3:0.4")
+    by_format = {}
+    for spec in latency:
+        name, sep, rest = spec.partition("=")
+        if sep:
+            by_format[name] = parse_latency(rest)
+        else:
+            default = parse_latency(spec)
+    return StubConfig(default, by_format, error_rate, error_status, seed)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the stub options to a parser."""
+    parser.add_argument("--latency", action="append", default=[], help="[FORMAT=]fixed:S|uniform:LO:HI|lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = build_config(args.latency, args.error_rate, args.error_status, args.seed)
+    server = StubOpenAIServer(config)
+    url = await server.start(args.host, args.port)
+    print(f"stub OpenAI server listening on {url}", flush=True)
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
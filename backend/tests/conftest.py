@@ -0,0 +1,126 @@
+"""Shared fixtures: settings and services talking to the stub OpenAI server."""
+
+from __future__ import annotations
+
+import contextlib
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator
+
+import httpx
+import pytest
+
+from fastapi import FastAPI
+
+from app.config import Settings, get_settings
+from app.services.admission import AdmissionController
+from app.services.agent_service import AgentService
+from app.services.openai_client import OpenAIClient
+from benchmarks.stub_openai import StubConfig, StubOpenAIServer, parse_latency
+
+
+@pytest.fixture
+def stub_config() -> StubConfig:
+    """Stub server behaviour: every call answered after a short fixed delay."""
+    return StubConfig(parse_latency("fixed:0.01"), {})
+
+
+@pytest.fixture
+async def stub(stub_config: StubConfig) -> AsyncIterator[StubOpenAIServer]:
+    """Stub OpenAI server."""
+    server = StubOpenAIServer(stub_config)
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def stub_url(stub: StubOpenAIServer) -> str:
+    """Base URL of the running stub server."""
+    return await stub.start()
+
+
+@pytest.fixture
+def app_env(tmp_path: Path, stub_url: str) -> dict[str, str]:
+    """Environment of a test app, by setting name; everything it writes stays in `tmp_path`."""
+    return {
+        "OPENAI_API_KEY": "test",
+        "OPENAI_BASE_URL": stub_url,
+        "STORE_PATH": str(tmp_path / "holodilnik.db"),
+        "JOB_STORE_PATH": str(tmp_path / "jobs.db"),
+        "SHARED_CACHE_PATH": str(tmp_path / "shared_cache.db"),
+        "PREFETCH_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+@pytest.fixture
+def settings(app_env: dict[str, str]) -> Settings:
+    """Settings pointing at the stub server, with files in a temporary directory."""
+    return Settings(**{key.lower(): value for key, value in app_env.items()})
+
+
+@pytest.fixture
+async def openai_client(settings: Settings) -> AsyncIterator[OpenAIClient]:
+    client = OpenAIClient(settings)
+    yield client
+    await client.close()
+
+
+@pytest.fixture
+async def agent_service(openai_client: OpenAIClient) -> AsyncIterator[AgentService]:
+    """Agent service without caches, store or admission control."""
+    service = AgentService(openai_client)
+    yield service
+    await service.close()
+
+
+@pytest.fixture
+async def admitted_service(openai_client: OpenAIClient, settings: Settings) -> AsyncIterator[AgentService]:
+    """Agent service holding admission slots for its upstream calls."""
+    service = AgentService(openai_client, admission=AdmissionController(settings))
+    yield service
+    await service.close()
+
+
+@pytest.fixture
+def make_app(monkeypatch: pytest.MonkeyPatch, app_env: dict[str, str]) -> Iterator[Callable[..., FastAPI]]:
+    """Factory of test apps, not started; keyword arguments override settings by env name."""
+
+    def create(**env: str) -> FastAPI:
+        for key, value in {**app_env, **env}.items():
+            monkeypatch.setenv(key, value)
+        get_settings.cache_clear()
+        # Not at module level: importing app.main creates an app from the environment
+        from app.main import create_app
+
+        return create_app()
+
+    yield create
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def app_client(
+    make_app: Callable[..., FastAPI],
+) -> Callable[..., contextlib.AbstractAsyncContextManager[httpx.AsyncClient]]:
+    """
+    Factory of clients of a started app; keyword arguments override settings by env name.
+
+    Example: `async with app_client(JOBS_WORKERS="1") as client: ...`
+    """
+
+    @contextlib.asynccontextmanager
+    async def open_client(**env: str) -> AsyncIterator[httpx.AsyncClient]:
+        app = make_app(**env)
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                yield client
+
+    return open_client
+
+
+@pytest.fixture
+async def client(app_client) -> AsyncIterator[httpx.AsyncClient]:
+    """Client of an app started with the default test settings."""
+    async with app_client() as client:
+        yield client
@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import OverloadedError, QueueFullError
+from app.services.admission import AdmissionLane, background_priority
+
+
+async def _hold(lane: AdmissionLane, release: asyncio.Event, admitted: list, name: str) -> None:
+    async with lane.admit():
+        admitted.append(name)
+        await release.wait()
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_calls_beyond_the_limit_wait_for_a_slot():
+    lane = AdmissionLane("recipe", max_concurrency=2, max_queue=4, max_wait=5)
+    release = asyncio.Event()
+    admitted = []
+
+    tasks = [asyncio.create_task(_hold(lane, release, admitted, name)) for name in "abc"]
+    await _settle()
+    assert admitted == ["a", "b"]
+    assert lane.stats()["active"] == 2 and lane.waiting == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert admitted == ["a", "b", "c"]
+    assert lane.stats() == {
+        "active": 0,
+        "waiting": 0,
+        "max_concurrency": 2,
+        "admitted": 3,
+        "queued": 1,
+        "rejected_full": 0,
+        "rejected_timeout": 0,
+    }
+
+
+async def test_full_queue_rejects_with_retry_after():
+    lane = AdmissionLane("suggestion", max_concurrency=1, max_queue=1, max_wait=5)
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(_hold(lane, release, [], name)) for name in "ab"]
+    await _settle()
+
+    with pytest.raises(QueueFullError) as excinfo:
+        async with lane.admit():
+            pass
+
+    assert excinfo.value.retry_after >= 1
+    assert lane.rejected_full == 1
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_wait_timeout_rejects_and_leaves_the_queue():
+    lane = AdmissionLane("vision", max_concurrency=1, max_queue=4, max_wait=0.05)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(lane, release, [], "a"))
+    await _settle()
+
+    with pytest.raises(OverloadedError):
+        async with lane.admit():
+            pass
+
+    assert lane.waiting == 0 and lane.rejected_timeout == 1
+    release.set()
+    await holder
+    assert lane.stats()["active"] == 0
+
+
+async def test_interactive_calls_are_admitted_before_background_ones():
+    lane = AdmissionLane("recipe", max_concurrency=1, max_queue=4, max_wait=5)
+    release = asyncio.Event()
+    admitted = []
+
+    async def background(name: str) -> None:
+        async with background_priority():
+            await _hold(lane, release, admitted, name)
+
+    tasks = [asyncio.create_task(_hold(lane, release, admitted, "first"))]
+    await _settle()
+    tasks.append(asyncio.create_task(background("prefetch")))
+    await _settle()
+    tasks.append(asyncio.create_task(_hold(lane, release, admitted, "user")))
+    await _settle()
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert admitted == ["first", "user", "prefetch"]
+
+
+async def test_slot_handed_to_a_cancelled_waiter_passes_to_the_next():
+    lane = AdmissionLane("recipe", max_concurrency=1, max_queue=4, max_wait=5)
+    release = asyncio.Event()
+    admitted = []
+    holder = asyncio.create_task(_hold(lane, release, admitted, "holder"))
+    await _settle()
+    cancelled = asyncio.create_task(_hold(lane, release, admitted, "cancelled"))
+    await _settle()
+    waiting = asyncio.create_task(_hold(lane, asyncio.Event(), admitted, "next"))
+    await _settle()
+
+    # The holder hands its slot over; the waiter is cancelled before it wakes up
+    release.set()
+    await holder
+    cancelled.cancel()
+    await _settle()
+
+    assert cancelled.cancelled()
+    assert admitted == ["holder", "next"]
+    assert lane.stats()["active"] == 1 and lane.waiting == 0
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert lane.stats()["active"] == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue_without_taking_a_slot():
+    lane = AdmissionLane("recipe", max_concurrency=1, max_queue=4, max_wait=5)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(lane, release, [], "holder"))
+    await _settle()
+    waiter = asyncio.create_task(_hold(lane, release, [], "waiter"))
+    await _settle()
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert lane.waiting == 0
+
+    release.set()
+    await holder
+    assert lane.stats()["active"] == 0
+
+
+async def test_route_rejects_with_429_and_retry_after(app_client):
+    async with app_client(ADMISSION_SUGGESTION_CONCURRENCY="1", ADMISSION_MAX_QUEUE="0") as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/v1/suggest-meals", json={"ingredients": [ingredient]})
+            for ingredient in ("томат", "курица", "рис")
+        ))
+        stats = (await client.get("/stats")).json()["admission"]["suggestion"]
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 429, 429]
+    assert all(int(r.headers["retry-after"]) >= 1 for r in responses if r.status_code == 429)
+    assert stats["rejected_full"] == 2
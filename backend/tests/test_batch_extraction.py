@@ -0,0 +1,67 @@
+from app.models.domain import ExtractIngredientsResult
+from benchmarks.bench_image_preprocess import make_photo
+
+PHOTO = make_photo(640, 480)
+BATCH = "/api/v1/extract-ingredients/batch"
+
+
+def test_merge_deduplicates_by_normalized_name():
+    merged = ExtractIngredientsResult.merge([
+        ExtractIngredientsResult.model_validate({
+            "ingredients": [{"name": "Свёкла", "confidence": 0.4}, {"name": "молоко", "confidence": 0.9}],
+            "unsure_items": ["Сыр"],
+            "model": "vision-1",
+        }),
+        ExtractIngredientsResult.model_validate({
+            "ingredients": [{"name": "свекла ", "confidence": 0.8, "notes": "в пакете"}],
+            "unsure_items": ["сыр"],
+            "spoiled_items": ["хлеб"],
+            "model": "vision-2",
+        }),
+    ])
+
+    assert [(i.name, i.confidence, i.notes) for i in merged.ingredients] == [
+        ("свекла ", 0.8, "в пакете"),
+        ("молоко", 0.9, None),
+    ]
+    assert merged.unsure_items == ["Сыр"]
+    assert merged.spoiled_items == ["хлеб"]
+    assert merged.model == "vision-1,vision-2"
+
+
+async def test_batch_merges_photos_and_reports_failures(client, stub):
+    files = [
+        ("images", ("fridge.jpg", PHOTO, "image/jpeg")),
+        ("images", ("pantry.jpg", make_photo(480, 640), "image/jpeg")),
+        ("images", ("notes.txt", b"not a photo", "text/plain")),
+    ]
+
+    response = await client.post(BATCH, files=files)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["images_processed"] == 2
+    assert [ingredient["name"] for ingredient in body["ingredients"]] == ["Яйца"]
+    assert body["errors"] == [{
+        "index": 2,
+        "filename": "notes.txt",
+        "error": "ImageValidationError",
+        "message": "File is not a recognised JPEG, PNG, WebP or GIF image (declared type: text/plain)",
+    }]
+    assert stub.requests == 2
+
+
+async def test_batch_fails_when_no_photo_could_be_processed(client):
+    response = await client.post(BATCH, files=[("images", ("notes.txt", b"not a photo", "text/plain"))])
+
+    assert response.status_code == 400
+    assert response.json()["error"] == "ImageValidationError"
+
+
+async def test_batch_rejects_too_many_photos(app_client, stub):
+    async with app_client(BATCH_MAX_IMAGES="2") as client:
+        response = await client.post(BATCH, files=[("images", ("fridge.jpg", PHOTO, "image/jpeg"))] * 3)
+
+    assert response.status_code == 400
+    assert response.json()["details"] == {"count": 3, "max_images": 2}
+    assert stub.requests == 0
@@ -0,0 +1,162 @@
+import gzip
+
+import pytest
+
+from app.core.compression import ResponseCompressor, digest_body, etag_matches, parse_accept_encoding
+
+RECIPE = {"suggestion_id": "dish-1", "title": "Омлет с сыром", "servings": 2}
+
+
+@pytest.fixture
+def compressor(settings):
+    return ResponseCompressor(settings.model_copy(update={"compression_encodings": ["gzip"]}))
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("GZIP, br;q=0.5 , zstd;q=x, identity;q=0") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "zstd": 0.0,
+        "identity": 0.0,
+    }
+    assert parse_accept_encoding("") == {}
+
+
+@pytest.mark.parametrize(
+    ("header", "coding"),
+    [
+        ("gzip", "gzip"),
+        ("deflate, gzip;q=0.2", "gzip"),
+        ("*", "gzip"),
+        ("*;q=0.5, gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate(compressor, header, coding):
+    assert compressor.negotiate(header) == coding
+
+
+def test_negotiate_prefers_quality_then_configured_order(settings):
+    pytest.importorskip("brotli")
+    compressor = ResponseCompressor(settings.model_copy(update={"compression_encodings": ["br", "gzip"]}))
+
+    assert compressor.negotiate("gzip, br") == "br"
+    assert compressor.negotiate("gzip, br;q=0.8") == "gzip"
+
+
+def test_missing_codings_are_skipped(settings):
+    compressor = ResponseCompressor(settings.model_copy(update={"compression_encodings": ["lzma", "gzip"]}))
+
+    assert compressor.encodings == ["gzip"]
+
+
+def test_compressed_bodies_are_cached_by_digest(compressor):
+    body = b'{"title": "' + b"x" * 2000 + b'"}'
+    digest = digest_body(body)
+
+    first = compressor.compress(digest, "gzip", body)
+    second = compressor.compress(digest, "gzip", body)
+
+    assert gzip.decompress(first) == body
+    assert second is first
+    assert compressor.stats()["cache"]["hits"] == 1
+
+
+def test_bodies_without_digest_are_not_cached(compressor):
+    body = b'{"title": "' + b"x" * 2000 + b'"}'
+
+    assert gzip.decompress(compressor.compress(None, "gzip", body)) == body
+    assert compressor.stats()["cache"]["entries"] == 0
+
+
+@pytest.mark.parametrize(
+    ("header", "matches"),
+    [
+        ('"abc"', True),
+        ('"abc-gzip"', True),
+        ('W/"abc-br"', True),
+        ('"other", "abc-zstd"', True),
+        ("*", True),
+        ('"abcd"', False),
+        ('"other-abc"', False),
+    ],
+)
+def test_etag_matches_any_coding_of_the_body(header, matches):
+    assert etag_matches(header, "abc") is matches
+
+
+async def _stored_recipe(client) -> str:
+    response = await client.post("/api/v1/build-recipe", json={"suggestion_id": "dish-1", "title": "Омлет с сыром"})
+    assert response.status_code == 200
+    return "/api/v1/recipes/dish-1"
+
+
+async def test_responses_are_compressed_when_accepted(client):
+    response = await client.post(
+        "/api/v1/build-recipe",
+        json={"suggestion_id": "dish-1", "title": "Омлет с сыром"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert "etag" not in response.headers  # Only GETs are tagged
+    assert response.json()["suggestion_id"] == "dish-1"
+
+    identity = await client.get("/api/v1/recipes/dish-1", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == response.json()
+
+
+async def test_only_get_bodies_are_cached(client):
+    await client.post("/api/v1/suggest-meals", json={"ingredients": ["яйца"]}, headers={"Accept-Encoding": "gzip"})
+    path = await _stored_recipe(client)
+    assert (await client.get("/stats")).json()["compression"]["cache"]["entries"] == 0
+
+    await client.get(path, headers={"Accept-Encoding": "gzip"})
+    await client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    # The recipe and the first /stats body, a GET too
+    cache = (await client.get("/stats")).json()["compression"]["cache"]
+    assert cache["entries"] == 2 and cache["hits"] == 1
+
+
+async def test_small_bodies_are_not_compressed(client):
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+
+
+async def test_unchanged_get_is_answered_with_304(client):
+    path = await _stored_recipe(client)
+    first = await client.get(path, headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    # The tag of one coding validates the body in any coding
+    cached = await client.get(path, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag.replace("-gzip", "")
+    assert "content-length" not in cached.headers
+
+    changed = await client.get(path, headers={"If-None-Match": '"other"'})
+    assert changed.status_code == 200
+
+
+async def test_errors_are_not_answered_with_304(client):
+    response = await client.get("/api/v1/recipes/missing", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+
+
+async def test_event_streams_are_not_compressed(client):
+    response = await client.post(
+        "/api/v1/build-recipe/stream",
+        json={"suggestion_id": "dish-1", "title": "Омлет с сыром"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert "content-encoding" not in response.headers
+    assert "event: recipe" in response.text
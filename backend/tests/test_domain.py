@@ -0,0 +1,28 @@
+from app.models.domain import DishDraft, RecipeDraft, RecipeResult, SuggestionsResult
+
+
+def test_suggestions_get_fresh_ids_and_keep_their_fields():
+    draft = DishDraft(title="Омлет", short_description="Быстро", estimated_time_minutes=10, confidence=0.9)
+
+    result = SuggestionsResult.from_drafts([draft, draft], "gpt-4o-mini")
+
+    first, second = result.dishes
+    assert first.suggestion_id != second.suggestion_id
+    assert first.model_dump(exclude={"suggestion_id"}) == draft.model_dump()
+    assert result.model == "gpt-4o-mini"
+
+
+def test_recipe_result_keeps_the_draft_and_its_model():
+    draft = RecipeDraft(
+        title="Омлет",
+        prep_time_minutes=5,
+        cook_time_minutes=10,
+        ingredients=[{"ingredient": "Яйца", "quantity": "3 шт"}],
+        steps=[{"number": 1, "instruction": "Взбить яйца", "tip": None}],
+        model="gpt-4o-mini",
+    )
+
+    recipe = RecipeResult.from_draft(draft, "dish-1")
+
+    assert recipe.suggestion_id == "dish-1"
+    assert recipe.model_dump(exclude={"suggestion_id"}) == draft.model_dump()
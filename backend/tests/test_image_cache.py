@@ -0,0 +1,98 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.models.domain import ExtractIngredientsResult
+from app.services.image_cache import PerceptualImageCache, image_fingerprint
+from benchmarks.bench_image_preprocess import make_photo
+
+PHOTO = make_photo(640, 480)
+
+
+def _reencode(data: bytes, quality: int = 70, rotate: bool = False) -> bytes:
+    """Re-save a photo; rotated copies carry an EXIF orientation that undoes the rotation."""
+    image = Image.open(io.BytesIO(data))
+    exif = Image.Exif()
+    if rotate:
+        image = image.rotate(90, expand=True)
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality, exif=exif)
+    return output.getvalue()
+
+
+def _stripes(first: str, second: str) -> bytes:
+    """Vertical stripes: only the colours tell two of them apart, not the brightness edges."""
+    image = Image.new("RGB", (320, 240), first)
+    for x in range(0, 320, 80):
+        image.paste(second, (x, 0, x + 40, 240))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def _result(name: str) -> ExtractIngredientsResult:
+    return ExtractIngredientsResult(ingredients=[{"name": name, "confidence": 0.9}])
+
+
+@pytest.fixture
+def cache(settings):
+    return PerceptualImageCache(settings.model_copy(update={"image_cache_max_distance": 2}))
+
+
+@pytest.mark.parametrize("copy", [_reencode(PHOTO), _reencode(PHOTO, rotate=True)], ids=["recompressed", "exif-rotated"])
+async def test_near_duplicates_share_a_result(cache, copy):
+    cache.set(await cache.fingerprint(PHOTO), _result("Яйца"))
+
+    assert cache.get(await cache.fingerprint(copy)) == _result("Яйца")
+    assert cache.stats()["near_hits"] == 1
+
+
+async def test_same_bytes_hit_by_digest(cache):
+    cache.set(await cache.fingerprint(PHOTO), _result("Яйца"))
+
+    assert cache.get(await cache.fingerprint(PHOTO)) == _result("Яйца")
+    assert cache.stats()["hits"] == 1 and cache.stats()["near_hits"] == 0
+
+
+async def test_photos_with_the_same_edges_in_other_colours_do_not_match(cache):
+    first, second = image_fingerprint(_stripes("white", "red")), image_fingerprint(_stripes("yellow", "blue"))
+    assert first.dhash == second.dhash
+
+    cache.set(first, _result("Молоко"))
+
+    assert cache.get(second) is None
+
+
+async def test_different_photos_do_not_match(cache):
+    cache.set(await cache.fingerprint(PHOTO), _result("Яйца"))
+
+    assert cache.get(await cache.fingerprint(make_photo(480, 640))) is None
+    assert cache.stats()["misses"] == 1
+
+
+async def test_undecodable_bytes_are_not_fingerprinted():
+    assert await PerceptualImageCache.fingerprint(b"not an image") is None
+
+
+def test_max_distance_is_capped(settings):
+    assert PerceptualImageCache(settings.model_copy(update={"image_cache_max_distance": 10})).max_distance == 2
+
+
+async def test_repeated_upload_is_extracted_once(app_client, stub):
+    async with app_client(IMAGE_CACHE_ENABLED="true") as client:
+        for data in (PHOTO, PHOTO, _reencode(PHOTO)):
+            response = await client.post("/api/v1/extract-ingredients", files={"image": ("fridge.jpg", data, "image/jpeg")})
+            assert response.status_code == 200
+        stats = (await client.get("/stats")).json()["image_cache"]
+
+    assert stub.requests == 1
+    assert stats["hits"] == 2
+
+
+async def test_image_cache_is_off_by_default(client, stub):
+    for _ in range(2):
+        await client.post("/api/v1/extract-ingredients", files={"image": ("fridge.jpg", PHOTO, "image/jpeg")})
+
+    assert stub.requests == 2
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import NotFoundError, QueueFullError
+from app.models.domain import DetectedIngredient
+from app.services.job_store import JobStore
+from app.services.jobs import JobQueue
+
+
+@pytest.fixture
+def job_settings(settings):
+    return settings.model_copy(update={"jobs_workers": 1, "jobs_max_queued": 2})
+
+
+@pytest.fixture
+async def job_store(job_settings):
+    store = JobStore(job_settings)
+    await store.open()
+    yield store
+    await store.close()
+
+
+@pytest.fixture
+async def queue(job_settings, job_store):
+    queue = JobQueue(job_settings, job_store)
+    queue.start()
+    yield queue
+    await queue.close()
+
+
+class _Work:
+    """Job work that blocks until released and counts its runs."""
+
+    def __init__(self, result=None):
+        self.result = result
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def test_job_runs_and_returns_its_result(queue):
+    work = _Work(DetectedIngredient(name="яйца", confidence=0.9))
+
+    info = await queue.submit("extract-ingredients", work)
+    assert info.status == "queued"
+    work.release.set()
+    done = await queue.get(info.job_id, wait=5)
+
+    assert done.status == "succeeded"
+    assert done.result == {"name": "яйца", "confidence": 0.9, "notes": None}
+    assert done.finished_at is not None
+
+
+async def test_failed_job_reports_the_error(queue):
+    work = _Work(NotFoundError("Suggestion not found: x", details={"suggestion_id": "x"}))
+    work.release.set()
+
+    info = await queue.submit("build-recipe", work)
+    done = await queue.get(info.job_id, wait=5)
+
+    assert done.status == "failed"
+    assert done.error == {
+        "error": "NotFoundError",
+        "message": "Suggestion not found: x",
+        "details": {"suggestion_id": "x"},
+    }
+
+
+async def test_unknown_job_is_not_found(queue):
+    with pytest.raises(NotFoundError):
+        await queue.get("missing")
+
+
+async def test_full_queue_rejects_submissions(queue):
+    work = _Work()
+    for _ in range(3):  # One running, two waiting
+        await queue.submit("build-recipe", work)
+        await asyncio.sleep(0)
+
+    with pytest.raises(QueueFullError):
+        await queue.submit("build-recipe", work)
+    assert queue.stats()["rejected"] == 1
+    work.release.set()
+
+
+async def test_resubmission_with_the_same_key_returns_the_job(queue):
+    work = _Work("done")
+
+    first = await queue.submit("build-recipe", work, "key")
+    again = await queue.submit("build-recipe", work, "key")
+    other_kind = await queue.submit("extract-ingredients", work, "key")
+
+    assert again.job_id == first.job_id
+    assert other_kind.job_id != first.job_id
+    assert queue.stats()["deduplicated"] == 1
+
+
+async def test_concurrent_submissions_with_the_same_key_start_one_job(queue):
+    work = _Work("done")
+    work.release.set()
+
+    infos = await asyncio.gather(*(queue.submit("build-recipe", work, "key") for _ in range(5)))
+    await queue.get(infos[0].job_id, wait=5)
+
+    assert len({info.job_id for info in infos}) == 1
+    assert work.runs == 1
+
+
+async def test_processes_share_jobs_and_idempotency_keys(job_settings, job_store):
+    # A second queue with its own connection to the file stands for another worker process
+    other_store = JobStore(job_settings)
+    await other_store.open()
+    queues = [JobQueue(job_settings, job_store), JobQueue(job_settings, other_store)]
+    for queue in queues:
+        queue.start()
+    work = _Work("done")
+    try:
+        infos = await asyncio.gather(*(queue.submit("build-recipe", work, "key") for queue in queues))
+        assert infos[0].job_id == infos[1].job_id
+
+        polled = asyncio.create_task(queues[1].get(infos[0].job_id, wait=5))
+        await asyncio.sleep(0.05)
+        work.release.set()
+        done = await polled
+        assert done.status == "succeeded" and done.result == "done"
+        assert work.runs == 1
+    finally:
+        for queue in queues:
+            await queue.close()
+        await other_store.close()
+
+
+async def test_route_runs_a_recipe_as_a_job(client):
+    body = {"suggestion_id": "dish-1", "title": "Омлет с сыром"}
+    headers = {"Idempotency-Key": "abc"}
+
+    response = await client.post("/api/v1/build-recipe?job=true", json=body, headers=headers)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["location"] == f"/api/v1/jobs/{job_id}"
+
+    again = await client.post("/api/v1/build-recipe?job=true", json=body, headers=headers)
+    assert again.json()["job_id"] == job_id
+
+    done = await client.get(f"/api/v1/jobs/{job_id}", params={"wait": 5})
+    assert done.status_code == 200
+    assert done.json()["status"] == "succeeded"
+    assert done.json()["result"]["suggestion_id"] == "dish-1"
+
+
+async def test_route_reports_unknown_jobs(client):
+    response = await client.get("/api/v1/jobs/missing")
+
+    assert response.status_code == 404
+    assert response.json()["error"] == "NotFoundError"
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from app.utils.json_stream import JSONStreamEvent, JSONStreamParser
+
+DOCUMENT = {
+    "title": "Омлет \"по-домашнему\" {с сыром}",
+    "servings": 2,
+    "rating": -1.5e2,
+    "vegetarian": True,
+    "notes": None,
+    "ingredients": [{"ingredient": "Яйца", "quantity": "3 шт"}, {"ingredient": "Сыр, [твёрдый]", "quantity": "50 г"}],
+    "steps": [{"step_number": 1, "instruction": "Взбить\\nяйца"}, {"step_number": 2, "instruction": "Жарить"}],
+    "tags": ["быстро", 5, False, None, [1, 2]],
+    "nutrition": {"kcal": 320, "macros": {"protein": 20}},
+    "empty": [],
+}
+
+
+def _expected_events() -> list[JSONStreamEvent]:
+    events = []
+    for key, value in DOCUMENT.items():
+        if isinstance(value, list):
+            events.extend(JSONStreamEvent((key, index), item) for index, item in enumerate(value))
+        events.append(JSONStreamEvent((key,), value))
+    return events
+
+
+def _feed(parser: JSONStreamParser, text: str, size: int) -> list[JSONStreamEvent]:
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 10_000])
+def test_events_do_not_depend_on_chunking(size):
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=2)
+    parser = JSONStreamParser()
+
+    assert _feed(parser, text, size) == _expected_events()
+    assert parser.text == text
+
+
+def test_array_elements_are_emitted_before_the_array_closes():
+    parser = JSONStreamParser()
+
+    events = parser.feed('{"steps": [{"n": 1}, {"n": 2')
+    assert events == [JSONStreamEvent(("steps", 0), {"n": 1})]
+    events = parser.feed("}]")
+    assert events == [JSONStreamEvent(("steps", 1), {"n": 2}), JSONStreamEvent(("steps",), [{"n": 1}, {"n": 2}])]
+
+
+def test_scalar_member_waits_for_its_delimiter():
+    parser = JSONStreamParser()
+
+    # The number may go on in the next chunk
+    assert parser.feed('{"servings": 1') == []
+    assert parser.feed("2, ") == [JSONStreamEvent(("servings",), 12)]
+    assert parser.feed('"title": "x"}') == [JSONStreamEvent(("title",), "x")]
+
+
+def test_escaped_quotes_and_brackets_inside_strings():
+    parser = JSONStreamParser()
+    text = json.dumps({"title": 'a "}] \\', "steps": ["[", "\\\""]})
+
+    assert _feed(parser, text, 1) == [
+        JSONStreamEvent(("title",), 'a "}] \\'),
+        JSONStreamEvent(("steps", 0), "["),
+        JSONStreamEvent(("steps", 1), "\\\""),
+        JSONStreamEvent(("steps",), ["[", "\\\""]),
+    ]
+
+
+def test_incomplete_document_emits_only_complete_values():
+    parser = JSONStreamParser()
+    text = json.dumps(DOCUMENT, ensure_ascii=False)
+    cut = text.index('{"step_number": 2') + 5
+
+    events = parser.feed(text[:cut])
+
+    assert [event.path for event in events][-3:] == [("ingredients", 1), ("ingredients",), ("steps", 0)]
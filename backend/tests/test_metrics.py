@@ -0,0 +1,45 @@
+from app.core.metrics import REGISTRY
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_requests_are_recorded_by_route_template(client):
+    labels = {"method": "GET", "route": "/api/v1/recipes/{suggestion_id}", "status": "404"}
+    before = _sample("holodilnik_http_request_duration_seconds_count", **labels)
+
+    await client.get("/api/v1/recipes/first")
+    await client.get("/api/v1/recipes/second")
+
+    assert _sample("holodilnik_http_request_duration_seconds_count", **labels) == before + 2
+    assert _sample("holodilnik_http_requests_in_flight") == 0
+
+
+async def test_upstream_calls_and_tokens_are_recorded_per_tool(client, settings):
+    labels = {"tool": "dish_suggester", "model": settings.agent_model}
+    calls = _sample("holodilnik_upstream_request_duration_seconds_count", outcome="ok", **labels)
+    prompt_tokens = _sample("holodilnik_tokens_total", kind="prompt", **labels)
+
+    response = await client.post("/api/v1/suggest-meals", json={"ingredients": ["яйца"]})
+
+    assert response.status_code == 200
+    assert _sample("holodilnik_upstream_request_duration_seconds_count", outcome="ok", **labels) == calls + 1
+    assert _sample("holodilnik_tokens_total", kind="prompt", **labels) > prompt_tokens
+    assert _sample("holodilnik_upstream_requests_in_flight", tool="dish_suggester") == 0
+
+
+async def test_exposition_includes_service_stats(client):
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "holodilnik_http_request_duration_seconds_bucket" in response.text
+    assert "holodilnik_sessions_active 0.0" in response.text
+
+
+async def test_metrics_can_be_disabled(app_client):
+    async with app_client(METRICS_ENABLED="false") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 404
@@ -0,0 +1,133 @@
+import pytest
+
+from app.utils.minhash import MinHashIndex, jaccard, optimal_bands
+
+BASE = tuple(f"ингредиент {i}" for i in range(10))
+NEAR = BASE[:9] + ("соль",)  # Jaccard 9/11
+FAR = tuple(f"другое {i}" for i in range(10))
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _index(max_entries: int = 100, threshold: float = 0.5, clock=None) -> MinHashIndex[str]:
+    return MinHashIndex(threshold=threshold, max_entries=max_entries, ttl_seconds=60, clock=clock or _Clock())
+
+
+def _buckets_of(*sets: tuple[str, ...]) -> int:
+    """Buckets used by an index holding only these sets."""
+    index = _index()
+    for elements in sets:
+        index.insert(elements, "value")
+    return index.stats()["buckets"]
+
+
+def test_jaccard():
+    assert jaccard(frozenset("ab"), frozenset("bc")) == pytest.approx(1 / 3)
+    assert jaccard(frozenset(), frozenset()) == 1.0
+    assert jaccard(frozenset("a"), frozenset()) == 0.0
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+def test_optimal_bands_split_the_signature(threshold):
+    bands, rows = optimal_bands(threshold, 64)
+
+    assert bands * rows == 64
+    # Sets at the threshold should mostly share a band
+    assert 1 - (1 - threshold ** rows) ** bands > 0.5
+
+
+def test_finds_identical_and_similar_sets():
+    index = _index()
+    index.insert(BASE, "base")
+
+    assert index.query(tuple(reversed(BASE))) == (1.0, "base")
+    similarity, value = index.query(NEAR)
+    assert value == "base" and similarity == pytest.approx(9 / 11)
+    assert index.query(FAR) is None
+    assert index.query(()) is None
+
+
+def test_similarity_below_threshold_is_a_miss():
+    index = _index(threshold=0.9)
+    index.insert(BASE, "base")
+
+    assert index.query(NEAR) is None
+
+
+def test_returns_the_most_similar_set():
+    index = _index()
+    index.insert(BASE[:7] + ("a", "b", "c"), "further")
+    index.insert(NEAR, "closer")
+
+    assert index.query(BASE)[1] == "closer"
+
+
+def test_partitions_are_not_compared():
+    index = _index()
+    index.insert(BASE, "two servings", partition=(2, ()))
+
+    assert index.query(BASE, partition=(4, ())) is None
+    assert index.query(BASE, partition=(2, ()))[1] == "two servings"
+
+
+def test_identical_set_replaces_the_value():
+    index = _index()
+    index.insert(BASE, "old")
+    index.insert(tuple(reversed(BASE)), "new")
+
+    assert len(index) == 1
+    assert index.query(BASE) == (1.0, "new")
+    assert index.stats()["buckets"] == _buckets_of(BASE)
+
+
+def test_eviction_removes_the_set_from_its_buckets():
+    index = _index(max_entries=1)
+    index.insert(BASE, "base")
+    index.insert(FAR, "far")
+
+    assert index.stats()["evictions"] == 1
+    assert index.stats()["buckets"] == _buckets_of(FAR)
+    assert index.query(BASE) is None
+
+
+def test_eviction_keeps_the_other_sets_of_shared_buckets():
+    index = _index(max_entries=2)
+    index.insert(BASE, "base")
+    index.insert(NEAR, "near")
+    index.insert(FAR, "far")  # Evicts BASE, which shares buckets with NEAR
+
+    assert index.stats()["buckets"] == _buckets_of(NEAR, FAR)
+    assert index.query(BASE)[1] == "near"
+
+
+def test_expired_sets_leave_their_buckets_when_found():
+    clock = _Clock()
+    index = _index(clock=clock)
+    index.insert(BASE, "base")
+
+    clock.now = 61
+    assert index.query(BASE) is None
+    assert len(index) == 0 and index.stats()["buckets"] == 0
+
+
+def test_clear_drops_entries_and_buckets():
+    index = _index()
+    index.insert(BASE, "base")
+    index.clear()
+
+    assert len(index) == 0 and index.stats()["buckets"] == 0
+
+
+def test_similarity_at_the_threshold_is_a_miss():
+    index = _index(threshold=0.6)
+    index.insert(("a", "b", "c", "d"), "base")
+
+    # One swap in four is exactly 0.6
+    assert index.query(("a", "b", "c", "e")) is None
+    assert index.query(("a", "b", "c", "d", "e"))[1] == "base"
@@ -0,0 +1,88 @@
+from app.models.response_formats import EXTRACTION_FORMAT
+from app.services.agent_service import AgentService
+from app.services.model_router import MIN_SAMPLES, ModelRouter, ToolRoute
+from app.services.openai_client import OpenAIClient
+
+
+def _route(probe_every: int = 4) -> ToolRoute:
+    return ToolRoute("suggestion", primary="primary", fast="fast", budget=1.0, probe_every=probe_every)
+
+
+def _calls(route: ToolRoute, count: int, seconds: float) -> list[str]:
+    models = []
+    for _ in range(count):
+        model = route.choose()
+        route.observe(model, seconds)
+        models.append(model)
+    return models
+
+
+def test_route_downgrades_over_budget_and_keeps_probing():
+    route = _route(probe_every=4)
+
+    assert set(_calls(route, MIN_SAMPLES, 2.0)) == {"primary"}
+    assert route.downgraded and route.downgrades == 1
+
+    assert _calls(route, 8, 2.0) == ["fast", "fast", "fast", "primary"] * 2
+    assert route.stats()["model"] == "fast"
+
+
+def test_route_recovers_once_probes_are_fast():
+    route = _route(probe_every=2)
+    _calls(route, MIN_SAMPLES, 2.0)
+
+    # Recovery is judged on probes only: MIN_SAMPLES of them, one call in two
+    _calls(route, 2 * MIN_SAMPLES - 1, 0.5)
+    assert route.downgraded
+    _calls(route, 1, 0.5)
+
+    assert not route.downgraded
+    assert set(_calls(route, 4, 0.5)) == {"primary"}
+
+
+def test_probes_over_the_recovery_line_keep_the_route_downgraded():
+    route = _route(probe_every=2)
+    _calls(route, MIN_SAMPLES, 2.0)
+
+    _calls(route, 4 * MIN_SAMPLES, 0.9)  # Within budget, but not under 80% of it
+
+    assert route.downgraded
+
+
+def test_disabled_router_never_downgrades(settings):
+    router = ModelRouter(settings.model_copy(update={"suggestion_fast_model": "fast"}))
+    route = router.routes["suggestion"]
+
+    assert set(_calls(route, 2 * MIN_SAMPLES, 2 * route.budget)) == {settings.agent_model}
+    assert route.downgrades == 0
+
+
+def test_router_probe_ratio(settings):
+    router = ModelRouter(settings.model_copy(update={"model_router_enabled": True, "model_router_probe_ratio": 0.25}))
+
+    assert {route.probe_every for route in router.routes.values()} == {4}
+
+
+async def test_slow_tool_is_served_by_its_fast_model(settings, stub):
+    client = OpenAIClient(settings.model_copy(update={
+        "model_router_enabled": True,
+        "suggestion_fast_model": "gpt-4o-mini-fast",
+        "suggestion_latency_budget_seconds": 0.0,
+        "model_router_probe_ratio": 0.5,
+    }))
+    service = AgentService(client)
+    try:
+        models = [(await service.suggest_meals([f"продукт {i}"])).model for i in range(MIN_SAMPLES + 4)]
+    finally:
+        await service.close()
+        await client.close()
+
+    assert models[MIN_SAMPLES:] == ["gpt-4o-mini-fast", "gpt-4o-mini", "gpt-4o-mini-fast", "gpt-4o-mini"]
+    assert client.router.stats()["suggestion"]["downgrades"] == 1
+
+
+async def test_recorded_model_is_documented_but_not_sent_upstream(client):
+    schemas = (await client.get("/openapi.json")).json()["components"]["schemas"]
+
+    assert "model" in schemas["ExtractIngredientsResult"]["properties"]
+    assert "model" not in EXTRACTION_FORMAT.response_format["json_schema"]["schema"]["properties"]
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.agent_service import AgentService
+from app.services.prefetch import RecipePrefetcher
+from benchmarks.stub_openai import parse_latency
+
+
+@pytest.fixture
+async def open_service(openai_client, settings):
+    """Factory of agent services prefetching recipes; keyword arguments override settings."""
+    services = []
+
+    def open_service(**overrides) -> AgentService:
+        prefetch_settings = settings.model_copy(update={"prefetch_enabled": True, **overrides})
+        service = AgentService(openai_client, prefetcher=RecipePrefetcher(prefetch_settings))
+        services.append(service)
+        return service
+
+    yield open_service
+    for service in services:
+        await service.close()
+
+
+@pytest.fixture
+def slow_recipes(stub):
+    """Recipe calls of the stub take long enough to still be running."""
+    stub.config.latency_by_format["Recipe"] = parse_latency("fixed:5")
+
+
+async def _suggest(service: AgentService, ingredient: str = "яйца"):
+    return (await service.suggest_meals([ingredient], servings=2)).dishes[0]
+
+
+async def _settle(service: AgentService) -> None:
+    """Wait for the running prefetches to finish."""
+    await asyncio.gather(*service.prefetcher._running, return_exceptions=True)
+
+
+async def test_prefetched_recipe_is_served_without_another_call(open_service, stub):
+    service = open_service()
+    dish = await _suggest(service)
+    await _settle(service)
+
+    recipe = await service.build_recipe(dish.suggestion_id, servings=2)
+
+    assert recipe.suggestion_id == dish.suggestion_id
+    assert stub.requests == 2
+    assert service.prefetcher.stats()["hits"] == 1
+
+
+async def test_running_prefetch_is_awaited(open_service, stub):
+    service = open_service()
+    dish = await _suggest(service)
+
+    await service.build_recipe(dish.suggestion_id, servings=2)
+
+    assert stub.requests == 2
+    assert service.prefetcher.stats()["inflight_hits"] == 1
+
+
+async def test_prefetch_for_other_servings_is_not_used(open_service, stub):
+    service = open_service()
+    dish = await _suggest(service)
+    await _settle(service)
+
+    await service.build_recipe(dish.suggestion_id, title=dish.title, servings=4)
+
+    assert stub.requests == 3
+    assert service.prefetcher.stats()["misses"] == 1
+
+
+async def test_concurrent_prefetches_are_capped(open_service, stub, slow_recipes):
+    service = open_service(prefetch_max_inflight=1)
+
+    await _suggest(service, "яйца")
+    await _suggest(service, "рис")
+
+    stats = service.prefetcher.stats()
+    assert stats["scheduled"] == 1 and stats["skipped_budget"] == 1 and stats["inflight"] == 1
+
+
+async def test_budget_per_minute(open_service, stub):
+    service = open_service(prefetch_budget_per_minute=2)
+    for ingredient in ("яйца", "рис", "лук"):
+        await _suggest(service, ingredient)
+        await _settle(service)
+    assert service.prefetcher.stats()["skipped_budget"] == 1
+
+    service.prefetcher._window_start -= 60  # A minute later
+    await _suggest(service, "сыр")
+
+    assert service.prefetcher.stats()["scheduled"] == 3
+
+
+async def test_expired_and_evicted_prefetches_are_misses(open_service, stub):
+    expiring = open_service(prefetch_ttl_seconds=0)
+    dish = await _suggest(expiring)
+    await _settle(expiring)
+    assert await expiring.prefetcher.take(dish.suggestion_id, 2) is None
+
+    bounded = open_service(prefetch_max_entries=1)
+    first = await _suggest(bounded, "яйца")
+    second = await _suggest(bounded, "рис")
+    await _settle(bounded)
+    assert await bounded.prefetcher.take(first.suggestion_id, 2) is None
+    assert await bounded.prefetcher.take(second.suggestion_id, 2) is not None
+
+
+async def test_shutdown_cancels_running_prefetches(open_service, stub, slow_recipes):
+    service = open_service()
+    await _suggest(service)
+    assert service.prefetcher.stats()["inflight"] == 1
+
+    start = time.perf_counter()
+    await service.close()
+
+    assert time.perf_counter() - start < 1
+    stats = service.prefetcher.stats()
+    assert stats["inflight"] == 0 and stats["completed"] == 0 and stats["failed"] == 0
@@ -0,0 +1,83 @@
+from app.models.domain import RecipeResult
+from app.services.recipe_index import RecipeIndex
+
+
+def _recipe(suggestion_id: str, ingredients: list[str], minutes: int = 30) -> RecipeResult:
+    return RecipeResult(
+        suggestion_id=suggestion_id,
+        title=f"Блюдо {suggestion_id}",
+        prep_time_minutes=minutes // 2,
+        cook_time_minutes=minutes - minutes // 2,
+        ingredients=[{"ingredient": name, "quantity": "1 шт"} for name in ingredients],
+        steps=[{"number": 1, "instruction": "Приготовить"}],
+    )
+
+
+def test_inflected_names_match():
+    index = RecipeIndex(max_recipes=10)
+    index.add(_recipe("salad", ["Томаты черри", "Огурец", "Соль"]))
+
+    [hit] = index.search(["томат", "огурец"])
+
+    assert hit.suggestion_id == "salad"
+    assert hit.coverage == 1.0
+    assert hit.matched_ingredients == ["Томаты черри", "Огурец"]
+    assert hit.missing_ingredients == []
+
+
+def test_all_terms_of_a_query_ingredient_must_be_in_one_recipe_ingredient():
+    index = RecipeIndex(max_recipes=10)
+    index.add(_recipe("fish", ["Куриные яйца", "Филе трески"]))
+
+    assert index.search(["куриное филе"]) == []
+    assert index.search(["филе трески"])[0].matched_ingredients == ["Филе трески"]
+
+
+def test_ranking_by_coverage_then_matches_then_time():
+    index = RecipeIndex(max_recipes=10)
+    index.add(_recipe("slow", ["Яйца", "Молоко"], minutes=40))
+    index.add(_recipe("fast", ["Яйца", "Молоко"], minutes=10))
+    index.add(_recipe("partial", ["Яйца", "Мука", "Сахар", "Молоко"]))
+    index.add(_recipe("unrelated", ["Рис"]))
+
+    hits = index.search(["яйца", "молоко"])
+
+    assert [hit.suggestion_id for hit in hits] == ["fast", "slow", "partial"]
+    # Sugar is a staple: counted as available, never listed as missing
+    assert hits[2].coverage == 0.75 and hits[2].missing_ingredients == ["Мука"]
+    assert [hit.suggestion_id for hit in index.search(["яйца", "молоко"], min_coverage=0.9, limit=1)] == ["fast"]
+
+
+def test_replacing_and_evicting_recipes_cleans_postings():
+    index = RecipeIndex(max_recipes=2)
+    index.add(_recipe("a", ["Свёкла"]))
+    index.add(_recipe("a", ["Картофель"]))
+    assert index.search(["свекла"]) == []
+
+    index.add(_recipe("b", ["Морковь"]))
+    index.add(_recipe("c", ["Лук"]))  # Drops "a", the oldest
+
+    assert len(index) == 2
+    assert index.search(["картофель"]) == []
+    assert index.stats()["terms"] == 2
+
+
+async def test_route_searches_built_recipes_and_reloads_them(app_client):
+    async with app_client() as client:
+        built = await client.post("/api/v1/build-recipe", json={"suggestion_id": "dish-1", "title": "Омлет"})
+        first = built.json()["ingredients"][0]["ingredient"]
+
+        response = await client.get("/api/v1/recipes/search", params={"ingredients": f"{first}, соль"})
+        assert response.status_code == 200
+        [hit] = response.json()["hits"]
+        assert hit["suggestion_id"] == "dish-1"
+        assert first in hit["matched_ingredients"]
+
+        assert (await client.get("/api/v1/recipes/search", params={"ingredients": "ничего"})).json()["hits"] == []
+        assert (await client.get("/api/v1/recipes/search", params={"ingredients": ""})).status_code == 422
+
+    # A restarted worker indexes the stored recipes
+    async with app_client() as client:
+        response = await client.get("/api/v1/recipes/search", params={"ingredients": first})
+        assert response.json()["recipes_indexed"] == 1
+        assert response.json()["hits"][0]["suggestion_id"] == "dish-1"
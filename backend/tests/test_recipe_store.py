@@ -0,0 +1,63 @@
+from app.models.domain import RecipeResult
+from app.services.recipe_store import RecipeStore
+
+
+async def _suggest(client, servings: int = 2) -> dict:
+    response = await client.post("/api/v1/suggest-meals", json={"ingredients": ["яйца", "сыр"], "servings": servings})
+    assert response.status_code == 200
+    return response.json()["dishes"][0]
+
+
+async def test_recipes_survive_reopening_the_store(settings):
+    recipe = RecipeResult(
+        suggestion_id="salad",
+        title="Салат",
+        prep_time_minutes=5,
+        cook_time_minutes=0,
+        ingredients=[{"ingredient": "Огурец", "quantity": "1 шт"}],
+        steps=[{"number": 1, "instruction": "Нарезать"}],
+    )
+    store = RecipeStore(settings)
+    await store.open()
+    await store.save_recipe(recipe, 4)
+    await store.close()
+
+    reopened = RecipeStore(settings)
+    await reopened.open()
+    try:
+        assert await reopened.get_recipe("salad") == (recipe, 4)
+        assert await reopened.get_recipe("missing") is None
+    finally:
+        await reopened.close()
+
+
+async def test_recipe_is_built_from_the_stored_suggestion_once(client, stub):
+    dish = await _suggest(client)
+
+    first = await client.post("/api/v1/build-recipe", json={"suggestion_id": dish["suggestion_id"]})
+    again = await client.post("/api/v1/build-recipe", json={"suggestion_id": dish["suggestion_id"]})
+    stored = await client.get(f"/api/v1/recipes/{dish['suggestion_id']}")
+
+    assert first.status_code == 200
+    assert first.json()["suggestion_id"] == dish["suggestion_id"]
+    assert again.json() == first.json() == stored.json()
+    assert stub.requests == 2  # The suggestions, then one recipe
+
+
+async def test_other_servings_build_a_new_recipe(client, stub):
+    dish = await _suggest(client)
+    await client.post("/api/v1/build-recipe", json={"suggestion_id": dish["suggestion_id"]})
+
+    response = await client.post("/api/v1/build-recipe", json={"suggestion_id": dish["suggestion_id"], "servings": 6})
+
+    assert response.status_code == 200
+    assert stub.requests == 3
+
+
+async def test_unknown_suggestions_and_recipes_are_not_found(client, stub):
+    build = await client.post("/api/v1/build-recipe", json={"suggestion_id": "missing"})
+    get = await client.get("/api/v1/recipes/missing")
+
+    assert build.status_code == get.status_code == 404
+    assert build.json()["error"] == get.json()["error"] == "NotFoundError"
+    assert stub.requests == 0
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import pytest
+from openai import AsyncStream
+
+from app.api.routes import build_recipe_stream
+from app.models.api import BuildRecipeRequest
+
+
+@pytest.fixture
+def closed_streams(monkeypatch):
+    """Upstream responses of the completion streams closed so far."""
+    closed = []
+    close = AsyncStream.close
+
+    async def record_close(self):
+        closed.append(self.response)
+        await close(self)
+
+    monkeypatch.setattr(AsyncStream, "close", record_close)
+    return closed
+
+
+async def test_stream_yields_parts_then_recipe(agent_service, closed_streams):
+    events = await agent_service.stream_recipe("dish-1", title="Омлет с сыром", servings=2)
+
+    names = [name async for name, _ in events]
+
+    assert names[:2] == ["title", "ingredients"]
+    assert set(names[2:-1]) == {"step"}
+    assert names[-1] == "recipe"
+    assert len(closed_streams) == 1 and closed_streams[0].is_closed
+
+
+async def test_closing_the_stream_early_closes_the_upstream_response(agent_service, closed_streams):
+    events = await agent_service.stream_recipe("dish-1", title="Омлет с сыром")
+    name, _ = await anext(events)
+    assert name == "title"
+
+    # What the response does when the client goes away
+    await events.aclose()
+
+    assert len(closed_streams) == 1 and closed_streams[0].is_closed
+
+
+async def test_cancelling_the_consumer_closes_the_upstream_response(agent_service, closed_streams):
+    events = await agent_service.stream_recipe("dish-1", title="Омлет с сыром")
+    first = asyncio.Event()
+
+    async def consume():
+        async for _ in events:
+            first.set()
+
+    task = asyncio.create_task(consume())
+    await first.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert len(closed_streams) == 1 and closed_streams[0].is_closed
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+async def test_route_streams_recipe_events(client, stub):
+    body = {"suggestion_id": "dish-1", "title": "Омлет с сыром", "servings": 2}
+
+    response = await client.post("/api/v1/build-recipe/stream", json=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert events[0] == ("title", {"title": "Омлет с сыром"})
+    assert events[1][0] == "ingredients"
+    name, recipe = events[-1]
+    assert name == "recipe" and recipe["suggestion_id"] == "dish-1"
+    assert [data for name, data in events if name == "step"] == recipe["steps"]
+
+    # Built recipes are replayed from the store
+    replay = await client.post("/api/v1/build-recipe/stream", json=body)
+    assert _events(replay.text)[-1] == ("recipe", recipe)
+    assert stub.requests == 1
+
+
+async def test_route_releases_the_slot_when_the_client_goes_away(admitted_service, closed_streams):
+    request = BuildRecipeRequest(suggestion_id="dish-1", title="Омлет с сыром")
+    response = await build_recipe_stream(request, admitted_service)
+    body = response.body_iterator
+
+    assert (await anext(body)).startswith(b"event: title")
+    assert admitted_service.admission.stats()["recipe"]["active"] == 1
+    # What Starlette does with the body of a response whose client disconnected
+    await body.aclose()
+
+    assert admitted_service.admission.stats()["recipe"]["active"] == 0
+    assert len(closed_streams) == 1 and closed_streams[0].is_closed
+
+
+async def test_route_rejects_unknown_suggestion_before_streaming(client):
+    response = await client.post("/api/v1/build-recipe/stream", json={"suggestion_id": "missing"})
+
+    assert response.status_code == 404
+    assert response.json()["error"] == "NotFoundError"
+
+
+async def test_stream_can_be_closed_from_another_task(agent_service, closed_streams):
+    events = await agent_service.stream_recipe("dish-1", title="Омлет с сыром")
+
+    # Started in one task and closed in another, as when the generator is finalized elsewhere
+    await asyncio.create_task(anext(events))
+    await events.aclose()
+
+    assert len(closed_streams) == 1 and closed_streams[0].is_closed
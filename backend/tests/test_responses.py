@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from app.core.responses import ModelResponse
+from app.models.domain import DetectedIngredient, ExtractIngredientsResult, RecipeResult
+from benchmarks.bench_json_responses import COMBINED, EXTRACTION, RECIPE_RESULT, SUGGESTIONS, _fastapi_path
+
+EDGE_CASES = ExtractIngredientsResult(
+    ingredients=[
+        DetectedIngredient(name='Сыр "Российский"', confidence=0.30000000000000004, notes=None),
+        DetectedIngredient(name="Щавель\tи\nукроп \\ 🌿", confidence=1.0, notes="ёмкость \x00"),
+    ],
+    unsure_items=[],
+    model=None,
+)
+
+
+@pytest.mark.parametrize(
+    "response_model, content",
+    [
+        (ExtractIngredientsResult, EXTRACTION),
+        (ExtractIngredientsResult, EDGE_CASES),
+        (type(SUGGESTIONS), SUGGESTIONS),
+        (RecipeResult, RECIPE_RESULT),
+        (None, COMBINED),
+    ],
+    ids=["extraction", "edge-cases", "suggestions", "recipe", "extract-and-suggest"],
+)
+async def test_bodies_are_identical_to_json_response(response_model, content):
+    previous = await _fastapi_path(response_model, content)()
+
+    assert ModelResponse(content).body == previous
+
+
+async def test_exponent_floats_differ_only_in_notation():
+    content = ExtractIngredientsResult(ingredients=[DetectedIngredient(name="Соль", confidence=1e-7)])
+
+    previous = await _fastapi_path(ExtractIngredientsResult, content)()
+    body = ModelResponse(content).body
+
+    assert b'"confidence":1e-07' in previous and b'"confidence":1e-7' in body
+    assert json.loads(body) == json.loads(previous)
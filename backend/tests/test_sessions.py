@@ -0,0 +1,166 @@
+import asyncio
+import contextlib
+import json
+import threading
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.routes import _handle_session_message
+from app.core.exceptions import NotFoundError
+from app.models.domain import DishDraft, SuggestionsResult
+from app.services.sessions import KitchenSession
+from benchmarks.bench_image_preprocess import make_photo
+from benchmarks.stub_openai import StubOpenAIServer
+
+SESSION = "/api/v1/session"
+
+
+@pytest.fixture
+def stub_url(stub_config):
+    """
+    Stub server on a loop of its own thread.
+
+    The test client runs the app on another thread and blocks the test while
+    it waits, so the stub cannot share the test's event loop.
+    """
+    loop = asyncio.new_event_loop()
+    stub = StubOpenAIServer(stub_config)
+    url = loop.run_until_complete(stub.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield url
+    asyncio.run_coroutine_threadsafe(stub.stop(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+@pytest.fixture
+def session_app(make_app):
+    """Factory of started test clients; keyword arguments override settings by env name."""
+    with contextlib.ExitStack() as clients:
+        yield lambda **env: clients.enter_context(TestClient(make_app(**env)))
+
+
+class GoneWebSocket:
+    """WebSocket of a client that disconnected after `sends` messages."""
+
+    def __init__(self, sends: int):
+        self.sent = []
+        self.sends = sends
+
+    async def send_text(self, text: str) -> None:
+        if len(self.sent) == self.sends:
+            raise WebSocketDisconnect(1001)
+        self.sent.append(json.loads(text))
+
+
+def _suggestions(count: int) -> SuggestionsResult:
+    drafts = [
+        DishDraft(title=f"Блюдо {i}", short_description="Быстро", estimated_time_minutes=10, confidence=0.9)
+        for i in range(count)
+    ]
+    return SuggestionsResult.from_drafts(drafts, "model")
+
+
+def test_session_forgets_the_oldest_dishes():
+    session = KitchenSession(max_dishes=3)
+    first, second = _suggestions(2), _suggestions(2)
+    session.remember(first)
+    session.remember(second)
+
+    assert list(session.dishes) == [first.dishes[1].suggestion_id] + [d.suggestion_id for d in second.dishes]
+    with pytest.raises(NotFoundError):
+        session.dish(first.dishes[0].suggestion_id)
+
+
+def test_photo_to_suggestions_to_recipe(session_app):
+    client = session_app()
+
+    with client.websocket_connect(SESSION) as ws:
+        ready = ws.receive_json()
+        assert ready["type"] == "ready"
+        ws.send_json({"type": "options", "servings": 3})
+        ws.send_bytes(make_photo(640, 480))
+
+        extraction = ws.receive_json()
+        assert extraction["type"] == "extraction"
+        assert [i["name"] for i in extraction["data"]["ingredients"]] == ["Яйца"]
+        suggestions = ws.receive_json()
+        assert suggestions["type"] == "suggestions"
+        dish = suggestions["data"]["dishes"][0]
+
+        ws.send_json({"type": "recipe", "suggestion_id": dish["suggestion_id"]})
+        events = []
+        while not events or events[-1]["type"] != "recipe":
+            events.append(ws.receive_json())
+
+    assert [event["type"] for event in events[:2]] == ["title", "ingredients"]
+    assert {event["suggestion_id"] for event in events} == {dish["suggestion_id"]}
+    assert events[-1]["data"]["suggestion_id"] == dish["suggestion_id"]
+    stats = client.get("/stats").json()["sessions"]
+    assert stats["active"] == 0 and stats["messages"] == 3 and stats["errors"] == 0
+
+
+def test_errors_are_reported_and_the_session_goes_on(session_app):
+    client = session_app()
+
+    with client.websocket_connect(SESSION) as ws:
+        ws.receive_json()
+        ws.send_json({"type": "suggest"})
+        assert ws.receive_json()["error"] == "InvalidMessageError"
+        ws.send_text("{not json")
+        assert ws.receive_json()["error"] == "InvalidMessageError"
+        ws.send_bytes(b"not a photo")
+        error = ws.receive_json()
+        assert error["error"] == "ImageValidationError"
+        assert error["message"] == "File is not a recognised JPEG, PNG, WebP or GIF image"
+        ws.send_json({"type": "recipe", "suggestion_id": "not-suggested-here"})
+        assert ws.receive_json()["error"] == "NotFoundError"
+
+        ws.send_json({"type": "suggest", "ingredients": ["рис", "лук"]})
+        assert ws.receive_json()["type"] == "suggestions"
+
+    assert client.get("/stats").json()["sessions"]["errors"] == 4
+
+
+def test_sessions_beyond_the_limit_are_rejected(session_app):
+    client = session_app(SESSION_MAX_CONNECTIONS="1")
+
+    with client.websocket_connect(SESSION) as ws:
+        ws.receive_json()
+        with client.websocket_connect(SESSION) as rejected:
+            with pytest.raises(WebSocketDisconnect) as excinfo:
+                rejected.receive_json()
+    assert excinfo.value.code == 1013
+
+    with client.websocket_connect(SESSION) as ws:
+        assert ws.receive_json()["type"] == "ready"
+
+
+def test_idle_session_is_closed(session_app):
+    client = session_app(SESSION_IDLE_TIMEOUT_SECONDS="0.2")
+
+    with client.websocket_connect(SESSION) as ws:
+        ws.receive_json()
+        with pytest.raises(WebSocketDisconnect) as excinfo:
+            ws.receive_json()
+
+    assert excinfo.value.code == 1000 and excinfo.value.reason == "Idle timeout"
+    assert client.get("/stats").json()["sessions"]["closed_idle"] == 1
+
+
+async def test_disconnect_mid_recipe_releases_the_slot(admitted_service):
+    session = KitchenSession(max_dishes=5)
+    suggestions = _suggestions(1)
+    session.remember(suggestions)
+    websocket = GoneWebSocket(sends=1)
+    message = {"text": json.dumps({"type": "recipe", "suggestion_id": suggestions.dishes[0].suggestion_id})}
+
+    with pytest.raises(WebSocketDisconnect):
+        await _handle_session_message(websocket, session, message, admitted_service, None)
+
+    assert [event["type"] for event in websocket.sent] == ["title"]
+    assert admitted_service.admission.stats()["recipe"]["active"] == 0
@@ -0,0 +1,123 @@
+import asyncio
+import marshal
+import time
+
+import pytest
+
+from app.models.domain import DishDraft, RecipeResult, SuggestionsResult
+from app.services import shared_cache as shared_cache_module
+from app.services.shared_cache import SharedResultCache
+from app.utils.codec import COMPRESS_MIN_BYTES, decode_model, encode_model
+
+
+def _suggestions(count: int) -> SuggestionsResult:
+    drafts = [
+        DishDraft(title=f"Омлет {i}", short_description="С сыром и зеленью", estimated_time_minutes=15, confidence=0.9)
+        for i in range(count)
+    ]
+    return SuggestionsResult.from_drafts(drafts, "gpt-4o-mini")
+
+
+def _recipe(suggestion_id: str, steps: int = 3) -> RecipeResult:
+    return RecipeResult(
+        suggestion_id=suggestion_id,
+        title="Омлет с сыром",
+        servings=None,
+        prep_time_minutes=5,
+        cook_time_minutes=10,
+        ingredients=[{"ingredient": "Яйца", "quantity": "3 шт"}, {"ingredient": "Сыр", "quantity": "50 г"}],
+        steps=[{"number": i + 1, "instruction": f"Шаг {i + 1}: взбить и обжарить"} for i in range(steps)],
+        model="gpt-4o-mini",
+    )
+
+
+async def _eventually(condition, timeout: float = 5.0) -> None:
+    """Wait for a background write of the cache to land."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the cache"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def open_cache(settings):
+    """Factory of opened caches on the test's shared file; keyword arguments override settings."""
+    caches = []
+
+    async def open_cache(**overrides) -> SharedResultCache:
+        cache = SharedResultCache(settings.model_copy(update=overrides))
+        await cache.open()
+        caches.append(cache)
+        return cache
+
+    yield open_cache
+    for cache in caches:
+        await cache.close()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [_suggestions(1), _suggestions(20), _recipe("dish-1"), _recipe("dish-2", steps=30)],
+    ids=["suggestions", "many-suggestions", "recipe", "long-recipe"],
+)
+def test_codec_round_trips_results(value):
+    data = encode_model(value)
+
+    assert decode_model(type(value), data) == value
+    # Large values are compressed
+    assert data[0] == (2 if len(marshal.dumps(value.model_dump())) >= COMPRESS_MIN_BYTES else 1)
+
+
+@pytest.mark.parametrize("data", [b"", b"\x09junk", b"\x02not zlib", b"\x01" + b"\x00" * 8])
+def test_codec_rejects_corrupt_data(data):
+    with pytest.raises(ValueError):
+        decode_model(RecipeResult, data)
+
+
+def test_codec_rejects_another_schema():
+    with pytest.raises(ValueError):
+        decode_model(RecipeResult, encode_model(_suggestions(1)))
+
+
+async def test_workers_share_one_file(open_cache):
+    writer, reader = await open_cache(), await open_cache()
+    recipe = _recipe("dish-1")
+
+    writer.set("recipe", ("омлет", None, 2), recipe)
+    await _eventually(lambda: writer.writes == 1)
+
+    assert await reader.get("recipe", ("омлет", None, 2), RecipeResult) == recipe
+    assert await reader.get("recipe", ("омлет", None, 4), RecipeResult) is None
+    assert await reader.get("suggestions", ("омлет", None, 2), RecipeResult) is None
+    assert reader.stats()["hits"]["recipe"] == 1 and reader.stats()["misses"]["recipe"] == 1
+
+
+async def test_expired_entries_are_misses(open_cache):
+    cache = await open_cache(shared_cache_ttl_seconds=0)
+
+    cache.set("recipe", "omelette", _recipe("dish-1"))
+    await _eventually(lambda: cache.writes == 1)
+    await asyncio.sleep(0.01)
+
+    assert await cache.get("recipe", "omelette", RecipeResult) is None
+
+
+async def test_least_recently_used_entries_are_evicted_over_the_budget(open_cache, monkeypatch):
+    size = len(encode_model(_recipe("dish-0")))
+    cache = await open_cache(shared_cache_max_bytes=int(size * 2.5))
+    monkeypatch.setattr(shared_cache_module, "TOUCH_INTERVAL", 0.0)
+
+    for i in range(2):
+        cache.set("recipe", f"dish-{i}", _recipe(f"dish-{i}"))
+        await _eventually(lambda: cache.writes == i + 1)
+    # Reading dish-0 makes dish-1 the least recently used
+    assert await cache.get("recipe", "dish-0", RecipeResult) is not None
+    await asyncio.sleep(0.05)  # The recency update is written in the background
+    cache.set("recipe", "dish-2", _recipe("dish-2"))
+    await _eventually(lambda: cache.writes == 3)
+
+    assert cache.evictions == 1
+    assert cache.stats()["bytes"] == 2 * size
+    assert await cache.get("recipe", "dish-1", RecipeResult) is None
+    assert await cache.get("recipe", "dish-0", RecipeResult) is not None
+    assert await cache.get("recipe", "dish-2", RecipeResult) is not None
@@ -0,0 +1,142 @@
+import asyncio
+
+from app.utils.singleflight import SingleFlight
+
+
+class _Call:
+    """A call that blocks until released, recording how it ended."""
+
+    def __init__(self, result="value"):
+        self.result = result
+        self.started = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    call = _Call()
+
+    tasks = [asyncio.create_task(flights.do("key", call)) for _ in range(5)]
+    await _settle()
+    call.release.set()
+
+    assert await asyncio.gather(*tasks) == ["value"] * 5
+    assert call.started == 1
+    assert flights.stats() == {"calls": 5, "coalesced": 4, "inflight": 0, "coalescing_ratio": 0.8}
+
+
+async def test_different_keys_do_not_share():
+    flights = SingleFlight()
+    first, second = _Call("a"), _Call("b")
+
+    tasks = [asyncio.create_task(flights.do("a", first)), asyncio.create_task(flights.do("b", second))]
+    await _settle()
+    first.release.set()
+    second.release.set()
+
+    assert await asyncio.gather(*tasks) == ["a", "b"]
+    assert flights.coalesced == 0
+
+
+async def test_results_are_not_kept_after_the_call():
+    flights = SingleFlight()
+    call = _Call()
+    call.release.set()
+
+    await flights.do("key", call)
+    await flights.do("key", call)
+
+    assert call.started == 2
+
+
+async def test_error_reaches_every_waiter_and_the_next_caller_retries():
+    flights = SingleFlight()
+    call = _Call(RuntimeError("upstream failed"))
+
+    tasks = [asyncio.create_task(flights.do("key", call)) for _ in range(3)]
+    await _settle()
+    call.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    call.result = "recovered"
+    assert await flights.do("key", call) == "recovered"
+    assert call.started == 2
+
+
+async def test_cancelled_waiter_leaves_the_call_running_for_the_others():
+    flights = SingleFlight()
+    call = _Call()
+    leaving = asyncio.create_task(flights.do("key", call))
+    staying = asyncio.create_task(flights.do("key", call))
+    await _settle()
+
+    leaving.cancel()
+    await _settle()
+    call.release.set()
+
+    assert await staying == "value"
+    assert leaving.cancelled()
+    assert not call.cancelled and call.started == 1
+
+
+async def test_last_waiter_leaving_cancels_the_call():
+    flights = SingleFlight()
+    call = _Call()
+    tasks = [asyncio.create_task(flights.do("key", call)) for _ in range(2)]
+    await _settle()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await _settle()
+
+    assert call.cancelled
+    assert flights.stats()["inflight"] == 0
+
+    # The next caller starts afresh instead of joining the cancelled call
+    fresh = _Call("fresh")
+    fresh.release.set()
+    assert await flights.do("key", fresh) == "fresh"
+
+
+async def test_identical_suggestion_requests_make_one_upstream_call(agent_service, stub):
+    results = await asyncio.gather(*(agent_service.suggest_meals(["томаты", "курица"]) for _ in range(10)))
+
+    assert stub.requests == 1
+    assert len({result.dishes[0].suggestion_id for result in results}) == 10
+    assert agent_service.stats()["single_flight"]["coalesced"] == 9
+
+
+async def test_recipe_build_survives_the_first_caller_disconnecting(agent_service, stub):
+    suggestions = await agent_service.suggest_meals(["томаты"])
+    dish = suggestions.dishes[0]
+    builds = [
+        asyncio.create_task(agent_service.build_recipe(dish.suggestion_id, title=dish.title))
+        for _ in range(2)
+    ]
+    await _settle()
+
+    leaving, staying = builds
+    leaving.cancel()
+
+    recipe = await staying
+    assert recipe.suggestion_id == dish.suggestion_id
+    assert stub.requests == 2  # One for the suggestions, one shared recipe build
@@ -0,0 +1,101 @@
+import pytest
+
+from app.services.agent_service import AgentService
+from app.services.suggestion_cache import SuggestionCache, suggestion_key
+from app.utils.text import canonical_set, ingredient_terms, normalize_ingredient
+
+BASE = ["томат", "рис", "лук", "курица"]
+
+
+def test_normalize_ingredient():
+    assert normalize_ingredient("  Свёкла \t столовая ") == "свекла столовая"
+    assert canonical_set(["Без глютена", "без  глютена", "", "Веган"]) == ("без глютена", "веган")
+    assert canonical_set(None) == ()
+
+
+@pytest.mark.parametrize(
+    "name, terms",
+    [
+        ("Томаты черри", ("томат", "черр")),
+        ("помидоры", ("помид",)),
+        ("Перец молотый по вкусу", ("перец",)),
+        ("Яйца 2 шт", ("яйц",)),
+        ("без сахара", ("без", "сахар")),
+    ],
+)
+def test_ingredient_terms(name, terms):
+    assert ingredient_terms(name) == terms
+
+
+def test_equivalent_requests_share_a_key():
+    key = suggestion_key(["Томат", "курица"], 2, ["Без глютена"])
+
+    assert suggestion_key(["курица ", "томаты", "Курица"], 2, ["без глютена "]) == key
+    assert suggestion_key(["помидоры"]) == suggestion_key(["Помидор"])
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        suggestion_key(["томат", "курица"], 4, ["без глютена"]),
+        suggestion_key(["томат", "курица"], 2),
+        suggestion_key(["томат", "курица", "рис"], 2, ["без глютена"]),
+    ],
+)
+def test_servings_preferences_and_ingredients_change_the_key(other):
+    assert suggestion_key(["томат", "курица"], 2, ["без глютена"]) != other
+
+
+def test_negations_change_the_key():
+    assert suggestion_key(["йогурт", "без сахара"]) != suggestion_key(["йогурт", "сахар"])
+
+
+async def test_cached_suggestions_get_fresh_ids(openai_client, settings, stub):
+    service = AgentService(openai_client, suggestion_cache=SuggestionCache(settings))
+    try:
+        first = await service.suggest_meals(["Томат", "курица"], servings=2)
+        again = await service.suggest_meals(["курица ", "томаты"], servings=2)
+    finally:
+        await service.close()
+
+    assert stub.requests == 1
+    assert [dish.title for dish in again.dishes] == [dish.title for dish in first.dishes]
+    assert {dish.suggestion_id for dish in again.dishes}.isdisjoint(dish.suggestion_id for dish in first.dishes)
+
+
+@pytest.fixture
+async def caching_service(openai_client, settings):
+    """Agent service with the suggestion cache and similarity reuse enabled."""
+    cache_settings = settings.model_copy(update={"suggestion_similarity_enabled": True})
+    service = AgentService(openai_client, suggestion_cache=SuggestionCache(cache_settings))
+    yield service
+    await service.close()
+
+
+async def test_near_identical_set_reuses_the_dishes(caching_service, stub):
+    first = await caching_service.suggest_meals(BASE, servings=2)
+    similar = await caching_service.suggest_meals(BASE + ["чеснок"], servings=2)
+
+    assert stub.requests == 1
+    assert [dish.title for dish in similar.dishes] == [dish.title for dish in first.dishes]
+    assert {dish.suggestion_id for dish in similar.dishes}.isdisjoint(dish.suggestion_id for dish in first.dishes)
+
+
+async def test_swapping_the_main_ingredient_does_not_reuse_the_dishes(caching_service, stub):
+    await caching_service.suggest_meals(BASE, servings=2)
+    await caching_service.suggest_meals(["томат", "рис", "лук", "говядина"], servings=2)
+
+    assert stub.requests == 2
+    assert caching_service.suggestion_cache.stats()["similar"]["hits"] == 0
+
+
+async def test_similarity_reuse_is_off_by_default(openai_client, settings, stub):
+    service = AgentService(openai_client, suggestion_cache=SuggestionCache(settings))
+    try:
+        await service.suggest_meals(BASE)
+        await service.suggest_meals(BASE + ["чеснок"])
+    finally:
+        await service.close()
+
+    assert stub.requests == 2
+    assert "similar" not in service.suggestion_cache.stats()
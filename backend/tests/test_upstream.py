@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from app.services.upstream import MIN_HEDGE_SAMPLES, UpstreamPool
+from benchmarks.stub_openai import StubConfig, StubOpenAIServer, parse_latency
+
+
+@pytest.fixture
+async def start_stub():
+    """Factory of running stub servers, by latency spec and error rate."""
+    servers = []
+
+    async def start(latency: str = "fixed:0.01", error_rate: float = 0.0) -> tuple[StubOpenAIServer, str]:
+        server = StubOpenAIServer(StubConfig(parse_latency(latency), {}, error_rate=error_rate))
+        servers.append(server)
+        return server, await server.start()
+
+    yield start
+    for server in servers:
+        await server.stop()
+
+
+@pytest.fixture
+async def open_pool(settings):
+    """Factory of pools over the given base URLs; keyword arguments override settings."""
+    pools = []
+
+    def open_pool(urls: list[str], **overrides) -> UpstreamPool:
+        pool = UpstreamPool(settings.model_copy(update={"openai_base_urls": urls, **overrides}), httpx.AsyncClient())
+        pools.append(pool)
+        return pool
+
+    yield open_pool
+    for pool in pools:
+        await pool.close()
+
+
+def _complete(client: openai.AsyncOpenAI):
+    return client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "?"}])
+
+
+async def test_healthy_endpoint_wins_over_a_failing_one(start_stub, open_pool):
+    dead, dead_url = await start_stub(error_rate=1.0)
+    healthy, healthy_url = await start_stub()
+    pool = open_pool([dead_url, healthy_url])
+
+    for _ in range(5):
+        await pool.call("test", _complete)
+
+    # One attempt on the dead endpoint, without client retries, then only the healthy one
+    assert dead.requests == 1
+    assert healthy.requests == 5
+    assert pool.failovers == 1
+    assert [ep.url for ep in pool.ranked()] == [healthy_url, dead_url]
+
+
+def test_unmeasured_endpoint_is_not_ranked_first_for_its_errors(settings, open_pool):
+    pool = open_pool(["http://a/v1", "http://b/v1"])
+    failing, healthy = pool.endpoints
+    failing.record_failure()
+    failing.record_failure()
+    healthy.record_success(0.01)
+
+    assert pool.ranked() == [healthy, failing]
+
+
+def test_single_endpoint_keeps_client_retries(settings, open_pool):
+    [single] = open_pool([settings.openai_base_url]).endpoints
+    [first, _] = open_pool(["http://a/v1", "http://b/v1"]).endpoints
+
+    assert single.client.max_retries == settings.openai_max_retries
+    assert first.client.max_retries == 0
+
+
+async def test_breaker_opens_then_half_opens_and_closes(start_stub, open_pool):
+    first, first_url = await start_stub()
+    second, second_url = await start_stub()
+    pool = open_pool(
+        [first_url, second_url],
+        upstream_breaker_failures=1,
+        upstream_breaker_cooldown_seconds=0.2,
+    )
+    endpoint = pool.endpoints[0]
+
+    first.config.error_rate = 1.0
+    await pool.call("test", _complete)
+    assert endpoint.state == "open" and endpoint.ejections == 1
+    assert pool.ranked()[-1] is endpoint
+
+    await asyncio.sleep(0.25)
+    assert endpoint.state == "half_open"
+
+    # The other endpoint failing sends the next call to the half-open one, which recovers
+    first.config.error_rate, second.config.error_rate = 0.0, 1.0
+    await pool.call("test", _complete)
+    await pool.call("test", _complete)
+    assert endpoint.state == "closed"
+    assert pool.failovers >= 2
+
+
+async def test_slow_call_is_hedged_after_the_percentile_delay(start_stub, open_pool):
+    stubs = {url: server for server, url in [await start_stub(), await start_stub()]}
+    pool = open_pool(list(stubs), upstream_hedge_min_delay_seconds=0.05)
+
+    for _ in range(MIN_HEDGE_SAMPLES):
+        await pool.call("test", _complete)
+    assert pool.hedged == 0
+
+    best = pool.ranked()[0]
+    latency = best.latency
+    stubs[best.url].config.latency = parse_latency("fixed:2")
+    start = time.perf_counter()
+    await pool.call("test", _complete)
+
+    assert time.perf_counter() - start < 1.0
+    assert pool.hedged == 1 and pool.hedge_wins == 1
+    # The abandoned call counts against the slow endpoint once its cancellation lands
+    await asyncio.sleep(0.01)
+    assert best.latency > latency